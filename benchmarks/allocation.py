@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# Filename: allocation.py
+
+"""
+Benchmark the heap-based Allocator against a greedy loop picking the best
+remaining loan for every note, over synthetic scored loans.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/allocation.py [--loans N] [--cash C]
+"""
+
+# Standard libraries
+import argparse
+import random
+import timeit
+
+# lendingclub2
+from lendingclub2.allocation import NOTE_AMOUNT, Allocator
+from lendingclub2.loan import Listing, Loan
+from lendingclub2.response.order import OrderNote
+
+
+def make_listing(count, seed=0):
+    """
+    Build a listing of synthetic loans
+
+    :param count: int
+    :param seed: int (default: 0)
+    :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+    """
+    rng = random.Random(seed)
+    listing = Listing()
+    for loan_id in range(count):
+        amount = 1000.0 * rng.randint(1, 40)
+        listing.loans.append(Loan({
+            'id': loan_id,
+            'loanAmount': amount,
+            'fundedAmount': amount * rng.random(),
+            'term': rng.choice((36, 60)),
+            'grade': rng.choice('ABCDEFG'),
+            'subGrade': 'A1',
+            'intRate': rng.uniform(5.0, 30.0),
+        }))
+    return listing
+
+
+def score(loan):
+    """
+    Score a loan
+
+    :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+    :returns: float
+    """
+    return loan.interest_rate
+
+
+def greedy_loop(loans, cash, max_per_loan, max_per_grade):
+    """
+    Buy one note at a time in the best loan which can still take one
+
+    :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+    :param cash: float
+    :param max_per_loan: float
+    :param max_per_grade: float
+    :returns: list of :py:class:`~lendingclub2.response.order.OrderNote`.
+    """
+    invested = dict()
+    per_grade = dict()
+    while cash >= NOTE_AMOUNT:
+        best = None
+        for loan in loans:
+            amount = invested.get(loan.id, 0) + NOTE_AMOUNT
+            if amount > max_per_loan or \
+                    amount > loan.amount - loan.funded_amount or \
+                    per_grade.get(loan.grade, 0) + NOTE_AMOUNT > max_per_grade:
+                continue
+            if best is None or score(loan) > score(best):
+                best = loan
+        if best is None:
+            break
+        invested[best.id] = invested.get(best.id, 0) + NOTE_AMOUNT
+        per_grade[best.grade] = per_grade.get(best.grade, 0) + NOTE_AMOUNT
+        cash -= NOTE_AMOUNT
+    return [OrderNote(loan_id, amount) for loan_id, amount in invested.items()]
+
+
+def main():
+    """
+    Run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=5000)
+    parser.add_argument('--cash', type=float, default=2500.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    loans = make_listing(args.loans).loans
+    max_per_loan = 50
+    max_per_grade = args.cash / 3
+    allocator = Allocator(score, max_per_loan=max_per_loan,
+                          max_per_grade=max_per_grade)
+
+    expected = greedy_loop(loans, args.cash, max_per_loan, max_per_grade)
+    allocated = allocator.allocate(loans, args.cash)
+    assert sum(note.amount for note in expected) == \
+        sum(note.amount for note in allocated)
+
+    results = (
+        ('greedy loop', lambda: greedy_loop(loans, args.cash, max_per_loan,
+                                            max_per_grade)),
+        ('Allocator', lambda: allocator.allocate(loans, args.cash)),
+    )
+    baseline = None
+    for name, function in results:
+        elapsed = min(timeit.repeat(function, number=1,
+                                    repeat=args.repeat))
+        if baseline is None:
+            baseline = elapsed
+        print("{:<12} {:>10.3f} ms {:>8.2f}x".format(
+            name, elapsed * 1000.0, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Filename: compiled_filter.py
+
+"""
+Microbenchmark of compiled filters against the regular Listing.filter loop
+over synthetic loans.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/compiled_filter.py [--loans N]
+"""
+
+# Standard libraries
+import argparse
+import random
+import timeit
+
+# lendingclub2
+from lendingclub2.compiler import compile_filters
+from lendingclub2.filter import (
+    BorrowerEmployedTrait, FilterByApproved, FilterByBorrowerTraits,
+    FilterByFunded, FilterByGrade, FilterByTerm,
+)
+from lendingclub2.loan import Listing, Loan
+
+
+def make_listing(count, seed=0):
+    """
+    Build a listing of synthetic loans
+
+    :param count: int
+    :param seed: int (default: 0)
+    :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+    """
+    rng = random.Random(seed)
+    listing = Listing()
+    for loan_id in range(count):
+        amount = 1000.0 * rng.randint(1, 40)
+        listing.loans.append(Loan({
+            'id': loan_id,
+            'loanAmount': amount,
+            'fundedAmount': amount * rng.random(),
+            'term': rng.choice((36, 60)),
+            'grade': rng.choice('ABCDEFG'),
+            'subGrade': 'A1',
+            'reviewStatus': rng.choice(('APPROVED', 'NOT_APPROVED')),
+            'empLength': rng.choice((None, 0, 12, 120)),
+        }))
+    return listing
+
+
+def main():
+    """
+    Run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    listing = make_listing(args.loans)
+    filters = (
+        FilterByTerm(value=36),
+        FilterByGrade(grades='ABC'),
+        FilterByFunded(percentage=20),
+        FilterByApproved(),
+        FilterByBorrowerTraits(BorrowerEmployedTrait()),
+    )
+    compiled = compile_filters(*filters)
+    assert listing.filter(compiled) == listing.filter(*filters)
+
+    print(compiled.source)
+    results = (
+        ('Listing.filter', lambda: listing.filter(*filters)),
+        ('compiled', lambda: listing.filter(compiled)),
+        ('compile + filter', lambda: listing.filter(
+            compile_filters(*filters))),
+    )
+    baseline = None
+    for name, function in results:
+        elapsed = min(timeit.repeat(function, number=1,
+                                    repeat=args.repeat))
+        if baseline is None:
+            baseline = elapsed
+        print("{:<18} {:>10.3f} ms {:>8.2f}x".format(
+            name, elapsed * 1000.0, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
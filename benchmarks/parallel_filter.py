@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# Filename: parallel_filter.py
+
+"""
+Benchmark the speedup of ParallelFilterExecutor against the number of
+workers, with an expensive regular expression filter over synthetic loans.
+
+Usage:
+    PYTHONPATH=. python3 benchmarks/parallel_filter.py [--loans N]
+"""
+
+# Standard libraries
+import argparse
+import os
+import random
+import re
+import time
+
+# lendingclub2
+from lendingclub2.filter import Filter
+from lendingclub2.loan import Listing, Loan
+from lendingclub2.parallel import ParallelFilterExecutor
+
+
+# Constants
+WORDS = ('car', 'debt', 'consolidate', 'house', 'medical', 'wedding',
+         'business', 'credit', 'card', 'loan', 'payoff', 'vacation')
+
+
+# pylint: disable=too-few-public-methods
+class RegexFilter(Filter):
+    """
+    Filter loans whose description and employment title match a pattern
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, pattern, repeat=20):
+        """
+        Constructor
+
+        :param pattern: string - regular expression
+        :param repeat: int - number of times the expression is evaluated
+                       to emulate an expensive filter (default: 20)
+        """
+        self._pattern = re.compile(pattern)
+        self._repeat = repeat
+    # pylint: enable=super-init-not-called
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        text = '{} {}'.format(loan.description, loan.borrower.title)
+        matched = False
+        for _ in range(self._repeat):
+            matched = self._pattern.search(text) is not None
+        return matched
+# pylint: enable=too-few-public-methods
+
+
+def make_listing(count, seed=0):
+    """
+    Build a listing of synthetic loans
+
+    :param count: int
+    :param seed: int (default: 0)
+    :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+    """
+    rng = random.Random(seed)
+    listing = Listing()
+    for loan_id in range(count):
+        listing.loans.append(Loan({
+            'id': loan_id,
+            'loanAmount': 1000.0 * rng.randint(1, 40),
+            'fundedAmount': 0.0,
+            'term': rng.choice((36, 60)),
+            'grade': rng.choice('ABCDEFG'),
+            'subGrade': 'A1',
+            'desc': ' '.join(rng.choice(WORDS) for _ in range(60)),
+            'empTitle': rng.choice(('Nurse', 'Engineer', 'Teacher', None)),
+        }))
+    return listing
+
+
+def main():
+    """
+    Run the benchmark
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--loans', type=int, default=5000)
+    args = parser.parse_args()
+
+    listing = make_listing(args.loans)
+    filter_spec = RegexFilter(r'\bwedding\b.*\bvacation\b')
+
+    start = time.perf_counter()
+    expected = listing.filter(filter_spec)
+    serial = time.perf_counter() - start
+    print("{:>8} {:>10} {:>8}".format('workers', 'seconds', 'speedup'))
+    print("{:>8} {:>10.3f} {:>8.2f}".format('serial', serial, 1.0))
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ParallelFilterExecutor(workers=workers) as executor:
+            # Warm the pool up before measuring
+            executor.filter(make_listing(workers * 4), filter_spec)
+            start = time.perf_counter()
+            result = executor.filter(listing, filter_spec)
+            elapsed = time.perf_counter() - start
+        assert result == expected
+        print("{:>8} {:>10.3f} {:>8.2f}".format(workers, elapsed,
+                                                serial / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
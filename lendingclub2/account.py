@@ -9,30 +9,74 @@ Interface classes:
 
 # Standard libraries
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # lendingclub2
 from lendingclub2 import utils
 from lendingclub2.config import INVESTOR_ID_ENV
 from lendingclub2.error import LCError
+from lendingclub2.executor import OrderExecutor
+from lendingclub2.index import OwnedLoans
+from lendingclub2.ledger import CashLedger
+from lendingclub2.response import transfer
 from lendingclub2.response.notes import Notes
 from lendingclub2.response.order import Order
 from lendingclub2.response.portfolio import Portfolios
-from lendingclub2.response.summary import Summary
+from lendingclub2.response.summary import AvailableCash, Summary
 
 
 class InvestorAccount:
     """
     Representation of an investor account in Lending Club.
+
+    The summary, the notes and the portfolios of the account are only
+    requested when they're first accessed, unless they're fetched ahead of
+    time with :py:meth:`~lendingclub2.account.InvestorAccount.prefetch`.
+
+    The available cash is tracked by a
+    :py:class:`~lendingclub2.ledger.CashLedger`, synchronized whenever the
+    cash or the summary is requested, and reduced locally by the
+    investments and withdrawals made through the account.
     """
     _ID = None
+    CASH_COMPONENTS = ('cash', 'summary')
+    COMPONENTS = {
+        'cash': AvailableCash,
+        'notes': Notes,
+        'portfolios': Portfolios,
+        'summary': Summary,
+    }
 
-    def __init__(self):
+    def __init__(self, ttl=None):
         """
         Constructor
+
+        :param ttl: float - number of seconds after which a component is
+                    requested again when accessed, or dict of component name
+                    (see COMPONENTS) mapped to its number of seconds
+                    (default: None, never expire)
         """
-        self._summary = Summary(InvestorAccount.id())
-        self._notes = Notes(InvestorAccount.id())
-        self._portfolios = Portfolios(InvestorAccount.id())
+        # Fail early if the account isn't configured
+        InvestorAccount.id()
+
+        if isinstance(ttl, dict):
+            unknown = set(ttl) - set(InvestorAccount.COMPONENTS)
+            if unknown:
+                fstr = "unknown account components: {}".format(
+                    ', '.join(sorted(unknown)))
+                raise LCError(fstr)
+            self._ttl = dict(ttl)
+        else:
+            self._ttl = {name: ttl for name in InvestorAccount.COMPONENTS}
+
+        self._components = dict()
+        self._ledger = CashLedger()
+        self._owned_loans = None
+        self._owned_lock = threading.Lock()
+        self._locks = {name: threading.Lock()
+                       for name in InvestorAccount.COMPONENTS}
 
     @classmethod
     def id(cls):
@@ -56,11 +100,22 @@ class InvestorAccount:
     @property
     def available_balance(self):
         """
-        Get the amount of cash that's available.
+        Get the amount of cash that's available, including the investments
+        and withdrawals made since the cash was last requested.
 
         :returns: float
         """
-        return self._summary.available_cash
+        self._get('cash')
+        return self._ledger.balance
+
+    @property
+    def ledger(self):
+        """
+        Get the ledger tracking the available cash.
+
+        :returns: instance of :py:class:`~lendingclub2.ledger.CashLedger`.
+        """
+        return self._ledger
 
     @property
     def notes(self):
@@ -69,7 +124,23 @@ class InvestorAccount:
 
         :returns: instance of :py:class:`~lendingclub2.response.notes.Notes`.
         """
-        return self._notes
+        return self._get('notes')
+
+    @property
+    def owned_loans(self):
+        """
+        Get the loans the account has notes of, e.g. for
+        :py:class:`~lendingclub2.indexed.FilterByNotOwned`. The loan IDs are
+        requested once from the notes endpoint, and the loans invested in
+        through the account are added right away.
+
+        :returns: instance of :py:class:`~lendingclub2.index.OwnedLoans`.
+        """
+        with self._owned_lock:
+            if self._owned_loans is None:
+                self._owned_loans = OwnedLoans(
+                    Notes(self.id(), fields=('loanId', )))
+            return self._owned_loans
 
     @property
     def portfolios(self):
@@ -79,7 +150,7 @@ class InvestorAccount:
         :returns: instance of
                   :py:class:`~lendingclub2.response.portfolio.Portfolios`.
         """
-        return self._portfolios
+        return self._get('portfolios')
 
     @property
     def total_balance(self):
@@ -88,7 +159,36 @@ class InvestorAccount:
 
         :returns: float
         """
-        return self._summary.account_total
+        return self._get('summary').account_total
+
+    def prefetch(self, *components):
+        """
+        Request the components of the account concurrently. The requests
+        still go through the rate limiter, but they're in flight at the same
+        time instead of waiting for each other. Components which are already
+        fetched and not expired aren't requested again.
+
+        :param components: iterable of string - names of the components
+                           (see COMPONENTS) (default: all of them)
+        """
+        names = self._validate(components)
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = [executor.submit(self._get, name) for name in names]
+            for future in futures:
+                future.result()
+
+    def refresh(self, *components):
+        """
+        Request the components of the account again, regardless of their
+        TTL.
+
+        :param components: iterable of string - names of the components
+                           (see COMPONENTS) (default: all of them)
+        """
+        names = self._validate(components)
+        for name in names:
+            self._components.pop(name, None)
+        self.prefetch(*names)
 
     def invest(self, *order_notes):
         """
@@ -98,6 +198,111 @@ class InvestorAccount:
                             :py:class:`~lendingclub2.response.order.OrderNote`.
         """
         order = Order(self.id(), *order_notes)
+        self._record(order.confirmations)
         if not order.successful:
             fstr = "could not complete the request completely"
             raise LCError(fstr)
+
+    def refresh_cash(self):
+        """
+        Request the available cash again, without requesting the whole
+        summary.
+
+        :returns: float
+        """
+        self.refresh('cash')
+        return self._ledger.balance
+
+    def submit(self, *order_notes, executor=None):
+        """
+        Invest to loans as specified, in batches, without failing when some
+        notes aren't bought. The unfilled amount of each note can then be
+        invested elsewhere. The requested amount of the notes whose outcome
+        is unknown is held in the ledger until the cash is requested again.
+
+        :param order_notes: iterable of instance of
+                            :py:class:`~lendingclub2.response.order.OrderNote`.
+        :param executor: instance of
+                         :py:class:`~lendingclub2.executor.OrderExecutor`
+                         (default: None, a new one with the default batch
+                         size)
+        :returns: list of
+                  :py:class:`~lendingclub2.response.order.OrderConfirmation`
+                  in the order of the notes
+        """
+        if executor is None:
+            executor = OrderExecutor()
+        confirmations = executor.submit(self.id(), *order_notes)
+        self._record(confirmations)
+        return confirmations
+
+    def withdraw(self, amount):
+        """
+        Withdraw cash from the account.
+
+        :param amount: float
+        :returns: instance of :py:class:`~lendingclub2.response.Response`.
+        """
+        response = transfer.withdraw(self.id(), amount)
+        if not response.successful:
+            fstr = "could not withdraw the cash"
+            raise LCError(fstr)
+        self._ledger.debit(amount, "withdrawal")
+        return response
+
+    def _get(self, name):
+        """
+        Get a component of the account, requesting it if it's missing or
+        expired.
+
+        :param name: string - name of the component
+        :returns: the component
+        """
+        with self._locks[name]:
+            entry = self._components.get(name)
+            ttl = self._ttl.get(name)
+            if entry is not None and \
+                    (ttl is None or time.monotonic() - entry[1] < ttl):
+                return entry[0]
+
+            component = InvestorAccount.COMPONENTS[name](self.id())
+            self._components[name] = (component, time.monotonic())
+            if name in InvestorAccount.CASH_COMPONENTS:
+                self._ledger.sync(component.available_cash)
+            return component
+
+    def _record(self, confirmations):
+        """
+        Record the invested amounts in the ledger and the owned loans. The
+        requested amount of the notes whose outcome is unknown is held, so
+        it isn't invested elsewhere before the ledger is synchronized again.
+
+        :param confirmations: iterable of
+                              :py:class:`~lendingclub2.response.order.OrderConfirmation`.
+        """
+        for confirmation in confirmations:
+            if confirmation.unknown:
+                self._ledger.debit(confirmation.requested_amount,
+                                   "loan {} (unknown outcome)".format(
+                                       confirmation.loan_id))
+            elif confirmation.invested_amount:
+                self._ledger.debit(confirmation.invested_amount,
+                                   "loan {}".format(confirmation.loan_id))
+                if self._owned_loans is not None:
+                    self._owned_loans.add(confirmation.loan_id)
+
+    @staticmethod
+    def _validate(components):
+        """
+        Check the names of the components.
+
+        :param components: tuple of string
+        :returns: tuple of string - all the components if none are given
+        """
+        if not components:
+            return tuple(sorted(InvestorAccount.COMPONENTS))
+        for name in components:
+            if name not in InvestorAccount.COMPONENTS:
+                fstr = "unknown account component: {}".format(name)
+                raise LCError(fstr)
+        return components
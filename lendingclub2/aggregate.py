@@ -0,0 +1,361 @@
+# Filename: aggregate.py
+
+"""
+LendingClub2 Aggregate Module
+
+Interface classes:
+    Aggregate
+    Count
+    Max
+    Mean
+    Min
+    Sum
+
+Interface functions:
+    group_by
+"""
+
+# Standard libraries
+from abc import abstractmethod
+from abc import ABC
+from operator import attrgetter
+
+# lendingclub2
+from lendingclub2.error import LCError
+
+
+# Interface classes
+class Aggregate(ABC):
+    """
+    Abstract base class of an aggregate computed per group
+    """
+    def __init__(self, attribute=None):
+        """
+        Constructor
+
+        :param attribute: string (attribute name, dotted names are allowed)
+                          or callable accepting an item (default: None)
+        """
+        self.attribute = attribute
+
+    @abstractmethod
+    def initial(self):
+        """
+        Get the initial state of the aggregate for a new group
+
+        :returns: state object
+        """
+        return None
+
+    @abstractmethod
+    def update(self, state, value):
+        """
+        Fold a value into the state
+
+        :param state: state object
+        :param value: value of the attribute for the current item
+        :returns: state object
+        """
+        return state
+
+    def result(self, state):
+        """
+        Convert the final state into the aggregate result
+
+        :param state: state object
+        :returns: result of the aggregate
+        """
+        return state
+
+
+class Count(Aggregate):
+    """
+    Number of items in the group
+    """
+    def initial(self):
+        """
+        Get the initial state of the aggregate for a new group
+
+        :returns: int
+        """
+        return 0
+
+    def update(self, state, value):
+        """
+        Fold a value into the state
+
+        :param state: int
+        :param value: ignored unless an attribute is specified, in which case
+                      only non-None values are counted
+        :returns: int
+        """
+        if self.attribute is not None and value is None:
+            return state
+        return state + 1
+
+
+class Max(Aggregate):
+    """
+    Largest non-None value in the group
+    """
+    def initial(self):
+        """
+        Get the initial state of the aggregate for a new group
+
+        :returns: None
+        """
+        return None
+
+    def update(self, state, value):
+        """
+        Fold a value into the state
+
+        :param state: current maximum or None
+        :param value: comparable value
+        :returns: new maximum
+        """
+        if value is None:
+            return state
+        if state is None or value > state:
+            return value
+        return state
+
+
+class Mean(Aggregate):
+    """
+    Arithmetic mean of the non-None values in the group
+    """
+    def initial(self):
+        """
+        Get the initial state of the aggregate for a new group
+
+        :returns: tuple of (total, count)
+        """
+        return (0, 0)
+
+    def update(self, state, value):
+        """
+        Fold a value into the state
+
+        :param state: tuple of (total, count)
+        :param value: number
+        :returns: tuple of (total, count)
+        """
+        if value is None:
+            return state
+        return (state[0] + value, state[1] + 1)
+
+    def result(self, state):
+        """
+        Convert the final state into the aggregate result
+
+        :param state: tuple of (total, count)
+        :returns: float or None if the group has no values
+        """
+        if not state[1]:
+            return None
+        return state[0] / state[1]
+
+
+class Min(Aggregate):
+    """
+    Smallest non-None value in the group
+    """
+    def initial(self):
+        """
+        Get the initial state of the aggregate for a new group
+
+        :returns: None
+        """
+        return None
+
+    def update(self, state, value):
+        """
+        Fold a value into the state
+
+        :param state: current minimum or None
+        :param value: comparable value
+        :returns: new minimum
+        """
+        if value is None:
+            return state
+        if state is None or value < state:
+            return value
+        return state
+
+
+class Sum(Aggregate):
+    """
+    Sum of the non-None values in the group
+    """
+    def initial(self):
+        """
+        Get the initial state of the aggregate for a new group
+
+        :returns: int
+        """
+        return 0
+
+    def update(self, state, value):
+        """
+        Fold a value into the state
+
+        :param state: number
+        :param value: number
+        :returns: number
+        """
+        if value is None:
+            return state
+        return state + value
+
+
+# Interface functions
+def group_by(items, key, **aggregates):
+    """
+    Group items by key and compute all the aggregates in a single pass.
+
+    If the items expose a columnar representation (a ``column(name)``
+    method returning the values of an attribute for every item in order,
+    or raising :py:class:`KeyError` if there's no such column) and both
+    the key and the aggregate attributes are names, the values are read
+    column by column instead of going through each item's properties.
+
+    :param items: iterable of items, e.g. instance of
+                  :py:class:`~lendingclub2.loan.Listing`.
+    :param key: string (attribute name, dotted names are allowed),
+                callable accepting an item, or tuple of strings for a
+                composite key
+    :param aggregates: dict - name of the result mapped to an instance of
+                       :py:class:`~lendingclub2.aggregate.Aggregate`.
+    :returns: dict - group key mapped to a dict of aggregate name and result
+    """
+    for name, aggregate in aggregates.items():
+        if not isinstance(aggregate, Aggregate):
+            fstr = "{} is not an instance of Aggregate".format(name)
+            raise LCError(fstr)
+
+    names = tuple(aggregates)
+    specs = tuple(aggregates[name] for name in names)
+    attributes, positions = _distinct_attributes(specs)
+
+    rows = _columnar_rows(items, key, attributes)
+    if rows is None:
+        rows = _item_rows(items, key, attributes)
+
+    results = dict()
+    for group_key, states in _fold(rows, specs, positions).items():
+        results[group_key] = {
+            name: aggregate.result(state)
+            for name, aggregate, state in zip(names, specs, states)
+        }
+    return results
+
+
+# Internal functions
+def _columnar_rows(items, key, attributes):
+    """
+    Generate the rows to aggregate out of a columnar representation.
+
+    :param items: iterable of items
+    :param key: string, callable, or tuple of strings
+    :param attributes: list of string or callable or None
+    :returns: iterable of tuple (group key, tuple of values) or None if the
+              columnar representation can't be used
+    """
+    column = getattr(items, 'column', None)
+    if not callable(column):
+        return None
+    if any(callable(attribute) for attribute in attributes):
+        return None
+
+    try:
+        if isinstance(key, str):
+            keys = column(key)
+        elif isinstance(key, tuple) and all(isinstance(name, str)
+                                            for name in key):
+            keys = zip(*[column(name) for name in key])
+        else:
+            return None
+
+        count = len(items)
+        columns = [(None, ) * count if attribute is None
+                   else column(attribute)
+                   for attribute in attributes]
+    except KeyError:
+        # Not every attribute has a column
+        return None
+    return zip(keys, zip(*columns))
+
+
+def _distinct_attributes(specs):
+    """
+    Find the distinct attributes of the aggregates, so each of them is only
+    read once per item.
+
+    :param specs: tuple of :py:class:`~lendingclub2.aggregate.Aggregate`.
+    :returns: tuple (list of attributes, tuple of int - position of the
+              attribute of each aggregate)
+    """
+    attributes = list()
+    for aggregate in specs:
+        if aggregate.attribute not in attributes:
+            attributes.append(aggregate.attribute)
+    positions = tuple(attributes.index(aggregate.attribute)
+                      for aggregate in specs)
+    return attributes, positions
+
+
+def _fold(rows, specs, positions):
+    """
+    Fold the values of each row into the states of its group.
+
+    :param rows: iterable of tuple (group key, tuple of values)
+    :param specs: tuple of :py:class:`~lendingclub2.aggregate.Aggregate`.
+    :param positions: tuple of int - position of the value of each aggregate
+                      in the rows
+    :returns: dict - group key mapped to the list of states of the aggregates
+    """
+    groups = dict()
+    for group_key, values in rows:
+        states = groups.get(group_key)
+        if states is None:
+            states = [aggregate.initial() for aggregate in specs]
+            groups[group_key] = states
+        for index, aggregate in enumerate(specs):
+            states[index] = aggregate.update(states[index],
+                                             values[positions[index]])
+    return groups
+
+
+def _getter(attribute):
+    """
+    Get the function to read an attribute.
+
+    :param attribute: string, tuple of string, callable, or None
+    :returns: callable accepting an item
+    """
+    if attribute is None:
+        return lambda item: None
+    if isinstance(attribute, str):
+        return attrgetter(attribute)
+    if isinstance(attribute, tuple):
+        return attrgetter(*attribute)
+    if callable(attribute):
+        return attribute
+    fstr = "invalid attribute specification: {!r}".format(attribute)
+    raise LCError(fstr)
+
+
+def _item_rows(items, key, attributes):
+    """
+    Generate the rows to aggregate by reading each item.
+
+    :param items: iterable of items
+    :param key: string, callable, or tuple of strings
+    :param attributes: list of string or callable or None
+    :returns: generator of tuple (group key, tuple of values)
+    """
+    key_getter = _getter(key)
+    getters = tuple(_getter(attribute) for attribute in attributes)
+    for item in items:
+        yield key_getter(item), tuple(getter(item) for getter in getters)
@@ -0,0 +1,190 @@
+# Filename: allocation.py
+
+"""
+LendingClub2 Allocation Module
+
+Interface classes:
+    Allocator
+"""
+
+# Standard libraries
+import heapq
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.response.order import OrderNote
+from lendingclub2.score import Scorer
+
+
+# Constants
+NOTE_AMOUNT = 25
+
+
+class Allocator:
+    """
+    Decide how much cash to invest in which loans, by descending score,
+    under the available cash, a maximum amount per loan and optionally a
+    maximum amount per grade and
+    :py:class:`~lendingclub2.exposure.ExposureLimits`.
+
+    Every note costs a multiple of NOTE_AMOUNT and is worth its score per
+    dollar, so investing greedily in the best loans first is optimal under
+    the cash, per-loan and per-grade limits. Exposure limits on several
+    dimensions overlap, so the greedy allocation stays within them but isn't
+    necessarily optimal. The candidates are kept in a heap, so only the loans
+    which actually get cash are ordered, instead of sorting the whole
+    listing.
+    """
+    # pylint: disable=too-many-arguments
+    def __init__(self, scorer, max_per_loan=NOTE_AMOUNT, max_per_grade=None,
+                 min_score=None, portfolio_id=None, constraints=None):
+        """
+        Constructor
+
+        :param scorer: instance of :py:class:`~lendingclub2.score.Scorer`,
+                       or callable accepting a loan and returning its score
+        :param max_per_loan: float - maximum amount invested in a single
+                             loan (default: NOTE_AMOUNT)
+        :param max_per_grade: float - maximum amount invested in the loans of
+                              any grade, or dict of grade mapped to its
+                              maximum amount; grades missing from the dict
+                              aren't limited (default: None, no limit)
+        :param min_score: float - loans with a lower score aren't invested
+                          in (default: None, no minimum)
+        :param portfolio_id: int - portfolio ID of the notes (default: None)
+        :param constraints: instance of
+                            :py:class:`~lendingclub2.exposure.ExposureLimits`
+                            - the allocated amounts are recorded as pending
+                            orders (default: None)
+        """
+        if max_per_loan < NOTE_AMOUNT:
+            fstr = "max_per_loan needs to be at least {}".format(NOTE_AMOUNT)
+            raise LCError(fstr)
+        self._scorer = scorer
+        self._max_per_loan = max_per_loan
+        self._max_per_grade = max_per_grade
+        self._min_score = min_score
+        self._portfolio_id = portfolio_id
+        self._constraints = constraints
+    # pylint: enable=too-many-arguments
+
+    def allocate(self, loans, cash):
+        """
+        Allocate the cash to the loans
+
+        :param loans: iterable of :py:class:`~lendingclub2.loan.Loan`,
+                      e.g. instance of :py:class:`~lendingclub2.loan.Listing`.
+        :param cash: float - available cash, e.g.
+                     :py:attr:`~lendingclub2.account.InvestorAccount.available_balance`
+        :returns: list of :py:class:`~lendingclub2.response.order.OrderNote`
+                  by descending score
+        """
+        loans = list(loans)
+        min_score = self._min_score
+        heap = [(-score, position)
+                for position, score in enumerate(self.scores(loans))
+                if score is not None and
+                (min_score is None or score >= min_score)]
+        heapq.heapify(heap)
+
+        grade_left = self._grade_limits()
+        units = int(cash // NOTE_AMOUNT)
+        order_notes = list()
+        while heap and units:
+            _, position = heapq.heappop(heap)
+            loan = loans[position]
+            count = self._count(loan, units, grade_left)
+            if count <= 0:
+                continue
+
+            units -= count
+            if grade_left is not None and loan.grade in grade_left:
+                grade_left[loan.grade] -= count
+            if self._constraints is not None:
+                self._constraints.add(loan, count * NOTE_AMOUNT)
+            order_notes.append(OrderNote(loan.id, count * NOTE_AMOUNT,
+                                         portfolio_id=self._portfolio_id))
+        return order_notes
+
+    def scores(self, loans):
+        """
+        Score the loans
+
+        :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: list of float or None, in the order of the loans
+        """
+        if isinstance(self._scorer, Scorer):
+            scores = self._scorer.scores(loans)
+            return [scores[loan.id] for loan in loans]
+        return [self._scorer(loan) for loan in loans]
+
+    def _count(self, loan, units, grade_left):
+        """
+        Get the number of notes which can be bought in a loan, capped by the
+        amount left in the loan, the maximum per loan, the maximum of its
+        grade and the exposure limits
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :param units: int - number of notes the cash left can buy
+        :param grade_left: dict - grade mapped to the number of notes which
+                           can still be bought in it, or None if the grades
+                           aren't limited
+        :returns: int
+        """
+        available = int((loan.amount - loan.funded_amount) // NOTE_AMOUNT)
+        count = min(int(self._max_per_loan // NOTE_AMOUNT), available, units)
+        if grade_left is not None and loan.grade in grade_left:
+            count = min(count, grade_left[loan.grade])
+        if self._constraints is not None and count > 0:
+            # The headroom is infinite when no limit covers the loan
+            headroom = self._constraints.headroom(loan)
+            if headroom < count * NOTE_AMOUNT:
+                count = int(headroom // NOTE_AMOUNT)
+        return count
+
+    def _grade_limits(self):
+        """
+        Get the number of notes which can be bought in each grade
+
+        :returns: dict or None if the grades aren't limited
+        """
+        if self._max_per_grade is None:
+            return None
+        if isinstance(self._max_per_grade, dict):
+            return {grade: int(amount // NOTE_AMOUNT)
+                    for grade, amount in self._max_per_grade.items()}
+        return _Uniform(int(self._max_per_grade // NOTE_AMOUNT))
+
+
+# Internal classes
+class _Uniform(dict):
+    """
+    Same limit for every grade
+    """
+    def __init__(self, limit):
+        """
+        Constructor
+
+        :param limit: int
+        """
+        dict.__init__(self)
+        self._limit = limit
+
+    def __contains__(self, grade):
+        """
+        Every grade is limited
+
+        :param grade: string
+        :returns: boolean
+        """
+        return True
+
+    def __missing__(self, grade):
+        """
+        Start the grade at the limit
+
+        :param grade: string
+        :returns: int
+        """
+        self[grade] = self._limit
+        return self._limit
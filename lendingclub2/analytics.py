@@ -0,0 +1,373 @@
+# Filename: analytics.py
+
+"""
+LendingClub2 Analytics Module
+
+Interface classes:
+    PortfolioAnalytics
+"""
+
+# Standard libraries
+import datetime
+
+# lendingclub2
+from lendingclub2.config import NoteStatus
+from lendingclub2.error import LCError
+
+
+# Constants
+# Share of the outstanding principal expected to be lost, by loan status
+LOSS_RATES = {
+    'Current': 0.0,
+    'Issued': 0.0,
+    'Fully Paid': 0.0,
+    'Charged Off': 0.0,
+    'In Grace Period': 0.25,
+    'Late (16-30 days)': 0.5,
+    'Late (31-120 days)': 0.75,
+    'Default': 0.9,
+}
+DEFAULT_LOSS_RATE = 0.75
+SERVICE_FEE = 0.01
+
+# Positions in the contribution vector of a note
+_COUNT = 0
+_INVESTED = 1
+_OUTSTANDING = 2
+_PRINCIPAL = 3
+_INTEREST = 4
+_PAYMENTS = 5
+_CHARGED_OFF = 6
+_LOSS = 7
+_EXPECTED_LOSS = 8
+_EXPOSURE = 9
+_SIZE = 10
+
+
+class PortfolioAnalytics:
+    """
+    Performance metrics of the notes of an account.
+
+    The contribution of each note (invested amount, outstanding principal,
+    interest, losses, ...) is computed once as a vector and added to the
+    sums of its group (vintage, grade and portfolio), so the metrics of any
+    grouping are read from the group sums. When notes change, only their
+    contributions are replaced, e.g. after
+    :py:meth:`~lendingclub2.database.NotesDatabase.sync` with
+    :py:meth:`~lendingclub2.analytics.PortfolioAnalytics.update_from`.
+
+    The net annualized return is approximated from the payments received so
+    far: interest minus service fees and charged-off principal, over the
+    average outstanding principal multiplied by the age of the notes.
+    """
+    GROUPS = ('grade', 'portfolio', 'vintage')
+
+    def __init__(self, notes=(), portfolios=None, as_of=None,
+                 service_fee=SERVICE_FEE, loss_rates=None):
+        """
+        Constructor
+
+        :param notes: iterable of
+                      :py:class:`~lendingclub2.response.notes.Note`, e.g.
+                      instance of :py:class:`~lendingclub2.response.notes.Notes`
+                      (default: empty)
+        :param portfolios: instance of
+                           :py:class:`~lendingclub2.response.portfolio.Portfolios`
+                           to group by portfolio name instead of ID
+                           (default: None)
+        :param as_of: instance of :py:class:`datetime.date` - date the ages
+                      of the notes are computed at (default: None, today)
+        :param service_fee: float - share of the payments charged as service
+                            fee (default: SERVICE_FEE)
+        :param loss_rates: dict - loan status mapped to the share of the
+                           outstanding principal expected to be lost
+                           (default: None, LOSS_RATES)
+        """
+        self._as_of = as_of or datetime.date.today()
+        self._service_fee = service_fee
+        self._loss_rates = LOSS_RATES if loss_rates is None else loss_rates
+        self._portfolio_names = dict()
+        if portfolios is not None:
+            self._portfolio_names = {portfolio.id: portfolio.name
+                                     for portfolio in portfolios}
+
+        # Note ID mapped to (group key, contribution, cash flow parameters)
+        self._notes = dict()
+        # Group key mapped to the sum of the contributions
+        self._groups = dict()
+        self.update(notes)
+
+    def __len__(self):
+        """
+        Find the number of notes
+
+        :returns: int
+        """
+        return len(self._notes)
+
+    def cash_flows(self, months=12):
+        """
+        Project the monthly payments of the outstanding principal, assuming
+        each note is paid on schedule and reduced by its expected loss
+
+        :param months: int - number of months to project
+        :returns: list of dict ('principal', 'interest', 'fees', 'net') -
+                  one per month, starting next month
+        """
+        principal = [0.0] * months
+        interest = [0.0] * months
+        for _, _, schedule in self._notes.values():
+            if schedule is None:
+                continue
+            balance, rate, remaining, survival = schedule
+            if rate:
+                payment = balance * rate / (1.0 - (1.0 + rate) ** -remaining)
+            else:
+                payment = balance / remaining
+            for month in range(min(months, remaining)):
+                paid_interest = balance * rate
+                paid_principal = min(payment - paid_interest, balance)
+                balance -= paid_principal
+                principal[month] += paid_principal * survival
+                interest[month] += paid_interest * survival
+
+        flows = list()
+        for paid_principal, paid_interest in zip(principal, interest):
+            fees = (paid_principal + paid_interest) * self._service_fee
+            flows.append({
+                'principal': paid_principal,
+                'interest': paid_interest,
+                'fees': fees,
+                'net': paid_principal + paid_interest - fees,
+            })
+        return flows
+
+    def charge_off_rates(self, key=('vintage', 'grade')):
+        """
+        Get the share of the invested amount which was charged off
+
+        :param key: string or tuple of string - see GROUPS
+                    (default: vintage and grade)
+        :returns: dict - group key mapped to float (0.0 - 1.0)
+        """
+        return {group: metrics['charge_off_rate']
+                for group, metrics in self.metrics(key=key).items()}
+
+    def expected_loss(self):
+        """
+        Get the outstanding principal expected to be lost
+
+        :returns: float
+        """
+        return self.metrics()['expected_loss']
+
+    def metrics(self, key=None):
+        """
+        Get the metrics of all the notes, or of each group of notes
+
+        :param key: string or tuple of string - see GROUPS (default: None,
+                    no grouping)
+        :returns: dict - metrics, or group key mapped to the metrics when
+                  grouping
+        """
+        if key is None:
+            totals = [0.0] * _SIZE
+            for sums in self._groups.values():
+                for position in range(_SIZE):
+                    totals[position] += sums[position]
+            return self._metrics(totals)
+
+        names = (key, ) if isinstance(key, str) else tuple(key)
+        for name in names:
+            if name not in PortfolioAnalytics.GROUPS:
+                fstr = "cannot group by {}".format(name)
+                raise LCError(fstr)
+        positions = tuple(PortfolioAnalytics.GROUPS.index(name)
+                          for name in names)
+
+        grouped = dict()
+        for group_key, sums in self._groups.items():
+            group = tuple(group_key[position] for position in positions)
+            if len(group) == 1:
+                group = group[0]
+            totals = grouped.get(group)
+            if totals is None:
+                totals = [0.0] * _SIZE
+                grouped[group] = totals
+            for position in range(_SIZE):
+                totals[position] += sums[position]
+        return {group: self._metrics(totals)
+                for group, totals in grouped.items()}
+
+    def net_annualized_return(self):
+        """
+        Get the net annualized return of all the notes
+
+        :returns: float - e.g. 0.05 for 5%
+        """
+        return self.metrics()['net_annualized_return']
+
+    def update(self, notes=(), removed=()):
+        """
+        Replace the contributions of the given notes
+
+        :param notes: iterable of
+                      :py:class:`~lendingclub2.response.notes.Note` - new or
+                      changed notes
+        :param removed: iterable of int - IDs of the notes to remove
+        """
+        for note_id in removed:
+            previous = self._notes.pop(note_id, None)
+            if previous is not None:
+                self._add(previous[0], previous[1], -1.0)
+
+        for note in notes:
+            # pylint: disable=protected-access
+            note_json = note._response
+            # pylint: enable=protected-access
+            entry = self._contribution(note_json)
+            previous = self._notes.get(note_json['noteId'])
+            if previous is not None:
+                self._add(previous[0], previous[1], -1.0)
+            self._notes[note_json['noteId']] = entry
+            self._add(entry[0], entry[1], 1.0)
+
+    def update_from(self, database):
+        """
+        Apply the changes of the latest synchronization of a notes database
+
+        :param database: instance of
+                         :py:class:`~lendingclub2.database.NotesDatabase`.
+        """
+        changed, removed = database.last_changes
+        notes = database.notes(note_ids=changed) if changed else ()
+        self.update(notes, removed=removed)
+
+    def _add(self, key, contribution, sign):
+        """
+        Add or subtract a contribution from the sums of its group
+
+        :param key: tuple - group key
+        :param contribution: tuple of float
+        :param sign: float - 1.0 to add, -1.0 to subtract
+        """
+        sums = self._groups.get(key)
+        if sums is None:
+            sums = [0.0] * _SIZE
+            self._groups[key] = sums
+        for position, value in enumerate(contribution):
+            sums[position] += sign * value
+        if sums[_COUNT] <= 0:
+            del self._groups[key]
+
+    def _contribution(self, note_json):
+        """
+        Compute the contribution of a note
+
+        :param note_json: dict
+        :returns: tuple (tuple - group key, tuple of float - contribution,
+                  tuple or None - cash flow parameters)
+        """
+        status = note_json.get('loanStatus')
+        contribution = _received(note_json)
+        outstanding = contribution[_OUTSTANDING]
+        loss_rate = self._loss_rates.get(status, DEFAULT_LOSS_RATE)
+
+        vintage = None
+        age = 0
+        issued = _parse_date(note_json.get('issueDate'))
+        if issued is not None:
+            vintage = '{}Q{}'.format(issued.year, (issued.month - 1) // 3 + 1)
+            age = max((self._as_of.year - issued.year) * 12 +
+                      self._as_of.month - issued.month, 0)
+        contribution[_EXPECTED_LOSS] = outstanding * loss_rate
+        contribution[_EXPOSURE] = \
+            (contribution[_INVESTED] + outstanding) / 2.0 * age / 12.0
+
+        portfolio = note_json.get('portfolioId')
+        portfolio = self._portfolio_names.get(portfolio, portfolio)
+        key = (note_json.get('grade'), portfolio, vintage)
+
+        schedule = None
+        length = note_json.get('loanLength')
+        if outstanding > 0 and length:
+            rate = (note_json.get('interestRate') or 0.0) / 1200.0
+            schedule = (outstanding, rate, max(length - age, 1),
+                        1.0 - loss_rate)
+        return key, tuple(contribution), schedule
+
+    def _metrics(self, sums):
+        """
+        Derive the metrics from the sums of the contributions
+
+        :param sums: list of float
+        :returns: dict
+        """
+        fees = sums[_PAYMENTS] * self._service_fee
+        net_return = 0.0
+        if sums[_EXPOSURE] > 0:
+            net_return = (sums[_INTEREST] - fees - sums[_LOSS]) / \
+                sums[_EXPOSURE]
+        charge_off_rate = 0.0
+        if sums[_INVESTED] > 0:
+            charge_off_rate = sums[_CHARGED_OFF] / sums[_INVESTED]
+        return {
+            'notes': int(round(sums[_COUNT])),
+            'invested': sums[_INVESTED],
+            'outstanding': sums[_OUTSTANDING],
+            'principal_received': sums[_PRINCIPAL],
+            'interest_received': sums[_INTEREST],
+            'fees': fees,
+            'charged_off': sums[_CHARGED_OFF],
+            'charge_off_rate': charge_off_rate,
+            'loss': sums[_LOSS],
+            'expected_loss': sums[_EXPECTED_LOSS],
+            'net_annualized_return': net_return,
+        }
+
+
+# Internal functions
+def _received(note_json):
+    """
+    Compute the part of the contribution of a note which only depends on
+    the amounts received so far
+
+    :param note_json: dict
+    :returns: list of float - contribution without the expected loss and
+              the exposure
+    """
+    invested = note_json.get('noteAmount') or 0.0
+    outstanding = note_json.get('principalPending') or 0.0
+    principal = note_json.get('principalReceived')
+    if principal is None:
+        principal = invested - outstanding
+
+    contribution = [0.0] * _SIZE
+    contribution[_COUNT] = 1.0
+    contribution[_INVESTED] = invested
+    contribution[_PRINCIPAL] = principal
+    contribution[_INTEREST] = note_json.get('interestReceived') or 0.0
+    contribution[_PAYMENTS] = note_json.get('paymentsReceived') or 0.0
+    if note_json.get('loanStatus') == NoteStatus.CHARGED_OFF.value:
+        contribution[_CHARGED_OFF] = invested
+        contribution[_LOSS] = max(invested - principal, 0.0)
+    else:
+        contribution[_OUTSTANDING] = outstanding
+    return contribution
+
+
+def _parse_date(value):
+    """
+    Parse the date of an ISO 8601 timestamp, e.g.
+    ``'2016-09-29T18:11:46.000-07:00'``
+
+    :param value: string or None
+    :returns: instance of :py:class:`datetime.date` or None
+    """
+    if not value:
+        return None
+    try:
+        return datetime.date(int(value[0:4]), int(value[5:7]),
+                             int(value[8:10]))
+    except ValueError:
+        return None
@@ -0,0 +1,233 @@
+# Filename: cache.py
+
+"""
+LendingClub2 Cache Module
+
+Interface classes:
+    FilterCache
+"""
+
+# Standard libraries
+import collections
+import itertools
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.filter import Filter
+
+
+# Constants
+FILTER_CACHE_SIZE = 100000
+
+
+# Interface classes
+class FilterCache:
+    """
+    Bounded cache of filter results, keyed by the filter identity, the loan
+    ID and the loan version. Between two searches, only the loans which are
+    new or changed are evaluated again, as well as every loan of a filter
+    whose state changed (see
+    :py:meth:`~lendingclub2.filter.Filter.generation`). The least recently
+    used results are evicted first.
+
+    The cache can be shared by several filters and listings, but not between
+    threads. The tokens of the filters are forgotten along with their last
+    cached result, so the cache stays bounded however many filters go
+    through it.
+    """
+    def __init__(self, max_size=FILTER_CACHE_SIZE):
+        """
+        Constructor
+
+        :param max_size: int - maximum number of cached results
+                         (default: FILTER_CACHE_SIZE)
+        """
+        if max_size < 1:
+            fstr = "max_size needs to be a positive number"
+            raise LCError(fstr)
+        self._max_size = max_size
+        self._entries = collections.OrderedDict()
+        # Filter mapped to its token, and token mapped to its filter and
+        # its number of cached results
+        self._tokens = dict()
+        self._filters = dict()
+        self._counter = itertools.count()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """
+        Get the number of cached results
+
+        :returns: int
+        """
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        """
+        Get the ratio of evaluations answered by the cache
+
+        :returns: float (0.0 - 1.0)
+        """
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / total
+
+    def clear(self):
+        """
+        Remove all cached results and reset the counters
+        """
+        self._entries.clear()
+        self._tokens.clear()
+        self._filters.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, filter_spec, loan):
+        """
+        Check if the loan is meeting the filter requirement, using the cached
+        result if the loan didn't change
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        return self._evaluate(self.token(filter_spec), filter_spec, loan)
+
+    def token(self, filter_spec):
+        """
+        Get the compact token standing for the identity of a filter in the
+        cache keys. Equivalent filters share the same token. Tokens are
+        never reused, so the results of a filter which is gone can't be
+        mistaken for the results of a new one.
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        :returns: int
+        """
+        token = self._tokens.get(filter_spec)
+        if token is None:
+            token = next(self._counter)
+            self._tokens[filter_spec] = token
+            self._filters[token] = [filter_spec, 0]
+        return token
+
+    def wrap(self, *filters):
+        """
+        Wrap filters so their results go through the cache
+
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: tuple of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return tuple(_CachedFilter(self, filter_spec)
+                     for filter_spec in filters)
+
+    def _evaluate(self, token, filter_spec, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param token: int - token of the filter
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        key = (token, loan.id, loan.version)
+        generation = filter_spec.generation()
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+            if entry[0] == generation:
+                self.hits += 1
+                return entry[1]
+
+        self.misses += 1
+        result = filter_spec.meet_requirement(loan)
+        entries[key] = (generation, result)
+        if entry is None:
+            self._count(token, 1)
+            if len(entries) > self._max_size:
+                evicted, _ = entries.popitem(last=False)
+                self._count(evicted[0], -1)
+        return result
+
+    def _count(self, token, delta):
+        """
+        Update the number of cached results of a token, and forget the
+        token once it has none left
+
+        :param token: int
+        :param delta: int
+        """
+        entry = self._filters.get(token)
+        if entry is None:
+            # Token of a wrapped filter which was already forgotten
+            entry = [None, 0]
+            self._filters[token] = entry
+        entry[1] += delta
+        if entry[1] <= 0:
+            del self._filters[token]
+            if entry[0] is not None and \
+                    self._tokens.get(entry[0]) == token:
+                del self._tokens[entry[0]]
+
+
+# Internal classes
+# pylint: disable=too-few-public-methods
+class _CachedFilter(Filter):
+    """
+    Filter answering through a cache
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, cache, filter_spec):
+        """
+        Constructor
+
+        :param cache: instance of :py:class:`~lendingclub2.cache.FilterCache`.
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        """
+        self._cache = cache
+        self._filter = filter_spec
+        self._token = cache.token(filter_spec)
+    # pylint: enable=super-init-not-called
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string or None if unknown
+        """
+        return self._filter.fields()
+
+    def generation(self):
+        """
+        Get the generation of the state the filter reads
+
+        :returns: hashable object or None if the filter has no state
+        """
+        return self._filter.generation()
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: instance of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return self._filter
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        # pylint: disable=protected-access
+        return self._cache._evaluate(self._token, self._filter, loan)
+        # pylint: enable=protected-access
+# pylint: enable=too-few-public-methods
@@ -0,0 +1,350 @@
+# Filename: combination.py
+
+"""
+LendingClub2 Combination Module
+
+Interface classes:
+    And
+    Not
+    Or
+"""
+
+# Standard libraries
+import time
+from abc import abstractmethod
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.filter import Filter, required_fields
+
+
+# Constants
+SAMPLE_EVERY = 32
+
+
+# Internal classes
+# pylint: disable=too-few-public-methods
+class _Combination(Filter):
+    """
+    Base class of the combinations of filters, which measures the cost and
+    the pass rate of each filter at runtime, and reorders them so the
+    cheapest and most decisive filters are evaluated first.
+
+    Only one call every ``sample_every`` evaluates all the filters and
+    measures them; the others short-circuit in the current order.
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, *filters, adaptive=True, sample_every=SAMPLE_EVERY):
+        """
+        Constructor
+
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :param adaptive: boolean - reorder the filters based on the
+                         measurements (default: True)
+        :param sample_every: int - measure the filters once every number of
+                             calls (default: SAMPLE_EVERY)
+        """
+        if not filters:
+            fstr = "{} needs at least one filter".format(
+                self.__class__.__name__)
+            raise LCError(fstr)
+        if sample_every < 1:
+            fstr = "sample_every needs to be a positive number"
+            raise LCError(fstr)
+
+        # Flatten nested combinations of the same kind
+        flattened = list()
+        for filter_spec in filters:
+            if not isinstance(filter_spec, Filter):
+                fstr = "{!r} is not an instance of Filter".format(filter_spec)
+                raise LCError(fstr)
+            if type(filter_spec) is type(self):
+                flattened.extend(filter_spec.filters)
+            else:
+                flattened.append(filter_spec)
+
+        self._filters = tuple(flattened)
+        self._adaptive = adaptive
+        self._sample_every = sample_every
+        self._calls = 0
+        # [evaluated, passed, seconds] of each filter, in the original order
+        self._stats = [[0, 0, 0.0] for _ in self._filters]
+        self._order = tuple(zip(self._filters, self._stats))
+        self._stateful = tuple(filter_spec for filter_spec in self._filters
+                               if filter_spec.generation() is not None)
+    # pylint: enable=super-init-not-called
+
+    @property
+    def adaptive(self):
+        """
+        Check if the filters are reordered based on the measurements
+
+        :returns: boolean
+        """
+        return self._adaptive
+
+    @property
+    def filters(self):
+        """
+        Get the combined filters, in their original order
+
+        :returns: tuple of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return self._filters
+
+    @property
+    def order(self):
+        """
+        Get the combined filters, in their current evaluation order
+
+        :returns: tuple of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return tuple(filter_spec for filter_spec, _ in self._order)
+
+    @property
+    def sample_every(self):
+        """
+        Get the number of calls between two measurements
+
+        :returns: int
+        """
+        return self._sample_every
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string or None if unknown
+        """
+        return required_fields(*self._filters)
+
+    def generation(self):
+        """
+        Get the generations of the combined filters having a state
+
+        :returns: tuple or None if none of the filters has a state
+        """
+        if not self._stateful:
+            return None
+        return tuple(filter_spec.generation()
+                     for filter_spec in self._stateful)
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: frozenset of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return frozenset(self._filters)
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        self._calls += 1
+        if self._adaptive and (self._calls - 1) % self._sample_every == 0:
+            return self._sample(loan)
+        return self._evaluate(loan)
+
+    def statistics(self):
+        """
+        Get the measurements of each filter
+
+        :returns: list of tuple (filter, number of sampled evaluations,
+                  number of sampled passes, total sampled seconds),
+                  in the original order
+        """
+        return [(filter_spec, stats[0], stats[1], stats[2])
+                for filter_spec, stats in zip(self._filters, self._stats)]
+
+    @abstractmethod
+    def _evaluate(self, loan):
+        """
+        Evaluate the filters in the current order with short-circuiting
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        return True
+
+    @abstractmethod
+    def _rank(self, stats):
+        """
+        Get the sort key of a filter, the lowest being evaluated first
+
+        :param stats: list [evaluated, passed, seconds]
+        :returns: float
+        """
+        return 0.0
+
+    def _sample(self, loan):
+        """
+        Evaluate and measure all the filters, then reorder them
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        results = list()
+        for filter_spec, stats in self._order:
+            start = time.perf_counter()
+            result = filter_spec.meet_requirement(loan)
+            stats[2] += time.perf_counter() - start
+            stats[0] += 1
+            if result:
+                stats[1] += 1
+            results.append(result)
+        self._order = tuple(sorted(self._order,
+                                   key=lambda item: self._rank(item[1])))
+        return self._combine(results)
+
+    @abstractmethod
+    def _combine(self, results):
+        """
+        Combine the results of all the filters
+
+        :param results: list of boolean
+        :returns: boolean
+        """
+        return True
+
+
+# Interface classes
+class And(_Combination):
+    """
+    Filter meeting all of the combined filters. Filters which are cheap and
+    reject most loans are evaluated first.
+    """
+    def _combine(self, results):
+        """
+        Combine the results of all the filters
+
+        :param results: list of boolean
+        :returns: boolean
+        """
+        return all(results)
+
+    def _evaluate(self, loan):
+        """
+        Evaluate the filters in the current order with short-circuiting
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        for filter_spec, _ in self._order:
+            if not filter_spec.meet_requirement(loan):
+                return False
+        return True
+
+    def _rank(self, stats):
+        """
+        Get the expected cost to reject a loan
+
+        :param stats: list [evaluated, passed, seconds]
+        :returns: float
+        """
+        evaluated, passed, seconds = stats
+        rejected = (evaluated - passed + 1.0) / (evaluated + 2.0)
+        return seconds / (evaluated + 1.0) / rejected
+
+
+class Not(Filter):
+    """
+    Filter meeting the opposite of another filter
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, filter_spec):
+        """
+        Constructor
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        """
+        if not isinstance(filter_spec, Filter):
+            fstr = "{!r} is not an instance of Filter".format(filter_spec)
+            raise LCError(fstr)
+        self._filter = filter_spec
+    # pylint: enable=super-init-not-called
+
+    def __invert__(self):
+        """
+        Negate the filter
+
+        :returns: the original instance of
+                  :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return self._filter
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string or None if unknown
+        """
+        return self._filter.fields()
+
+    def generation(self):
+        """
+        Get the generation of the state the negated filter reads
+
+        :returns: hashable object or None if the filter has no state
+        """
+        return self._filter.generation()
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: instance of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return self._filter
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        return not self._filter.meet_requirement(loan)
+
+
+class Or(_Combination):
+    """
+    Filter meeting at least one of the combined filters. Filters which are
+    cheap and accept most loans are evaluated first.
+    """
+    def _combine(self, results):
+        """
+        Combine the results of all the filters
+
+        :param results: list of boolean
+        :returns: boolean
+        """
+        return any(results)
+
+    def _evaluate(self, loan):
+        """
+        Evaluate the filters in the current order with short-circuiting
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        for filter_spec, _ in self._order:
+            if filter_spec.meet_requirement(loan):
+                return True
+        return False
+
+    def _rank(self, stats):
+        """
+        Get the expected cost to accept a loan
+
+        :param stats: list [evaluated, passed, seconds]
+        :returns: float
+        """
+        evaluated, passed, seconds = stats
+        accepted = (passed + 1.0) / (evaluated + 2.0)
+        return seconds / (evaluated + 1.0) / accepted
+# pylint: enable=too-few-public-methods
@@ -0,0 +1,306 @@
+# Filename: compiler.py
+
+"""
+LendingClub2 Compiler Module
+
+Interface classes:
+    CompiledFilter
+
+Interface functions:
+    compile_filters
+"""
+
+# Standard libraries
+import functools
+
+# lendingclub2
+from lendingclub2.combination import And, Not, Or
+from lendingclub2.error import LCError
+from lendingclub2.filter import (
+    BorrowerEmployedTrait, Filter, FilterByApproved, FilterByBorrowerTraits,
+    FilterByFunded, FilterByGrade, FilterByTerm, required_fields,
+)
+from lendingclub2.indexed import FilterByNotOwned, FilterByRange
+from lendingclub2.loan import Borrower
+
+
+# Constants
+COMPILE_CACHE_SIZE = 128
+
+
+# Interface classes
+# pylint: disable=too-few-public-methods
+class CompiledFilter(Filter):
+    """
+    Filter evaluating a tree of filters with a single generated function.
+
+    The built-in filters are translated to expressions reading the raw
+    listing fields directly, grades are checked with frozenset membership,
+    and borrower traits share one borrower per loan. Adaptive combinations
+    keep reordering their compiled children at runtime. Any other filter is
+    called as is from the generated function.
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, filters, source, function):
+        """
+        Constructor. Use :py:func:`~lendingclub2.compiler.compile_filters`
+        to get an instance.
+
+        :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+        :param source: string - source code of the generated function
+        :param function: callable accepting a loan
+        """
+        self._filters = filters
+        self.function = function
+        self.source = source
+        # Shadow the method to save a call per loan
+        self.meet_requirement = function
+        self._stateful = tuple(filter_spec for filter_spec in filters
+                               if filter_spec.generation() is not None)
+    # pylint: enable=super-init-not-called
+
+    @property
+    def filters(self):
+        """
+        Get the compiled filters
+
+        :returns: tuple of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return self._filters
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string or None if unknown
+        """
+        return required_fields(*self._filters)
+
+    def generation(self):
+        """
+        Get the generations of the compiled filters having a state
+
+        :returns: tuple or None if none of the filters has a state
+        """
+        if not self._stateful:
+            return None
+        return tuple(filter_spec.generation()
+                     for filter_spec in self._stateful)
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: frozenset of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        return frozenset(self._filters)
+
+    # pylint: disable=method-hidden
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting all the compiled filters
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        return self.function(loan)
+    # pylint: enable=method-hidden
+# pylint: enable=too-few-public-methods
+
+
+# Interface functions
+def compile_filters(*filters):
+    """
+    Compile filters into a single filter. If multiple filters are specified,
+    the loan has to meet all of them. Compiled filters are cached, so
+    compiling equivalent filters again is free.
+
+    :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+    :returns: instance of :py:class:`~lendingclub2.compiler.CompiledFilter`.
+    """
+    if not filters:
+        fstr = "at least one filter needs to be compiled"
+        raise LCError(fstr)
+    for filter_spec in filters:
+        if not isinstance(filter_spec, Filter):
+            fstr = "{!r} is not an instance of Filter".format(filter_spec)
+            raise LCError(fstr)
+    filters = tuple(filters)
+    return _compile(filters, _layout(filters))
+
+
+# Internal classes
+class _Generator:
+    """
+    Generate the expression of a tree of filters
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.constants = dict()
+        self.needs_borrower = False
+
+    def constant(self, value):
+        """
+        Bind a value to a name in the namespace of the generated function
+
+        :param value: any object
+        :returns: string - name of the value
+        """
+        name = '_c{}'.format(len(self.constants))
+        self.constants[name] = value
+        return name
+
+    # pylint: disable=too-many-return-statements
+    def expression(self, filter_spec):
+        """
+        Get the expression evaluating a filter
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        :returns: string
+        """
+        # Exact type checks, subclasses may override the behaviour
+        filter_type = type(filter_spec)
+        if filter_type in (And, Or):
+            return self.combination_expression(filter_spec)
+        if filter_type is Not:
+            return '(not {})'.format(self.expression(~filter_spec))
+        if filter_type is FilterByApproved:
+            return "(r['reviewStatus'] == 'APPROVED')"
+        if filter_type is FilterByGrade:
+            grades = filter_spec.identity()
+            if not grades:
+                return 'False'
+            return "(r['grade'] in {})".format(self.constant(grades))
+        if filter_type is FilterByFunded:
+            percentage = filter_spec.identity()[0]
+            return "(r['fundedAmount'] * 100.0 / r['loanAmount'] >= " \
+                   "{})".format(self.constant(percentage))
+        if filter_type is FilterByTerm:
+            value, min_value, max_value = filter_spec.identity()
+            if value is not None:
+                return "(r['term'] == {})".format(self.constant(value))
+            return "({} <= r['term'] <= {})".format(
+                self.constant(min_value), self.constant(max_value))
+        if filter_type is FilterByNotOwned:
+            return "(r['id'] not in {})".format(
+                self.constant(filter_spec.owned))
+        if filter_type is FilterByRange:
+            return self.range_expression(filter_spec)
+        if filter_type is FilterByBorrowerTraits:
+            traits = [self.trait_expression(trait)
+                      for trait in filter_spec.traits]
+            return '(' + ' and '.join(traits or ['True']) + ')'
+        return '{}.meet_requirement(loan)'.format(self.constant(filter_spec))
+    # pylint: enable=too-many-return-statements
+
+    def combination_expression(self, filter_spec):
+        """
+        Get the expression evaluating an And or an Or. The children of an
+        adaptive combination are compiled separately and combined again, so
+        they keep being reordered at runtime. The others are inlined in
+        their order.
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.combination.And` or
+                            :py:class:`~lendingclub2.combination.Or`.
+        :returns: string
+        """
+        if filter_spec.adaptive:
+            combination = type(filter_spec)(
+                *[_compile((child, ), _layout((child, )))
+                  for child in filter_spec.filters],
+                sample_every=filter_spec.sample_every)
+            return '{}.meet_requirement(loan)'.format(
+                self.constant(combination))
+        operator = ' and ' if isinstance(filter_spec, And) else ' or '
+        return '(' + operator.join(self.expression(child)
+                                   for child in filter_spec.filters) + ')'
+
+    def range_expression(self, filter_spec):
+        """
+        Get the expression evaluating a range filter
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.indexed.FilterByRange`.
+        :returns: string
+        """
+        value = "r.get({!r})".format(filter_spec.field)
+        conditions = ['{} is not None'.format(value)]
+        if filter_spec.min_value is not None:
+            conditions.append('{} >= {}'.format(
+                value, self.constant(filter_spec.min_value)))
+        if filter_spec.max_value is not None:
+            conditions.append('{} <= {}'.format(
+                value, self.constant(filter_spec.max_value)))
+        return '(' + ' and '.join(conditions) + ')'
+
+    def trait_expression(self, trait):
+        """
+        Get the expression evaluating a borrower trait
+
+        :param trait: instance of
+                      :py:class:`~lendingclub2.filter.BorrowerTrait`.
+        :returns: string
+        """
+        # Subclasses may override the behaviour
+        if isinstance(trait, BorrowerEmployedTrait) and \
+                type(trait).matches is BorrowerEmployedTrait.matches:
+            return "(r['empLength'] is not None and r['empLength'] >= 0)"
+        self.needs_borrower = True
+        return '{}.matches(b)'.format(self.constant(trait))
+
+
+# Internal functions
+# pylint: disable=unused-argument
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile(filters, layout):
+    """
+    Generate and compile the function evaluating the filters
+
+    :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+    :param layout: tuple - see :py:func:`_layout`, only part of the key of
+                   the cache
+    :returns: instance of :py:class:`~lendingclub2.compiler.CompiledFilter`.
+    """
+    generator = _Generator()
+    expression = ' and '.join(generator.expression(filter_spec)
+                              for filter_spec in filters)
+
+    lines = ['def compiled_filter(loan):',
+             '    r = loan._response']
+    if generator.needs_borrower:
+        lines.append('    b = _Borrower(r)')
+    lines.append('    return {}'.format(expression))
+    source = '\n'.join(lines) + '\n'
+
+    namespace = dict(generator.constants)
+    namespace['_Borrower'] = Borrower
+    # pylint: disable=exec-used
+    exec(compile(source, '<compiled filter>', 'exec'), namespace)
+    # pylint: enable=exec-used
+    return CompiledFilter(filters, source, namespace['compiled_filter'])
+# pylint: enable=unused-argument
+
+
+def _layout(filters):
+    """
+    Get the evaluation settings of the combinations among the filters,
+    which change the generated function but aren't part of the identity of
+    the combinations
+
+    :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+    :returns: tuple
+    """
+    layout = list()
+    for filter_spec in filters:
+        if isinstance(filter_spec, (And, Or)):
+            layout.append((filter_spec.adaptive, filter_spec.sample_every,
+                           _layout(filter_spec.filters)))
+        elif isinstance(filter_spec, Not):
+            layout.append(_layout((~filter_spec, )))
+        else:
+            layout.append(None)
+    return tuple(layout)
@@ -0,0 +1,287 @@
+# Filename: database.py
+
+"""
+LendingClub2 Database Module
+
+Interface classes:
+    NotesDatabase
+"""
+
+# Standard libraries
+import contextlib
+import json
+import sqlite3
+import time
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.response.notes import Note, Notes, NotesStore
+
+
+# Constants
+SQLITE_MAX_PARAMETERS = 500
+SQLITE_TIMEOUT = 30.0
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS notes (
+        note_id INTEGER PRIMARY KEY,
+        loan_id INTEGER,
+        grade TEXT,
+        status TEXT,
+        summary TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        detailed INTEGER NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS notes_loan_id ON notes (loan_id)',
+    'CREATE INDEX IF NOT EXISTS notes_grade ON notes (grade)',
+    'CREATE INDEX IF NOT EXISTS notes_status ON notes (status)',
+    '''CREATE TABLE IF NOT EXISTS metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )''',
+)
+
+
+class NotesDatabase:
+    """
+    Local copy of the notes of an account, stored in a SQLite database and
+    keyed by note ID.
+
+    :py:meth:`~lendingclub2.database.NotesDatabase.sync` requests the
+    lighter notes endpoint and compares each note with its stored copy. The
+    detailed notes are only requested when a note is new or changed, and
+    only those notes are written. The IDs of the changed and removed notes
+    are kept in ``last_changes``. The database can be read from other
+    processes, without any request, while it's being synchronized.
+    """
+    def __init__(self, path):
+        """
+        Constructor
+
+        :param path: string - path of the SQLite database, created if it
+                     doesn't exist
+        """
+        self._path = path
+        self.last_changes = ((), ())
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    def __len__(self):
+        """
+        Find the number of stored notes
+
+        :returns: int
+        """
+        with self._connect() as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM notes').fetchone()[0]
+
+    @property
+    def last_sync(self):
+        """
+        Get the time of the last synchronization
+
+        :returns: float - seconds since the epoch or None if the database
+                  was never synchronized
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM metadata WHERE key = 'last_sync'"
+            ).fetchone()
+        if row is None:
+            return None
+        return float(row[0])
+
+    def notes(self, grade=None, status=None, loan_id=None, note_ids=None):
+        """
+        Get the stored notes matching all the given criteria
+
+        :param grade: string (default: None, any grade)
+        :param status: string (default: None, any status)
+        :param loan_id: int (default: None, any loan)
+        :param note_ids: iterable of int (default: None, any note)
+        :returns: list of :py:class:`~lendingclub2.response.notes.Note`.
+        """
+        conditions = list()
+        parameters = list()
+        for column, value in (('grade', grade), ('status', status),
+                              ('loan_id', loan_id)):
+            if value is not None:
+                conditions.append('{} = ?'.format(column))
+                parameters.append(value)
+
+        if note_ids is None:
+            batches = [()]
+        else:
+            note_ids = sorted(set(note_ids))
+            batches = [note_ids[start:start + SQLITE_MAX_PARAMETERS]
+                       for start in range(0, len(note_ids),
+                                          SQLITE_MAX_PARAMETERS)]
+
+        rows = list()
+        with self._connect() as connection:
+            for batch in batches:
+                batch_conditions = list(conditions)
+                if note_ids is not None:
+                    batch_conditions.append('note_id IN ({})'.format(
+                        ', '.join('?' * len(batch))))
+                query = 'SELECT payload FROM notes'
+                if batch_conditions:
+                    query += ' WHERE ' + ' AND '.join(batch_conditions)
+                query += ' ORDER BY note_id'
+                rows.extend(connection.execute(
+                    query, parameters + list(batch)).fetchall())
+        return [Note(json.loads(row[0])) for row in rows]
+
+    def store(self, grade=None, status=None, loan_id=None):
+        """
+        Get the stored notes matching all the given criteria in a columnar
+        representation
+
+        :param grade: string (default: None, any grade)
+        :param status: string (default: None, any status)
+        :param loan_id: int (default: None, any loan)
+        :returns: instance of
+                  :py:class:`~lendingclub2.response.notes.NotesStore`.
+        """
+        return NotesStore(self.notes(grade=grade, status=status,
+                                     loan_id=loan_id))
+
+    def sync(self, investor_id, detailed=True):
+        """
+        Apply the changes of the notes of the account to the database
+
+        :param investor_id: int
+        :param detailed: boolean - store the detailed notes; otherwise only
+                         the fields of the notes endpoint are stored and the
+                         detailed notes are never requested (default: True)
+        :returns: tuple (int - number of added notes, int - number of
+                  updated notes, int - number of removed notes)
+        """
+        with self._connect() as connection:
+            stored = {
+                note_id: (summary, bool(is_detailed))
+                for note_id, summary, is_detailed in connection.execute(
+                    'SELECT note_id, summary, detailed FROM notes')
+            }
+        notes, changed = _fetch_changes(investor_id, stored, detailed)
+        current = {note.id for note in notes}
+        removed = [note_id for note_id in stored if note_id not in current]
+        rows = _rows(notes, changed)
+
+        with self._connect() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows)
+            connection.executemany('DELETE FROM notes WHERE note_id = ?',
+                                   [(note_id, ) for note_id in removed])
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata VALUES ('last_sync', ?)",
+                (repr(time.time()), ))
+
+        self.last_changes = (tuple(changed), tuple(removed))
+        added = sum(1 for note_id in changed if note_id not in stored)
+        return added, len(changed) - added, len(removed)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """
+        Open a connection to the database for a single transaction.
+        Connections aren't shared, so the database can be used from several
+        threads.
+
+        :returns: context manager of :py:class:`sqlite3.Connection`.
+        """
+        connection = sqlite3.connect(self._path, timeout=SQLITE_TIMEOUT)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+# Internal functions
+def _fetch_changes(investor_id, stored, detailed):
+    """
+    Request the notes of the account and find the ones which are new or
+    changed. The notes endpoint is compared with the stored notes first,
+    and the details are only merged into the changed notes.
+
+    :param investor_id: int
+    :param stored: dict - note ID mapped to a tuple (string - stored
+                   summary, boolean - the stored note is detailed)
+    :param detailed: boolean - request the detailed notes of the changed
+                     notes, and of the stored notes which aren't detailed
+    :returns: tuple (instance of
+              :py:class:`~lendingclub2.response.notes.Notes`, dict - ID of
+              the changed notes mapped to their summary, in order)
+    """
+    changed = dict()
+
+    def needs_detail(note):
+        """
+        Compare a note of the notes endpoint with its stored copy
+
+        :param note: instance of
+                     :py:class:`~lendingclub2.response.notes.Note`.
+        :returns: boolean - the note is new or changed
+        """
+        # pylint: disable=protected-access
+        summary = _dumps(note._response)
+        # pylint: enable=protected-access
+        previous = stored.get(note.id)
+        if previous is None or previous[0] != summary or \
+                (detailed and not previous[1]):
+            changed[note.id] = summary
+            return True
+        return False
+
+    if detailed:
+        notes = Notes(investor_id, detailed=True, needs_detail=needs_detail)
+    else:
+        notes = Notes(investor_id, detailed=False)
+        for note in notes:
+            needs_detail(note)
+    if not notes.successful:
+        fstr = "cannot retrieve the notes of the account"
+        raise LCError(fstr)
+    return notes, changed
+
+
+def _rows(notes, changed):
+    """
+    Build the rows of the changed notes
+
+    :param notes: instance of
+                  :py:class:`~lendingclub2.response.notes.Notes`.
+    :param changed: dict - ID of the changed notes mapped to their summary
+    :returns: list of tuple
+    """
+    rows = list()
+    for note in notes:
+        summary = changed.get(note.id)
+        if summary is None:
+            continue
+        # pylint: disable=protected-access
+        payload_json = note._response
+        # pylint: enable=protected-access
+        payload = _dumps(payload_json)
+        # The payload only differs from the summary once the details were
+        # merged into it
+        rows.append((note.id, payload_json.get('loanId'),
+                     payload_json.get('grade'),
+                     payload_json.get('loanStatus'), summary, payload,
+                     int(payload != summary)))
+    return rows
+
+
+def _dumps(note_json):
+    """
+    Serialize a note in a canonical form, so equal notes compare equal
+
+    :param note_json: dict
+    :returns: string
+    """
+    return json.dumps(note_json, sort_keys=True)
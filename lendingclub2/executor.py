@@ -0,0 +1,116 @@
+# Filename: executor.py
+
+"""
+LendingClub2 Executor Module
+
+Interface classes:
+    OrderExecutor
+"""
+
+# Standard libraries
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.response.order import (
+    Order, OrderConfirmation, validate_notes,
+)
+
+
+# Constants
+ORDER_BATCH_SIZE = 100
+
+
+class OrderExecutor:
+    """
+    Submit orders in batches and report the outcome of each note.
+
+    Large orders are split into batches of at most ``batch_size`` notes, as
+    evenly sized as possible. Every batch goes through the request rate
+    limiter; the batches of an account are submitted one after the other,
+    and different accounts are submitted concurrently. A batch rejected by
+    the API doesn't stop the next ones, its notes are reported as not
+    confirmed. Neither does a batch whose request failed, e.g. because the
+    connection dropped: it may have been filled anyway, so its notes are
+    reported with an unknown outcome (see
+    :py:attr:`~lendingclub2.response.order.OrderConfirmation.unknown`). The
+    confirmations of the batches already filled are always returned.
+    """
+    def __init__(self, batch_size=ORDER_BATCH_SIZE, workers=None):
+        """
+        Constructor
+
+        :param batch_size: int - maximum number of notes per request
+                           (default: ORDER_BATCH_SIZE)
+        :param workers: int - maximum number of accounts submitted
+                        concurrently (default: None, one per account)
+        """
+        if batch_size < 1:
+            fstr = "batch_size needs to be a positive number"
+            raise LCError(fstr)
+        self._batch_size = batch_size
+        self._workers = workers
+
+    def batches(self, order_notes):
+        """
+        Split the notes into evenly sized batches
+
+        :param order_notes: list of
+                            :py:class:`~lendingclub2.response.order.OrderNote`.
+        :returns: list of list of
+                  :py:class:`~lendingclub2.response.order.OrderNote`.
+        """
+        if not order_notes:
+            return []
+        count = math.ceil(len(order_notes) / self._batch_size)
+        size = math.ceil(len(order_notes) / count)
+        return [order_notes[start:start + size]
+                for start in range(0, len(order_notes), size)]
+
+    def submit(self, investor_id, *order_notes):
+        """
+        Submit the order of an account
+
+        :param investor_id: int
+        :param order_notes: iterable of
+                            :py:class:`~lendingclub2.response.order.OrderNote`.
+        :returns: list of
+                  :py:class:`~lendingclub2.response.order.OrderConfirmation`
+                  in the order of the notes
+        """
+        order_notes = validate_notes(order_notes)
+        confirmations = list()
+        for batch in self.batches(order_notes):
+            try:
+                confirmations.extend(Order(investor_id, *batch).confirmations)
+            except LCError:
+                confirmations.extend(OrderConfirmation(order_note,
+                                                       unknown=True)
+                                     for order_note in batch)
+        return confirmations
+
+    def submit_many(self, orders):
+        """
+        Submit the orders of several accounts concurrently
+
+        :param orders: dict - investor ID mapped to an iterable of
+                       :py:class:`~lendingclub2.response.order.OrderNote`.
+        :returns: dict - investor ID mapped to a list of
+                  :py:class:`~lendingclub2.response.order.OrderConfirmation`
+                  in the order of the notes
+        """
+        orders = {investor_id: validate_notes(order_notes)
+                  for investor_id, order_notes in orders.items()}
+        if not orders:
+            return dict()
+
+        workers = self._workers or len(orders)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                investor_id: executor.submit(self.submit, investor_id,
+                                             *order_notes)
+                for investor_id, order_notes in orders.items()
+            }
+            return {investor_id: future.result()
+                    for investor_id, future in futures.items()}
@@ -0,0 +1,208 @@
+# Filename: exposure.py
+
+"""
+LendingClub2 Exposure Module
+
+Interface classes:
+    ExposureLimits
+"""
+
+# lendingclub2
+from lendingclub2.config import NoteStatus
+from lendingclub2.error import LCError
+
+
+# Constants
+# Dimension mapped to the raw field of the listing and of the notes
+DIMENSIONS = {
+    'grade': ('grade', 'grade'),
+    'purpose': ('purpose', 'purpose'),
+    'state': ('addrState', 'addrState'),
+    'term': ('term', 'loanLength'),
+}
+
+
+class ExposureLimits:
+    """
+    Diversification limits by grade, purpose, address state and term,
+    checked against running exposure counters.
+
+    The counters are seeded with the outstanding principal of the notes
+    (or their amount when the principal isn't known), and updated with the
+    pending orders as they're allocated and filled, so checking a candidate
+    only reads a counter per limited dimension. The notes need a value for
+    every limited dimension, e.g. the purpose and the address state aren't
+    part of the notes endpoint.
+
+    Limits are either amounts for specific values, e.g.
+    ``max_amount={'grade': {'E': 500, 'F': 0}}``, or shares of the total
+    exposure for every value, e.g. ``max_share={'state': 0.1}``. Shares are
+    computed against the total exposure or ``base``, whichever is larger,
+    so a small portfolio can still grow, e.g. with ``base`` set to the
+    total exposure plus the available cash.
+    """
+    def __init__(self, notes=(), max_amount=None, max_share=None, base=0.0):
+        """
+        Constructor
+
+        :param notes: iterable of
+                      :py:class:`~lendingclub2.response.notes.Note`, e.g.
+                      instance of :py:class:`~lendingclub2.response.notes.Notes`
+                      (default: empty)
+        :param max_amount: dict - dimension (see DIMENSIONS) mapped to a dict
+                           of value and its maximum exposure (default: None)
+        :param max_share: dict - dimension (see DIMENSIONS) mapped to the
+                          maximum share (0.0 - 1.0) of the total exposure of
+                          any of its values (default: None)
+        :param base: float - minimum amount the shares are computed against
+                     (default: 0.0)
+        :raises LCError: if a note has no value for a limited dimension
+        """
+        self._max_amount = dict(max_amount or ())
+        self._max_share = dict(max_share or ())
+        for dimension in set(self._max_amount) | set(self._max_share):
+            if dimension not in DIMENSIONS:
+                fstr = "unknown exposure dimension: {}".format(dimension)
+                raise LCError(fstr)
+        for share in self._max_share.values():
+            if not 0.0 < share <= 1.0:
+                fstr = "max_share needs to be between 0.0 and 1.0"
+                raise LCError(fstr)
+
+        # Limited dimensions with their raw field in the listing and in the
+        # notes
+        self._dimensions = tuple(
+            (dimension, ) + DIMENSIONS[dimension]
+            for dimension in sorted(set(self._max_amount) |
+                                    set(self._max_share)))
+        self._exposure = {dimension: dict()
+                          for dimension, _, _ in self._dimensions}
+        self._pending = dict()
+        self.base = base
+        self.total = 0.0
+        for note in notes:
+            self.add_note(note)
+
+    def add(self, loan, amount):
+        """
+        Record a pending order
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :param amount: float
+        """
+        values = self._values(loan)
+        previous = self._pending.get(loan.id)
+        if previous is not None:
+            amount += previous[1]
+            self._apply(previous[0], -previous[1])
+        self._pending[loan.id] = (values, amount)
+        self._apply(values, amount)
+
+    def add_note(self, note):
+        """
+        Record an owned note
+
+        :param note: instance of :py:class:`~lendingclub2.response.notes.Note`.
+        :raises LCError: if the note has no value for a limited dimension
+        """
+        amount = note.field('principalPending')
+        if amount is None:
+            if note.field('loanStatus') in (NoteStatus.FULLY_PAID.value,
+                                            NoteStatus.CHARGED_OFF.value):
+                return
+            amount = note.field('noteAmount') or 0.0
+        values = tuple(note.field(field)
+                       for _, _, field in self._dimensions)
+        for (dimension, _, field), value in zip(self._dimensions, values):
+            if value is None:
+                fstr = "note {} has no {}, its {} exposure is " \
+                       "unknown".format(note.id, field, dimension)
+                hint = "use notes including {}, e.g. the detailed notes, " \
+                       "or don't limit the {}".format(field, dimension)
+                raise LCError(fstr, hint=hint)
+        self._apply(values, amount)
+
+    def allows(self, loan, amount):
+        """
+        Check if an amount can be invested in a loan within the limits
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :param amount: float
+        :returns: boolean
+        """
+        return amount <= self.headroom(loan)
+
+    def exposure(self, dimension):
+        """
+        Get the current exposure of each value of a limited dimension
+
+        :param dimension: string - see DIMENSIONS
+        :returns: dict - value mapped to the amount
+        """
+        return dict(self._exposure[dimension])
+
+    def fill(self, confirmations):
+        """
+        Replace the pending orders with the amounts actually invested. The
+        orders whose outcome is unknown stay pending with their requested
+        amount.
+
+        :param confirmations: iterable of
+                              :py:class:`~lendingclub2.response.order.OrderConfirmation`.
+        """
+        for confirmation in confirmations:
+            if confirmation.unknown:
+                continue
+            pending = self._pending.pop(confirmation.loan_id, None)
+            if pending is None:
+                continue
+            values, amount = pending
+            self._apply(values, confirmation.invested_amount - amount)
+
+    def headroom(self, loan):
+        """
+        Get the maximum amount which can still be invested in a loan
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: float - infinite if the loan isn't limited
+        """
+        headroom = float('inf')
+        total = self.total
+        for dimension, field, _ in self._dimensions:
+            value = loan.field(field)
+            current = self._exposure[dimension].get(value, 0.0)
+
+            limits = self._max_amount.get(dimension)
+            if limits is not None and value in limits:
+                headroom = min(headroom, limits[value] - current)
+
+            share = self._max_share.get(dimension)
+            if share is not None and share < 1.0:
+                # current + x <= share * max(total + x, base)
+                headroom = min(headroom, max(
+                    (share * total - current) / (1.0 - share),
+                    share * self.base - current))
+        return max(headroom, 0.0)
+
+    def _apply(self, values, amount):
+        """
+        Add an amount to the exposure counters
+
+        :param values: tuple - value of each limited dimension
+        :param amount: float - negative to subtract
+        """
+        self.total += amount
+        for (dimension, _, _), value in zip(self._dimensions, values):
+            if value is None:
+                continue
+            exposure = self._exposure[dimension]
+            exposure[value] = exposure.get(value, 0.0) + amount
+
+    def _values(self, loan):
+        """
+        Get the value of each limited dimension for a loan
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: tuple
+        """
+        return tuple(loan.field(field) for _, field, _ in self._dimensions)
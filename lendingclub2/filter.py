@@ -12,6 +12,7 @@ from abc import ABC
 
 # lendingclub2
 from lendingclub2.error import LCError
+from lendingclub2.index import TextIndex
 
 
 # pylint: disable=too-few-public-methods
@@ -19,6 +20,45 @@ class BorrowerTrait(ABC):
     """
     Abstract base class to define borrowers of interest
     """
+    def __eq__(self, other):
+        """
+        Check if two traits are equivalent
+
+        :param other: instance of
+                      :py:class:`~lendingclub2.filter.BorrowerTrait`.
+        :returns: boolean
+        """
+        if type(self) is not type(other):
+            return False
+        return self.identity() == other.identity()
+
+    def __hash__(self):
+        """
+        Get the hash of the trait
+
+        :returns: int
+        """
+        return hash((type(self), self.identity()))
+
+    def fields(self):
+        """
+        Get the raw listing fields the trait reads. By default the fields
+        are unknown, which means every field is needed.
+
+        :returns: frozenset of string or None if unknown
+        """
+        return None
+
+    def identity(self):
+        """
+        Get the parameters making the trait unique. Two traits of the same
+        type with the same identity are equivalent. By default, every
+        instance is unique.
+
+        :returns: hashable object
+        """
+        return id(self)
+
     @abstractmethod
     def matches(self, borrower):
         """
@@ -34,6 +74,22 @@ class BorrowerEmployedTrait(BorrowerTrait):
     """
     Check if borrower is employed
     """
+    def fields(self):
+        """
+        Get the raw listing fields the trait reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('empLength', ))
+
+    def identity(self):
+        """
+        Get the parameters making the trait unique
+
+        :returns: tuple
+        """
+        return ()
+
     def matches(self, borrower):
         """
         Check if borrower has the trait
@@ -48,6 +104,91 @@ class Filter(ABC):
     """
     Abstract base class for filtering the loan
     """
+    def __eq__(self, other):
+        """
+        Check if two filters are equivalent
+
+        :param other: instance of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: boolean
+        """
+        if type(self) is not type(other):
+            return False
+        return self.identity() == other.identity()
+
+    def __hash__(self):
+        """
+        Get the hash of the filter
+
+        :returns: int
+        """
+        return hash((type(self), self.identity()))
+
+    def __and__(self, other):
+        """
+        Combine two filters, both of which have to be met
+
+        :param other: instance of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: instance of :py:class:`~lendingclub2.combination.And`.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        # The combinations are filters themselves
+        from lendingclub2.combination import And
+        if not isinstance(other, Filter):
+            return NotImplemented
+        return And(self, other)
+
+    def __invert__(self):
+        """
+        Negate the filter
+
+        :returns: instance of :py:class:`~lendingclub2.combination.Not`.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from lendingclub2.combination import Not
+        return Not(self)
+
+    def __or__(self, other):
+        """
+        Combine two filters, at least one of which has to be met
+
+        :param other: instance of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: instance of :py:class:`~lendingclub2.combination.Or`.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from lendingclub2.combination import Or
+        if not isinstance(other, Filter):
+            return NotImplemented
+        return Or(self, other)
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads. By default the fields
+        are unknown, which means every field is needed.
+
+        :returns: frozenset of string or None if unknown
+        """
+        return None
+
+    def generation(self):
+        """
+        Get the generation of the state the filter reads besides the loan,
+        e.g. the owned loans. Cached results of an older generation aren't
+        reused. By default, the filter only reads the loan.
+
+        :returns: hashable object or None if the filter has no state
+        """
+        return None
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique. Two filters of the same
+        type with the same identity select the same loans. By default, every
+        instance is unique.
+
+        :returns: hashable object
+        """
+        return id(self)
+
     @abstractmethod
     def meet_requirement(self, loan):
         """
@@ -63,6 +204,22 @@ class FilterByApproved(Filter):
     """
     Filter by if the loan is already approved
     """
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('reviewStatus', ))
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: tuple
+        """
+        return ()
+
     def meet_requirement(self, loan):
         """
         Check if the loan is meeting the filter requirement
@@ -88,7 +245,7 @@ class FilterByBorrowerTraits(Filter):
                        :py:class:`~lendingclub2.filter.BorrowerTrait`.
         """
         if isinstance(traits, collections.abc.Iterable):
-            self._specs = traits
+            self._specs = tuple(traits)
         elif isinstance(traits, BorrowerTrait):
             self._specs = (traits, )
         else:
@@ -96,6 +253,37 @@ class FilterByBorrowerTraits(Filter):
             raise LCError(fstr)
     # pylint: enable=super-init-not-called
 
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string or None if unknown
+        """
+        fields = set()
+        for spec in self._specs:
+            spec_fields = spec.fields()
+            if spec_fields is None:
+                return None
+            fields.update(spec_fields)
+        return frozenset(fields)
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: frozenset of :py:class:`~lendingclub2.filter.BorrowerTrait`.
+        """
+        return frozenset(self._specs)
+
+    @property
+    def traits(self):
+        """
+        Get the traits the borrower needs to have
+
+        :returns: tuple of :py:class:`~lendingclub2.filter.BorrowerTrait`.
+        """
+        return self._specs
+
     def meet_requirement(self, loan):
         """
         Check if the loan is meeting the filter requirement
@@ -127,6 +315,22 @@ class FilterByFunded(Filter):
         self._percentage = percentage
     # pylint: enable=super-init-not-called
 
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('fundedAmount', 'loanAmount'))
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: tuple
+        """
+        return (self._percentage, )
+
     def meet_requirement(self, loan):
         """
         The loan would have to be at least the percentage value to meet the
@@ -152,6 +356,22 @@ class FilterByGrade(Filter):
         self._grades = grades
     # pylint: enable=super-init-not-called
 
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('grade', ))
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: frozenset of string
+        """
+        return frozenset(self._grades or ())
+
     def meet_requirement(self, loan):
         """
         Check if the loan is meeting the filter requirement
@@ -164,6 +384,93 @@ class FilterByGrade(Filter):
         return False
 
 
+class FilterByKeywords(Filter):
+    """
+    Filter by keywords in the loan description and the employment title of
+    the borrower. Terms are matched case-insensitively against whole words,
+    and a term ending with ``*`` matches every word starting with the rest
+    of the term.
+
+    If a :py:class:`~lendingclub2.index.TextIndex` is given, the matching
+    loans are looked up once in the index instead of scanning the text of
+    every loan. Loans missing from the index, or indexed with an older
+    content, are scanned.
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, all_of=(), any_of=(), none_of=(), index=None):
+        """
+        Constructor
+
+        :param all_of: iterable of string - terms which all need to match
+                       (default: ())
+        :param any_of: iterable of string - terms where at least one of them
+                       needs to match (default: ())
+        :param none_of: iterable of string - terms which must not match
+                        (default: ())
+        :param index: instance of :py:class:`~lendingclub2.index.TextIndex`
+                      (default: None)
+        """
+        for terms in (all_of, any_of, none_of):
+            if isinstance(terms, str):
+                fstr = "terms need to be an iterable of string"
+                hint = "use a tuple or list, e.g. ('car', )"
+                raise LCError(fstr, hint=hint)
+
+        self._all_of = tuple(term.lower() for term in all_of)
+        self._any_of = tuple(term.lower() for term in any_of)
+        self._none_of = tuple(term.lower() for term in none_of)
+        if not self._all_of and not self._any_of and not self._none_of:
+            fstr = "at least one term needs to be specified"
+            raise LCError(fstr)
+
+        self._index = index
+        self._scanner = index if index is not None else TextIndex()
+        self._matches = None
+        self._generation = None
+    # pylint: enable=super-init-not-called
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('desc', 'empTitle'))
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: tuple
+        """
+        return (frozenset(self._all_of), frozenset(self._any_of),
+                frozenset(self._none_of), id(self._index))
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        index = self._index
+        if index is not None and index.is_current(loan):
+            if self._generation != index.generation:
+                self._matches = index.query(self._all_of, self._any_of,
+                                            self._none_of)
+                self._generation = index.generation
+            return loan.id in self._matches
+
+        tokens = self._scanner.tokens(loan)
+        if not all(_term_matches(term, tokens) for term in self._all_of):
+            return False
+        if self._any_of and not any(_term_matches(term, tokens)
+                                    for term in self._any_of):
+            return False
+        return not any(_term_matches(term, tokens)
+                       for term in self._none_of)
+
+
 class FilterByTerm(Filter):
     """
     Filter by term
@@ -189,8 +496,8 @@ class FilterByTerm(Filter):
             raise LCError(fstr, details=details)
 
         if min_val is not None and max_val is not None:
-            if max_val > min_val:
-                fstr = "max_val cannot be greater than min_val"
+            if min_val > max_val:
+                fstr = "min_val cannot be greater than max_val"
                 raise LCError(fstr)
         elif value is None and (min_val is None or max_val is None):
             fstr = "invalid specification on the values"
@@ -202,6 +509,22 @@ class FilterByTerm(Filter):
         self._max_value = max_val
     # pylint: enable=super-init-not-called
 
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('term', ))
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: tuple
+        """
+        return (self._value, self._min_value, self._max_value)
+
     def meet_requirement(self, loan):
         """
         Check if the loan is meeting the filter requirement
@@ -212,4 +535,40 @@ class FilterByTerm(Filter):
         if self._value is not None:
             return loan.term == self._value
         return self._min_value <= loan.term <= self._max_value
+
+
 # pylint: enable=too-few-public-methods
+
+
+# Interface functions
+def required_fields(*filters):
+    """
+    Find the raw listing fields needed to evaluate all the filters, e.g. to
+    be used as the projection of :py:meth:`~lendingclub2.loan.Listing.search`.
+
+    :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+    :returns: frozenset of string or None if any of the filters doesn't
+              declare its fields
+    """
+    fields = set()
+    for filter_spec in filters:
+        filter_fields = filter_spec.fields()
+        if filter_fields is None:
+            return None
+        fields.update(filter_fields)
+    return frozenset(fields)
+
+
+# Internal functions
+def _term_matches(term, tokens):
+    """
+    Check if a term matches any of the tokens
+
+    :param term: string - lowercase token, or prefix followed by ``*``
+    :param tokens: set of string
+    :returns: boolean
+    """
+    if not term.endswith('*'):
+        return term in tokens
+    prefix = term[:-1]
+    return any(token.startswith(prefix) for token in tokens)
@@ -0,0 +1,350 @@
+# Filename: index.py
+
+"""
+LendingClub2 Index Module
+
+Interface classes:
+    OwnedLoans
+    SortedIndex
+    TextIndex
+
+Interface functions:
+    tokenize
+"""
+
+# Standard libraries
+import bisect
+import re
+from operator import attrgetter
+
+# lendingclub2
+from lendingclub2.error import LCError
+
+
+# Constants
+TEXT_ATTRIBUTES = ('description', 'borrower.title')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+# Interface classes
+class OwnedLoans:
+    """
+    Set of the IDs of the loans the account already has notes of, so each
+    loan of a listing is checked in constant time instead of going through
+    all the notes.
+    """
+    def __init__(self, notes=()):
+        """
+        Constructor
+
+        :param notes: iterable of
+                      :py:class:`~lendingclub2.response.notes.Note`, e.g.
+                      instance of :py:class:`~lendingclub2.response.notes.Notes`
+                      (default: empty)
+        """
+        self._loan_ids = {note.loan_id for note in notes}
+        self.generation = 0
+
+    def __contains__(self, loan_id):
+        """
+        Check if the account owns a note of the loan
+
+        :param loan_id: int
+        :returns: boolean
+        """
+        return loan_id in self._loan_ids
+
+    def __len__(self):
+        """
+        Get the number of owned loans
+
+        :returns: int
+        """
+        return len(self._loan_ids)
+
+    def add(self, *loan_ids):
+        """
+        Record loans as owned, e.g. after a successful order
+
+        :param loan_ids: iterable of int
+        """
+        before = len(self._loan_ids)
+        self._loan_ids.update(loan_ids)
+        if len(self._loan_ids) != before:
+            self.generation += 1
+
+    def remove(self, *loan_ids):
+        """
+        Record loans as not owned anymore
+
+        :param loan_ids: iterable of int
+        """
+        before = len(self._loan_ids)
+        self._loan_ids.difference_update(loan_ids)
+        if len(self._loan_ids) != before:
+            self.generation += 1
+
+
+class SortedIndex:
+    """
+    Positions of the loans of a listing sorted by the value of a raw listing
+    field, so a range of values is found with a binary search. Loans without
+    a value for the field are left out of the index.
+    """
+    def __init__(self, loans, field, generation=0):
+        """
+        Constructor
+
+        :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+        :param field: string - raw listing field name (e.g. ``'intRate'``)
+        :param generation: int - generation of the listing the loans belong
+                           to, the index is only valid as long as it doesn't
+                           change (default: 0)
+        """
+        # pylint: disable=protected-access
+        entries = sorted((loan._response[field], position)
+                         for position, loan in enumerate(loans)
+                         if loan._response.get(field) is not None)
+        # pylint: enable=protected-access
+        self.field = field
+        self.loans = loans
+        self.generation = generation
+        self._size = len(loans)
+        self._values = [value for value, _ in entries]
+        self._positions = [position for _, position in entries]
+
+    def __len__(self):
+        """
+        Get the number of indexed loans
+
+        :returns: int
+        """
+        return len(self._values)
+
+    def is_current(self, loans, generation):
+        """
+        Check if the index was built from the loans, i.e. the listing
+        wasn't sorted nor were its loans assigned since then
+
+        :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+        :param generation: int - current generation of the listing
+        :returns: boolean
+        """
+        return loans is self.loans and generation == self.generation and \
+            len(loans) == self._size
+
+    def range(self, min_val=None, max_val=None):
+        """
+        Find the loans with a value within the range
+
+        :param min_val: number - minimum value (inclusive) (default: None)
+        :param max_val: number - maximum value (inclusive) (default: None)
+        :returns: list of int - positions of the loans in the listing,
+                  in ascending order of value
+        """
+        start = 0
+        if min_val is not None:
+            start = bisect.bisect_left(self._values, min_val)
+        stop = len(self._values)
+        if max_val is not None:
+            stop = bisect.bisect_right(self._values, max_val)
+        return self._positions[start:stop]
+
+
+class TextIndex:
+    """
+    Inverted index of the tokens found in the text of the loans, by default
+    in the loan description and the employment title of the borrower.
+
+    Query terms are matched case-insensitively against whole tokens. A term
+    ending with ``*`` matches every token starting with the rest of the
+    term, e.g. ``'consolid*'``.
+    """
+    def __init__(self, attributes=TEXT_ATTRIBUTES):
+        """
+        Constructor
+
+        :param attributes: iterable of string - name of the loan attributes
+                           to be indexed (default: TEXT_ATTRIBUTES)
+        """
+        self._getters = tuple(attrgetter(name) for name in attributes)
+        self._postings = dict()
+        self._loans = dict()
+        self._vocabulary = None
+        self.generation = 0
+
+    def __contains__(self, loan_id):
+        """
+        Check if the loan is indexed
+
+        :param loan_id: int
+        :returns: boolean
+        """
+        return loan_id in self._loans
+
+    def __len__(self):
+        """
+        Get the number of indexed loans
+
+        :returns: int
+        """
+        return len(self._loans)
+
+    def add(self, loan):
+        """
+        Index a loan, replacing the previous content of the same loan
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        """
+        entry = self._loans.get(loan.id)
+        if entry is not None:
+            if entry[0] == loan.version:
+                return
+            self.remove(loan.id)
+
+        tokens = self.tokens(loan)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = {loan.id}
+                self._vocabulary = None
+            else:
+                postings.add(loan.id)
+        self._loans[loan.id] = (loan.version, tokens)
+        self.generation += 1
+
+    def is_current(self, loan):
+        """
+        Check if the loan is indexed with its latest content
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        entry = self._loans.get(loan.id)
+        return entry is not None and entry[0] == loan.version
+
+    def lookup(self, term):
+        """
+        Find the loans having a token matching the term
+
+        :param term: string - token, or prefix followed by ``*``
+        :returns: set of loan IDs
+        """
+        term = term.lower()
+        if not term.endswith('*'):
+            return set(self._postings.get(term, ()))
+
+        prefix = term[:-1]
+        vocabulary = self._get_vocabulary()
+        start = bisect.bisect_left(vocabulary, prefix)
+        loan_ids = set()
+        for token in vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            loan_ids.update(self._postings[token])
+        return loan_ids
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """
+        Find the loans matching a boolean combination of terms
+
+        :param all_of: iterable of string - terms which all need to match
+        :param any_of: iterable of string - terms where at least one of them
+                       needs to match (ignored if empty)
+        :param none_of: iterable of string - terms which must not match
+        :returns: set of loan IDs
+        """
+        result = None
+        # Intersect the smallest sets first
+        for loan_ids in sorted((self.lookup(term) for term in all_of),
+                               key=len):
+            result = loan_ids if result is None else result & loan_ids
+            if not result:
+                return set()
+
+        if any_of:
+            matches = set()
+            for term in any_of:
+                matches.update(self.lookup(term))
+            result = matches if result is None else result & matches
+
+        if result is None:
+            result = set(self._loans)
+        for term in none_of:
+            result -= self.lookup(term)
+        return result
+
+    def remove(self, loan_id):
+        """
+        Remove a loan from the index, if it's indexed
+
+        :param loan_id: int
+        """
+        entry = self._loans.pop(loan_id, None)
+        if entry is None:
+            return
+
+        for token in entry[1]:
+            postings = self._postings[token]
+            postings.discard(loan_id)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+        self.generation += 1
+
+    def tokens(self, loan):
+        """
+        Get the tokens of the indexed attributes of a loan
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: frozenset of string
+        """
+        tokens = set()
+        for getter in self._getters:
+            try:
+                text = getter(loan)
+            except KeyError:
+                continue
+            if text:
+                tokens.update(tokenize(text))
+        return frozenset(tokens)
+
+    def update(self, loans):
+        """
+        Synchronize the index with the latest loans. Only the loans which
+        are new or changed are tokenized, and loans which are gone are
+        removed from the index.
+
+        :param loans: iterable of :py:class:`~lendingclub2.loan.Loan`.
+        """
+        loans = list(loans)
+        current = {loan.id for loan in loans}
+        for loan_id in [loan_id for loan_id in self._loans
+                        if loan_id not in current]:
+            self.remove(loan_id)
+        for loan in loans:
+            self.add(loan)
+
+    def _get_vocabulary(self):
+        """
+        Get the sorted list of tokens
+
+        :returns: list of string
+        """
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+
+# Interface functions
+def tokenize(text):
+    """
+    Split a text in lowercase alphanumeric tokens
+
+    :param text: string
+    :returns: list of string
+    """
+    if not isinstance(text, str):
+        fstr = "text needs to be a string"
+        raise LCError(fstr)
+    return TOKEN_PATTERN.findall(text.lower())
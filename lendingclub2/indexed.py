@@ -0,0 +1,185 @@
+# Filename: indexed.py
+
+"""
+LendingClub2 Indexed Filter Module
+
+Filters which can be answered by an index instead of evaluating each loan.
+
+Interface classes:
+    FilterByNotOwned
+    FilterByRange
+"""
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.filter import Filter
+
+
+# Constants
+RANGE_FIELDS = {
+    'amount': 'loanAmount',
+    'dti': 'dti',
+    'fico_range_high': 'ficoRangeHigh',
+    'fico_range_low': 'ficoRangeLow',
+    'funded_amount': 'fundedAmount',
+    'inquiries_in_last_6_mo': 'inqLast6Mths',
+    'installment': 'installment',
+    'interest_rate': 'intRate',
+    'revolving_balance': 'revolBal',
+    'term': 'term',
+}
+
+
+# Interface classes
+class FilterByNotOwned(Filter):
+    """
+    Filter out the loans the account already has notes of, to avoid
+    investing in the same loan twice
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, owned):
+        """
+        Constructor
+
+        :param owned: instance of :py:class:`~lendingclub2.index.OwnedLoans`,
+                      e.g. :py:attr:`~lendingclub2.account.InvestorAccount.owned_loans`
+        """
+        self._owned = owned
+    # pylint: enable=super-init-not-called
+
+    @property
+    def owned(self):
+        """
+        Get the owned loans
+
+        :returns: instance of :py:class:`~lendingclub2.index.OwnedLoans`.
+        """
+        return self._owned
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset(('id', ))
+
+    def generation(self):
+        """
+        Get the generation of the owned loans, so cached results aren't
+        reused after an order
+
+        :returns: int
+        """
+        return self._owned.generation
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: int
+        """
+        return id(self._owned)
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        return loan.id not in self._owned
+
+
+class FilterByRange(Filter):
+    """
+    Filter by a numeric listing field being within a range. Loans without a
+    value for the field never meet the requirement.
+
+    When a sorted index of the field exists on the listing (see
+    :py:meth:`~lendingclub2.loan.Listing.range_index`),
+    :py:meth:`~lendingclub2.loan.Listing.filter` answers the range with a
+    binary search instead of evaluating every loan.
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, field, min_val=None, max_val=None):
+        """
+        Constructor
+
+        :param field: string - attribute name listed in RANGE_FIELDS (e.g.
+                      ``'interest_rate'``, ``'fico_range_low'``) or raw
+                      listing field name (e.g. ``'intRate'``)
+        :param min_val: number - minimum value (inclusive) (default: None)
+        :param max_val: number - maximum value (inclusive) (default: None)
+        """
+        if min_val is None and max_val is None:
+            fstr = "at least one of min_val and max_val should be specified"
+            raise LCError(fstr)
+        if min_val is not None and max_val is not None and min_val > max_val:
+            fstr = "min_val cannot be greater than max_val"
+            details = "min_val: {}, max_val: {}".format(min_val, max_val)
+            raise LCError(fstr, details=details)
+
+        self._field = RANGE_FIELDS.get(field, field)
+        self._min_value = min_val
+        self._max_value = max_val
+    # pylint: enable=super-init-not-called
+
+    @property
+    def field(self):
+        """
+        Get the raw listing field of the range
+
+        :returns: string
+        """
+        return self._field
+
+    @property
+    def max_value(self):
+        """
+        Get the maximum value (inclusive)
+
+        :returns: number or None if unbounded
+        """
+        return self._max_value
+
+    @property
+    def min_value(self):
+        """
+        Get the minimum value (inclusive)
+
+        :returns: number or None if unbounded
+        """
+        return self._min_value
+
+    def fields(self):
+        """
+        Get the raw listing fields the filter reads
+
+        :returns: frozenset of string
+        """
+        return frozenset((self._field, ))
+
+    def identity(self):
+        """
+        Get the parameters making the filter unique
+
+        :returns: tuple
+        """
+        return (self._field, self._min_value, self._max_value)
+
+    def meet_requirement(self, loan):
+        """
+        Check if the loan is meeting the filter requirement
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: boolean
+        """
+        # pylint: disable=protected-access
+        value = loan._response.get(self._field)
+        # pylint: enable=protected-access
+        if value is None:
+            return False
+        if self._min_value is not None and value < self._min_value:
+            return False
+        return self._max_value is None or value <= self._max_value
@@ -0,0 +1,102 @@
+# Filename: ledger.py
+
+"""
+LendingClub2 Ledger Module
+
+Interface classes:
+    CashLedger
+"""
+
+# Standard libraries
+import threading
+import time
+
+# lendingclub2
+from lendingclub2.error import LCError
+
+
+class CashLedger:
+    """
+    Local estimate of the available cash of an account. The balance is
+    synchronized with the API from time to time, and the amounts spent in
+    between (invested notes, withdrawals) are subtracted right away, so
+    the next orders can be sized without requesting the cash again.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._lock = threading.Lock()
+        self._synced = None
+        self._synced_at = None
+        self._entries = list()
+
+    @property
+    def balance(self):
+        """
+        Get the estimated available cash
+
+        :returns: float or None if the ledger was never synchronized
+        """
+        with self._lock:
+            if self._synced is None:
+                return None
+            return self._synced + sum(amount for _, amount in self._entries)
+
+    @property
+    def entries(self):
+        """
+        Get the changes recorded since the last synchronization
+
+        :returns: list of tuple (string - description, float - amount,
+                  negative when cash was spent)
+        """
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def synced_at(self):
+        """
+        Get the time of the last synchronization
+
+        :returns: float - value of :py:func:`time.monotonic` or None if the
+                  ledger was never synchronized
+        """
+        return self._synced_at
+
+    def credit(self, amount, description=''):
+        """
+        Record cash made available
+
+        :param amount: float - must be a positive number
+        :param description: string (default: '')
+        """
+        if amount <= 0:
+            fstr = "amount should be a positive number"
+            raise LCError(fstr)
+        with self._lock:
+            self._entries.append((description, amount))
+
+    def debit(self, amount, description=''):
+        """
+        Record cash spent
+
+        :param amount: float - must be a positive number
+        :param description: string (default: '')
+        """
+        if amount <= 0:
+            fstr = "amount should be a positive number"
+            raise LCError(fstr)
+        with self._lock:
+            self._entries.append((description, -amount))
+
+    def sync(self, available_cash):
+        """
+        Reset the ledger to the available cash reported by the API
+
+        :param available_cash: float
+        """
+        with self._lock:
+            self._synced = available_cash
+            self._synced_at = time.monotonic()
+            self._entries = list()
@@ -5,18 +5,102 @@ LendingClub2 Loan Module
 """
 
 # Standard libraries
+import heapq
+import itertools
 import json
+import time
 from operator import attrgetter
 
 # lendingclub2
+from lendingclub2 import aggregate
 from lendingclub2 import request
 from lendingclub2.config import API_VERSION, DNS, ENDPOINTS
 from lendingclub2.error import LCError
+from lendingclub2.filter import Filter, required_fields
+from lendingclub2.index import SortedIndex, TextIndex
+from lendingclub2.indexed import RANGE_FIELDS, FilterByRange
+from lendingclub2.profile import FilterProfile, FilterStatistics
+from lendingclub2.ranking import batch_keys, key_function
 from lendingclub2.response import Response
 
 
 # Constants
 LISTING_VERSION = '1.3'
+LOAN_REQUIRED_FIELDS = ('id', 'loanAmount', 'fundedAmount', 'term',
+                        'subGrade')
+# Loan attributes mapped to the raw listing field they return as is
+LOAN_COLUMNS = {
+    'amount': 'loanAmount',
+    'borrower.address_state': 'addrState',
+    'borrower.fico_range_high': 'ficoRangeHigh',
+    'borrower.fico_range_low': 'ficoRangeLow',
+    'borrower.title': 'empTitle',
+    'description': 'desc',
+    'expected_default_rate': 'expDefaultRate',
+    'funded_amount': 'fundedAmount',
+    'grade': 'grade',
+    'id': 'id',
+    'installment': 'installment',
+    'interest_rate': 'intRate',
+    'purpose': 'purpose',
+    'subgrade': 'subGrade',
+    'term': 'term',
+}
+
+
+# Internal functions
+def _projection(fields):
+    """
+    Resolve the raw listing fields to keep when decoding loans.
+
+    :param fields: iterable of string (raw field name) or
+                   :py:class:`~lendingclub2.filter.Filter` or None
+    :returns: tuple of string or None if every field needs to be kept
+    """
+    if fields is None:
+        return None
+
+    names = set(LOAN_REQUIRED_FIELDS)
+    filters = list()
+    for field in fields:
+        if isinstance(field, Filter):
+            filters.append(field)
+        elif isinstance(field, str):
+            names.add(field)
+        else:
+            fstr = "invalid field specification: {!r}".format(field)
+            raise LCError(fstr)
+
+    filter_fields = required_fields(*filters)
+    if filter_fields is None:
+        return None
+    names.update(filter_fields)
+    return tuple(sorted(names))
+
+
+def _filtered(loans, filters, statistics=None):
+    """
+    Lazily select the loans meeting all the filters.
+
+    :param loans: iterable of :py:class:`~lendingclub2.loan.Loan`.
+    :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+    :param statistics: list of
+                       :py:class:`~lendingclub2.profile.FilterStatistics`
+                       in the same order as the filters - if specified, each
+                       evaluation is recorded in them (default: None)
+    :returns: generator of :py:class:`~lendingclub2.loan.Loan`.
+    """
+    if statistics is None:
+        checks = tuple(filter_spec.meet_requirement for filter_spec in filters)
+    else:
+        checks = tuple(stats.measure(filter_spec)
+                       for filter_spec, stats in zip(filters, statistics))
+    for loan in loans:
+        for check in checks:
+            if not check(loan):
+                break
+        else:
+            yield loan
 
 
 # Interface classes
@@ -61,6 +145,24 @@ class Borrower:
         return "{}-{}".format(self._response['ficoRangeLow'],
                               self._response['ficoRangeHigh'])
 
+    @property
+    def fico_range_high(self):
+        """
+        Get the upper boundary of the FICO range of the loaner.
+
+        :returns: int
+        """
+        return self._response['ficoRangeHigh']
+
+    @property
+    def fico_range_low(self):
+        """
+        Get the lower boundary of the FICO range of the loaner.
+
+        :returns: int
+        """
+        return self._response['ficoRangeLow']
+
     @property
     def delinquency_in_2_years(self):
         """
@@ -181,6 +283,7 @@ class Loan:
         self.funded_amount = response['fundedAmount']
         self.term = response['term']
         self.subgrade = response['subGrade']
+        self._version = None
 
     def __repr__(self):
         """
@@ -284,6 +387,34 @@ class Loan:
         """
         return self._response['purpose']
 
+    @property
+    def version(self):
+        """
+        Get the fingerprint of the loan content. Two instances of the same
+        loan have the same version as long as the listing didn't change any
+        of its fields.
+
+        :returns: int
+        """
+        if self._version is None:
+            try:
+                self._version = hash(tuple(sorted(self._response.items())))
+            except TypeError:
+                self._version = hash(json.dumps(self._response,
+                                                sort_keys=True))
+        return self._version
+
+    def field(self, name, default=None):
+        """
+        Get a raw listing field of the loan, e.g. one without a property.
+
+        :param name: string - raw field name (e.g. ``'addrState'``)
+        :param default: value returned if the loan doesn't have the field
+                        (default: None)
+        :returns: value of the field
+        """
+        return self._response.get(name, default)
+
 
 class Listing:
     """
@@ -293,7 +424,11 @@ class Listing:
         """
         Constructor.
         """
-        self.loans = list()
+        self.generation = 0
+        self.profile = None
+        self.text_index = None
+        self._loans = list()
+        self._range_indexes = dict()
 
     def __add__(self, other):
         """
@@ -366,6 +501,44 @@ class Listing:
         """
         return len(self.loans)
 
+    @property
+    def loans(self):
+        """
+        Get the loans of the listing. Assigning them, or sorting the
+        listing, starts a new generation, which invalidates the sorted
+        indexes. Modifying the list in place doesn't, so assign the list
+        back after doing so, e.g. ``listing.loans = listing.loans``.
+
+        :returns: list of :py:class:`~lendingclub2.loan.Loan`.
+        """
+        return self._loans
+
+    @loans.setter
+    def loans(self, loans):
+        """
+        Replace the loans of the listing.
+
+        :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+        """
+        self._loans = loans
+        self.generation += 1
+
+    def column(self, name):
+        """
+        Get the values of a loan attribute for every loan, read straight
+        from the raw listing fields, e.g. for
+        :py:func:`~lendingclub2.aggregate.group_by`.
+
+        :param name: string - attribute name listed in LOAN_COLUMNS
+        :returns: list in the order of the loans
+        :raises KeyError: if the attribute has no column, or a loan doesn't
+                          have the field
+        """
+        field = LOAN_COLUMNS[name]
+        # pylint: disable=protected-access
+        return [loan._response[field] for loan in self.loans]
+        # pylint: enable=protected-access
+
     def copy(self):
         """
         Get a shallow copy of the listing.
@@ -374,35 +547,169 @@ class Listing:
         """
         return self.__copy__()
 
-    def filter(self, *filters):
+    def filter(self, *filters, profile=False, cache=None):
         """
         Apply all filters to the search that we had found before.
         If multiple filters are specified, the loan has to meet all the
         criteria to be included in the result.
 
         :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :param profile: boolean - measure each filter and attach the report
+                        to the ``profile`` attribute of the result
+                        (default: False)
+        :param cache: instance of :py:class:`~lendingclub2.cache.FilterCache`
+                      - reuse the results of the loans which didn't change
+                      since they were last evaluated (default: None)
         :returns: an instance of :py:class:`~lendingclub2.loan.Listing`.
         """
-        if not filters:
+        if not filters and not profile:
             return self.copy()
 
-        filtered = list()
-        for loan in self.loans:
-            meet_spec = True
-            for filter_spec in filters:
-                if not filter_spec.meet_requirement(loan):
-                    meet_spec = False
-                    break
-            if meet_spec:
-                filtered.append(loan)
+        begin = time.perf_counter()
+        statistics = list() if profile else None
+        loans, filters = self._narrow(filters, statistics)
+        evaluated = None
+        if profile:
+            evaluated = [FilterStatistics(filter_spec)
+                         for filter_spec in filters]
+            statistics.extend(evaluated)
+        if cache is not None:
+            filters = cache.wrap(*filters)
         new_listing = Listing()
-        new_listing.loans = filtered
+        new_listing.loans = list(_filtered(loans, filters, evaluated))
+
+        if profile:
+            for stats in evaluated:
+                stats.skipped = len(loans) - stats.evaluated
+            new_listing.profile = FilterProfile(
+                len(self.loans), len(new_listing.loans),
+                time.perf_counter() - begin, statistics)
         return new_listing
 
-    def search(self, filter_id=None, show_all=None):
+    def group_by(self, key, **aggregates):
         """
-        Apply filters and search for loans matching the specifications.
+        Group the loans and compute the aggregates in a single pass, e.g.
+        ``listing.group_by('grade', count=Count(), rate=Mean('interest_rate'))``.
+
+        :param key: string (e.g. ``'grade'``, ``'term'``, ``'purpose'``,
+                    ``'borrower.address_state'``), callable accepting a loan,
+                    or tuple of strings for a composite key
+        :param aggregates: dict - name of the result mapped to an instance of
+                           :py:class:`~lendingclub2.aggregate.Aggregate`.
+        :returns: dict - group key mapped to a dict of aggregate results
+        """
+        return aggregate.group_by(self, key, **aggregates)
+
+    def view(self):
+        """
+        Get a lazy view of the listing. Filters, sorting and limits applied
+        to the view are only evaluated when the view is iterated, measured
+        or materialized, without allocating intermediate listings.
+
+        :returns: instance of :py:class:`~lendingclub2.loan.ListingView`.
+        """
+        return ListingView(self)
+
+    def index_text(self):
+        """
+        Build the text index of the loans in the listing. Once built, the
+        index is kept up to date incrementally by every successful
+        :py:meth:`~lendingclub2.loan.Listing.search`, and can be passed to
+        :py:class:`~lendingclub2.filter.FilterByKeywords`.
+
+        :returns: instance of :py:class:`~lendingclub2.index.TextIndex`.
+        """
+        if self.text_index is None:
+            self.text_index = TextIndex()
+        self.text_index.update(self.loans)
+        return self.text_index
+
+    def range_index(self, field):
+        """
+        Get the sorted index of a numeric field, building it if the loans
+        changed since it was last built. Once an index exists,
+        :py:meth:`~lendingclub2.loan.Listing.filter` uses it to answer
+        :py:class:`~lendingclub2.indexed.FilterByRange` on that field with a
+        binary search, which pays off when many range queries run over the
+        same listing.
+
+        :param field: string - attribute name listed in
+                      :py:data:`~lendingclub2.indexed.RANGE_FIELDS` or raw
+                      listing field name
+        :returns: instance of :py:class:`~lendingclub2.index.SortedIndex`.
+        """
+        field = RANGE_FIELDS.get(field, field)
+        index = self._range_indexes.get(field)
+        if index is None or not index.is_current(self.loans,
+                                                 self.generation):
+            index = SortedIndex(self.loans, field, self.generation)
+            self._range_indexes[field] = index
+        return index
+
+    def rank(self, *keys, reverse=False):
+        """
+        Get a new listing ordered by one or more keys. The listing itself is
+        left untouched, so it's safe to rank while other readers iterate
+        over it. Each key is computed exactly once per loan.
+
+        :param keys: iterable of string (attribute name, prefix with ``'-'``
+                     for descending), callable accepting a loan, mapping
+                     of loan ID to a precomputed value, or instance of
+                     :py:class:`~lendingclub2.score.Scorer` scoring all the
+                     loans in a single batch.
+        :param reverse: boolean - reverse the whole ordering
+                        (default: False)
+        :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
         """
+        loans = self.loans
+        sort_key = key_function(batch_keys(keys, loans))
+        new_listing = Listing()
+        new_listing.loans = sorted(loans, key=sort_key, reverse=reverse)
+        return new_listing
+
+    def top_k(self, k, *keys, reverse=True):
+        """
+        Get a new listing of the best k loans without sorting the whole
+        listing. By default, the loans with the largest keys are considered
+        the best ones, and are returned from best to worst.
+
+        :param k: int - number of loans to select
+        :param keys: see :py:meth:`~lendingclub2.loan.Listing.rank`.
+        :param reverse: boolean - select the largest keys if True, otherwise
+                        the smallest ones (default: True)
+        :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+        """
+        if k < 0:
+            fstr = "k needs to be a non-negative number"
+            raise LCError(fstr)
+
+        loans = self.loans
+        sort_key = key_function(batch_keys(keys, loans))
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        new_listing = Listing()
+        new_listing.loans = select(k, loans, key=sort_key)
+        return new_listing
+
+    def search(self, filter_id=None, show_all=None, fields=None):
+        """
+        Apply filters and search for loans matching the specifications.
+
+        :param filter_id: int - ID of a filter saved in the account
+                          (default: None)
+        :param show_all: boolean - include all the loans instead of only the
+                         ones listed in the latest listing (default: None)
+        :param fields: iterable of string (raw field name such as
+                       ``'intRate'``) or
+                       :py:class:`~lendingclub2.filter.Filter` whose fields
+                       are needed. Only those fields are kept in each loan,
+                       in addition to the ones required by
+                       :py:class:`~lendingclub2.loan.Loan`. Accessing any
+                       other loan property raises :py:class:`KeyError`. If a
+                       filter doesn't declare its fields, every field is kept
+                       (default: None, keep every field)
+        """
+        projection = _projection(fields)
+
         url = DNS + ENDPOINTS['loans'].format(version=API_VERSION)
 
         criteria = list()
@@ -425,13 +732,68 @@ class Listing:
 
         # Reset the stored loans whenever we search again as long as the
         # latest request was successful
-        self.loans = list()
+        loans = list()
         try:
             for loan_json in response.json['loans']:
+                if projection is not None:
+                    loan_json = {field: loan_json[field]
+                                 for field in projection
+                                 if field in loan_json}
                 loan = Loan(loan_json)
-                self.loans.append(loan)
+                loans.append(loan)
         except KeyError:
             pass
+        self.loans = loans
+
+        if self.text_index is not None:
+            self.text_index.update(self.loans)
+
+    def _narrow(self, filters, statistics=None):
+        """
+        Answer the range filters with the existing sorted indexes.
+
+        :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+        :param statistics: list - if specified, instances of
+                           :py:class:`~lendingclub2.profile.FilterStatistics`
+                           of the filters answered by the indexes are added
+                           to it (default: None)
+        :returns: tuple (list of candidate loans in listing order,
+                  tuple of filters which still need to be evaluated)
+        """
+        loans = self.loans
+        positions = None
+        remaining = list()
+        for filter_spec in filters:
+            index = None
+            # Subclasses may not select loans by the range of the field
+            filter_type = type(filter_spec)
+            if filter_type is FilterByRange:
+                index = self._range_indexes.get(filter_spec.field)
+            if index is None or \
+                    not index.is_current(loans, self.generation):
+                remaining.append(filter_spec)
+                continue
+
+            start = time.perf_counter()
+            before = len(loans) if positions is None else len(positions)
+            matches = index.range(filter_spec.min_value,
+                                  filter_spec.max_value)
+            if positions is None:
+                positions = set(matches)
+            else:
+                positions.intersection_update(matches)
+            if statistics is not None:
+                stats = FilterStatistics(filter_spec, indexed=True)
+                stats.evaluated = before
+                stats.rejected = before - len(positions)
+                stats.seconds = time.perf_counter() - start
+                stats.skipped = len(loans) - before
+                statistics.append(stats)
+
+        if positions is None:
+            return loans, filters
+        return [loans[position] for position in sorted(positions)], \
+            tuple(remaining)
 
     def sort(self, by_grade=True, by_term=False):
         """
@@ -451,3 +813,128 @@ class Listing:
         else:
             self.loans = sorted(self.loans, key=attrgetter('percent_funded'),
                                 reverse=True)
+
+
+class ListingView:
+    """
+    Lazy and immutable view of a listing. Each operation returns a new view
+    composing the previous steps, e.g.
+    ``listing.view().filter(a).filter(b).limit(20)`` only evaluates loans
+    until 20 of them meet both filters.
+    """
+    _FILTER = 'filter'
+    _LIMIT = 'limit'
+    _SORT = 'sort'
+
+    def __init__(self, listing, steps=()):
+        """
+        Constructor.
+
+        :param listing: instance of :py:class:`~lendingclub2.loan.Listing`.
+        :param steps: tuple of steps to be evaluated in order (default: ())
+        """
+        self._listing = listing
+        self._steps = steps
+
+    def __bool__(self):
+        """
+        Check if at least one loan is in the view. Evaluation stops at the
+        first match.
+
+        :returns: boolean
+        """
+        for _ in self:
+            return True
+        return False
+
+    def __iter__(self):
+        """
+        Evaluate the view lazily.
+
+        :returns: generator of :py:class:`~lendingclub2.loan.Loan`.
+        """
+        loans = iter(self._listing.loans)
+        steps = self._steps
+        index = 0
+        while index < len(steps):
+            step = steps[index]
+            if step[0] == ListingView._FILTER:
+                loans = _filtered(loans, step[1])
+            elif step[0] == ListingView._SORT:
+                sort_key, reverse = step[1], step[2]
+                if index + 1 < len(steps) and \
+                        steps[index + 1][0] == ListingView._LIMIT:
+                    # Only keep the loans to be returned ordered
+                    index += 1
+                    select = heapq.nlargest if reverse else heapq.nsmallest
+                    loans = iter(select(steps[index][1], loans,
+                                        key=sort_key))
+                else:
+                    loans = iter(sorted(loans, key=sort_key,
+                                        reverse=reverse))
+            else:
+                loans = itertools.islice(loans, step[1])
+            index += 1
+        yield from loans
+
+    def __len__(self):
+        """
+        Evaluate the view and count the loans in it.
+
+        :returns: int
+        """
+        return sum(1 for _ in self)
+
+    def filter(self, *filters):
+        """
+        Get a new view only including the loans meeting all the filters.
+
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: instance of :py:class:`~lendingclub2.loan.ListingView`.
+        """
+        if not filters:
+            return self
+        return self._extend((ListingView._FILTER, filters))
+
+    def limit(self, count):
+        """
+        Get a new view including at most a number of loans.
+
+        :param count: int
+        :returns: instance of :py:class:`~lendingclub2.loan.ListingView`.
+        """
+        if count < 0:
+            fstr = "count needs to be a non-negative number"
+            raise LCError(fstr)
+        return self._extend((ListingView._LIMIT, count))
+
+    def materialize(self):
+        """
+        Evaluate the view into a new listing.
+
+        :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+        """
+        new_listing = Listing()
+        new_listing.loans = list(self)
+        return new_listing
+
+    def sort(self, *keys, reverse=False):
+        """
+        Get a new view ordered by one or more keys. If the view is limited
+        right after, only the selected loans are kept ordered.
+
+        :param keys: see :py:meth:`~lendingclub2.loan.Listing.rank`.
+        :param reverse: boolean - reverse the whole ordering
+                        (default: False)
+        :returns: instance of :py:class:`~lendingclub2.loan.ListingView`.
+        """
+        return self._extend((ListingView._SORT, key_function(keys), reverse))
+
+    def _extend(self, step):
+        """
+        Get a new view with an additional step.
+
+        :param step: tuple
+        :returns: instance of :py:class:`~lendingclub2.loan.ListingView`.
+        """
+        return ListingView(self._listing, self._steps + (step, ))
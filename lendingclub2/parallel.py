@@ -0,0 +1,248 @@
+# Filename: parallel.py
+
+"""
+LendingClub2 Parallel Module
+
+Interface classes:
+    ParallelFilterExecutor
+"""
+
+# Standard libraries
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.filter import required_fields
+from lendingclub2.loan import LOAN_REQUIRED_FIELDS, Listing, Loan
+
+
+# Constants
+CHUNKS_PER_WORKER = 4
+
+
+# Internal classes
+# pylint: disable=too-few-public-methods
+class _Missing:
+    """
+    Marker of a field missing from a loan. The class itself is used as the
+    marker, so it's pickled by reference.
+    """
+# pylint: enable=too-few-public-methods
+
+
+# Interface classes
+class ParallelFilterExecutor:
+    """
+    Evaluate expensive filters over a listing with a pool of workers.
+
+    The listing is partitioned in contiguous chunks. With processes, each
+    chunk is shipped as a single tuple of field names shared by all the
+    loans and one tuple of values per loan, instead of pickling every loan
+    and its raw dictionary. Only the fields the filters read are shipped,
+    so the filters need to declare them (see
+    :py:meth:`~lendingclub2.filter.Filter.fields`) to be used with
+    processes. Workers only send back the positions of the matching loans,
+    and results are merged in the listing order.
+
+    The filters need to be picklable to be used with processes. The pool is
+    kept alive between calls until :py:meth:`close` is called, or when used
+    as a context manager.
+    """
+    def __init__(self, workers=None, use_processes=True,
+                 chunks_per_worker=CHUNKS_PER_WORKER):
+        """
+        Constructor
+
+        :param workers: int - number of workers (default: number of CPUs)
+        :param use_processes: boolean - use processes instead of threads
+                              (default: True)
+        :param chunks_per_worker: int - number of chunks each worker gets,
+                                  to balance uneven filter costs
+                                  (default: CHUNKS_PER_WORKER)
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            fstr = "workers needs to be a positive number"
+            raise LCError(fstr)
+        if chunks_per_worker < 1:
+            fstr = "chunks_per_worker needs to be a positive number"
+            raise LCError(fstr)
+
+        self._workers = workers
+        self._use_processes = use_processes
+        self._chunks_per_worker = chunks_per_worker
+        self._pool = None
+
+    def __enter__(self):
+        """
+        Enter the context
+
+        :returns: instance of
+                  :py:class:`~lendingclub2.parallel.ParallelFilterExecutor`.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit the context and shut the pool down
+        """
+        self.close()
+
+    @property
+    def workers(self):
+        """
+        Get the number of workers
+
+        :returns: int
+        """
+        return self._workers
+
+    def close(self):
+        """
+        Shut the pool of workers down
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def filter(self, listing, *filters):
+        """
+        Apply all filters to the listing in parallel. If multiple filters are
+        specified, the loan has to meet all the criteria to be included in
+        the result, exactly as with
+        :py:meth:`~lendingclub2.loan.Listing.filter`.
+
+        :param listing: instance of :py:class:`~lendingclub2.loan.Listing`.
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+        """
+        loans = list(listing.loans)
+        if not filters or self._workers == 1 or len(loans) < 2:
+            return listing.filter(*filters)
+
+        chunks = self._partition(len(loans))
+        if self._use_processes:
+            fields = _shipped_fields(filters)
+            pool = self._get_pool()
+            futures = [pool.submit(_evaluate_rows, filters,
+                                   *_encode(loans[start:stop], fields))
+                       for start, stop in chunks]
+        else:
+            pool = self._get_pool()
+            futures = [pool.submit(_evaluate_loans, filters,
+                                   loans[start:stop])
+                       for start, stop in chunks]
+
+        new_listing = Listing()
+        for (start, _), future in zip(chunks, futures):
+            new_listing.loans.extend(loans[start + position]
+                                     for position in future.result())
+        return new_listing
+
+    def _get_pool(self):
+        """
+        Get the pool of workers, creating it if needed
+
+        :returns: instance of :py:class:`concurrent.futures.Executor`.
+        """
+        if self._pool is None:
+            if self._use_processes:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+    def _partition(self, count):
+        """
+        Split a number of loans in contiguous chunks
+
+        :param count: int - number of loans
+        :returns: list of tuple (start, stop)
+        """
+        total_chunks = min(count, self._workers * self._chunks_per_worker)
+        size, remainder = divmod(count, total_chunks)
+        chunks = list()
+        start = 0
+        for index in range(total_chunks):
+            stop = start + size + (1 if index < remainder else 0)
+            chunks.append((start, stop))
+            start = stop
+        return chunks
+
+
+# Internal functions
+def _decode(keys, row):
+    """
+    Rebuild the raw response of a loan
+
+    :param keys: tuple of string
+    :param row: tuple of values
+    :returns: dict
+    """
+    return {key: value for key, value in zip(keys, row)
+            if value is not _Missing}
+
+
+def _encode(loans, fields):
+    """
+    Encode loans compactly to be shipped to a worker process
+
+    :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+    :param fields: tuple of string - raw listing fields to ship
+    :returns: tuple (tuple of field names, list of tuple of values)
+    """
+    # pylint: disable=protected-access
+    rows = [tuple(loan._response.get(field, _Missing) for field in fields)
+            for loan in loans]
+    # pylint: enable=protected-access
+    return fields, rows
+
+
+def _shipped_fields(filters):
+    """
+    Find the raw listing fields to ship to the worker processes
+
+    :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+    :returns: tuple of string
+    """
+    fields = required_fields(*filters)
+    if fields is None:
+        fstr = "filters need to declare their fields to be evaluated by " \
+               "processes"
+        hint = "implement Filter.fields, or use threads with " \
+               "use_processes=False"
+        raise LCError(fstr, hint=hint)
+    return tuple(sorted(fields.union(LOAN_REQUIRED_FIELDS)))
+
+
+def _evaluate_loans(filters, loans):
+    """
+    Find the loans meeting all the filters
+
+    :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+    :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+    :returns: list of int - positions of the matching loans
+    """
+    positions = list()
+    for position, loan in enumerate(loans):
+        for filter_spec in filters:
+            if not filter_spec.meet_requirement(loan):
+                break
+        else:
+            positions.append(position)
+    return positions
+
+
+def _evaluate_rows(filters, keys, rows):
+    """
+    Find the encoded loans meeting all the filters, in a worker process
+
+    :param filters: tuple of :py:class:`~lendingclub2.filter.Filter`.
+    :param keys: tuple of string
+    :param rows: list of tuple of values
+    :returns: list of int - positions of the matching loans
+    """
+    loans = [Loan(_decode(keys, row)) for row in rows]
+    return _evaluate_loans(filters, loans)
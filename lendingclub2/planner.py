@@ -0,0 +1,116 @@
+# Filename: planner.py
+
+"""
+LendingClub2 Planner Module
+
+Interface classes:
+    FilterPlanner
+"""
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.filter import Filter
+from lendingclub2.loan import Listing
+from lendingclub2.response.filters import SavedFilter
+
+
+class FilterPlanner:
+    """
+    Push local filters down to the filters saved in the investor account,
+    so the listing endpoint only returns the candidate loans and only the
+    leftover filters are evaluated locally.
+
+    The API only exposes the ID and the name of the saved filters, not their
+    criteria, so each saved filter has to be registered once with the local
+    filters it's equivalent to.
+    """
+    def __init__(self, saved_filters=None):
+        """
+        Constructor
+
+        :param saved_filters: instance of
+                              :py:class:`~lendingclub2.response.filters.SavedFilters`
+                              - used to resolve saved filters by name and to
+                              check that registered IDs still exist
+                              (default: None)
+        """
+        self._saved_filters = saved_filters
+        self._registry = list()
+
+    def plan(self, *filters):
+        """
+        Find the saved filter covering the most filters
+
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :returns: tuple (int or None - saved filter ID,
+                  tuple of :py:class:`~lendingclub2.filter.Filter` - filters
+                  to be evaluated locally, in the original order)
+        """
+        requested = set(filters)
+        best_id = None
+        best_covered = frozenset()
+        for filter_id, covered in self._registry:
+            if len(covered) > len(best_covered) and covered <= requested:
+                best_id = filter_id
+                best_covered = covered
+
+        remaining = tuple(filter_spec for filter_spec in filters
+                          if filter_spec not in best_covered)
+        return best_id, remaining
+
+    def register(self, saved_filter, *filters):
+        """
+        Declare the local filters a saved filter is equivalent to
+
+        :param saved_filter: int (ID), string (name), or instance of
+                             :py:class:`~lendingclub2.response.filters.SavedFilter`.
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        """
+        if not filters:
+            fstr = "at least one filter needs to be registered"
+            raise LCError(fstr)
+        for filter_spec in filters:
+            if not isinstance(filter_spec, Filter):
+                fstr = "{!r} is not an instance of Filter".format(filter_spec)
+                raise LCError(fstr)
+
+        if isinstance(saved_filter, SavedFilter):
+            filter_id = saved_filter.id
+        elif isinstance(saved_filter, str):
+            if self._saved_filters is None:
+                fstr = "cannot resolve saved filter name without the list " \
+                       "of saved filters"
+                raise LCError(fstr)
+            found = self._saved_filters.find(saved_filter)
+            if found is None:
+                fstr = "cannot find saved filter: {}".format(saved_filter)
+                raise LCError(fstr)
+            filter_id = found.id
+        else:
+            filter_id = saved_filter
+            if self._saved_filters is not None and \
+                    filter_id not in self._saved_filters:
+                fstr = "cannot find saved filter with ID {}".format(filter_id)
+                raise LCError(fstr)
+
+        self._registry.append((filter_id, frozenset(filters)))
+
+    def search(self, *filters, listing=None, show_all=None):
+        """
+        Search for loans meeting all the filters, pushing as many of them as
+        possible to a saved filter.
+
+        :param filters: iterable of :py:class:`~lendingclub2.filter.Filter`.
+        :param listing: instance of :py:class:`~lendingclub2.loan.Listing`
+                        holding the candidate loans after the search
+                        (default: None, a new listing is used)
+        :param show_all: boolean - see
+                         :py:meth:`~lendingclub2.loan.Listing.search`
+                         (default: None)
+        :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+        """
+        if listing is None:
+            listing = Listing()
+        filter_id, remaining = self.plan(*filters)
+        listing.search(filter_id=filter_id, show_all=show_all)
+        return listing.filter(*remaining)
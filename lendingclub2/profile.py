@@ -0,0 +1,194 @@
+# Filename: profile.py
+
+"""
+LendingClub2 Profile Module
+
+Interface classes:
+    FilterProfile
+    FilterStatistics
+"""
+
+# Standard libraries
+import time
+
+
+class FilterStatistics:
+    """
+    Measurements of a single filter during a profiled filtering
+    """
+    def __init__(self, filter_spec, indexed=False):
+        """
+        Constructor
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`.
+        :param indexed: boolean - the filter was answered by a sorted index
+                        instead of evaluating each loan (default: False)
+        """
+        self.filter = filter_spec
+        # Number of loans evaluated and rejected by the filter, and number
+        # of loans not evaluated because an earlier filter rejected them
+        self.evaluated = 0
+        self.rejected = 0
+        self.skipped = 0
+        # Total time spent in the filter, in seconds
+        self.seconds = 0.0
+        self.indexed = indexed
+
+    def __repr__(self):
+        """
+        String representation of the statistics
+
+        :returns: string
+        """
+        return "FilterStatistics(filter={}, evaluated={}, rejected={}, " \
+               "seconds={:.6f})".format(self.name, self.evaluated,
+                                        self.rejected, self.seconds)
+
+    def measure(self, filter_spec):
+        """
+        Wrap the evaluation of a filter so each call is recorded in the
+        statistics
+
+        :param filter_spec: instance of
+                            :py:class:`~lendingclub2.filter.Filter`, e.g. the
+                            cached variant of the measured filter
+        :returns: callable accepting a loan and returning a boolean
+        """
+        meet_requirement = filter_spec.meet_requirement
+        perf_counter = time.perf_counter
+
+        def measured(loan):
+            """
+            Evaluate the filter while measuring it
+
+            :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+            :returns: boolean
+            """
+            start = perf_counter()
+            meet_spec = meet_requirement(loan)
+            self.seconds += perf_counter() - start
+            self.evaluated += 1
+            if not meet_spec:
+                self.rejected += 1
+            return meet_spec
+        return measured
+
+    @property
+    def name(self):
+        """
+        Get the name of the filter
+
+        :returns: string
+        """
+        return type(self.filter).__name__
+
+    @property
+    def per_call(self):
+        """
+        Get the average time spent per evaluated loan
+
+        :returns: float - seconds
+        """
+        if not self.evaluated:
+            return 0.0
+        return self.seconds / self.evaluated
+
+    @property
+    def short_circuited(self):
+        """
+        Check if some loans were never evaluated by the filter because an
+        earlier filter rejected them
+
+        :returns: boolean
+        """
+        return self.skipped > 0
+
+
+class FilterProfile:
+    """
+    Report of a profiled :py:meth:`~lendingclub2.loan.Listing.filter` call
+    """
+    HEADERS = ('filter', 'evaluated', 'rejected', 'skipped', 'total ms',
+               'per call us', 'short-circuit')
+
+    def __init__(self, loans, matched, seconds, statistics):
+        """
+        Constructor
+
+        :param loans: int - number of loans in the filtered listing
+        :param matched: int - number of loans meeting all the filters
+        :param seconds: float - total time of the filtering
+        :param statistics: list of
+                           :py:class:`~lendingclub2.profile.FilterStatistics`
+                           in evaluation order
+        """
+        self.loans = loans
+        self.matched = matched
+        self.seconds = seconds
+        self.statistics = statistics
+
+    def __str__(self):
+        """
+        Stringify the profile as a text table
+
+        :returns: string
+        """
+        return self.table()
+
+    def as_dict(self):
+        """
+        Get the profile as plain data, e.g. to be logged as JSON
+
+        :returns: dict
+        """
+        return {
+            'loans': self.loans,
+            'matched': self.matched,
+            'seconds': self.seconds,
+            'filters': [{
+                'filter': stats.name,
+                'evaluated': stats.evaluated,
+                'rejected': stats.rejected,
+                'skipped': stats.skipped,
+                'seconds': stats.seconds,
+                'per_call': stats.per_call,
+                'short_circuited': stats.short_circuited,
+                'indexed': stats.indexed,
+            } for stats in self.statistics],
+        }
+
+    def table(self):
+        """
+        Format the profile as a text table
+
+        :returns: string
+        """
+        rows = [FilterProfile.HEADERS]
+        for stats in self.statistics:
+            name = stats.name
+            if stats.indexed:
+                name += ' (indexed)'
+            rows.append((
+                name,
+                str(stats.evaluated),
+                str(stats.rejected),
+                str(stats.skipped),
+                '{:.3f}'.format(stats.seconds * 1e3),
+                '{:.3f}'.format(stats.per_call * 1e6),
+                'yes' if stats.short_circuited else 'no',
+            ))
+        widths = [max(len(row[column]) for row in rows)
+                  for column in range(len(FilterProfile.HEADERS))]
+
+        lines = list()
+        for number, row in enumerate(rows):
+            cells = [row[0].ljust(widths[0])]
+            cells.extend(cell.rjust(width)
+                         for cell, width in zip(row[1:], widths[1:]))
+            lines.append('  '.join(cells))
+            if number == 0:
+                lines.append('  '.join('-' * width for width in widths))
+        lines.append("{} of {} loans matched in {:.3f} ms".format(
+            self.matched, self.loans, self.seconds * 1e3))
+        return '\n'.join(lines)
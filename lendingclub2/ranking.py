@@ -0,0 +1,129 @@
+# Filename: ranking.py
+
+"""
+LendingClub2 Ranking Module
+
+Interface functions:
+    batch_keys
+    key_function
+"""
+
+# Standard libraries
+import collections
+from operator import attrgetter
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.score import Scorer
+
+
+# Internal classes
+class _Descending:
+    """
+    Wrapper inverting the ordering of a sort key value
+    """
+    __slots__ = ('value', )
+
+    def __init__(self, value):
+        """
+        Constructor.
+
+        :param value: any comparable object
+        """
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+# Internal functions
+def _mapping_getter(mapping):
+    """
+    Build a key function looking up a loan ID in a mapping.
+
+    :param mapping: mapping of loan ID to a precomputed value
+    :returns: callable accepting a loan
+    """
+    def getter(loan):
+        """
+        Look up the precomputed value of the loan.
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: precomputed value
+        """
+        return mapping[loan.id]
+    return getter
+
+
+# Interface functions
+def batch_keys(keys, loans):
+    """
+    Replace the scorers in the ranking keys by their scores, computed in a
+    single batch over the loans.
+
+    :param keys: iterable of ranking keys
+    :param loans: list of :py:class:`~lendingclub2.loan.Loan`.
+    :returns: tuple of ranking keys
+    """
+    return tuple(key.scores(loans) if isinstance(key, Scorer) else key
+                 for key in keys)
+
+
+def key_function(keys):
+    """
+    Build a single key function out of one or more ranking keys.
+
+    Each key can be an attribute name (dotted names such as
+    ``'borrower.dti'`` are allowed, prefix with ``'-'`` for descending
+    order), a callable accepting a loan, or a mapping of loan ID to a
+    precomputed value.
+
+    :param keys: iterable of string, callable or mapping
+    :returns: callable accepting a loan
+    """
+    getters = list()
+    for key in keys:
+        descending = False
+        if isinstance(key, str):
+            if key.startswith('-'):
+                descending = True
+                key = key[1:]
+            getter = attrgetter(key)
+        elif isinstance(key, collections.abc.Mapping):
+            getter = _mapping_getter(key)
+        elif callable(key):
+            getter = key
+        else:
+            fstr = "invalid ranking key: {!r}".format(key)
+            raise LCError(fstr)
+        getters.append((getter, descending))
+
+    if not getters:
+        fstr = "at least one ranking key is required"
+        raise LCError(fstr)
+
+    if len(getters) == 1 and not getters[0][1]:
+        return getters[0][0]
+
+    def composite_key(loan):
+        """
+        Compute the composite key of a loan.
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: tuple
+        """
+        values = list()
+        for getter, descending in getters:
+            value = getter(loan)
+            if descending:
+                if isinstance(value, (int, float)) and \
+                        not isinstance(value, bool):
+                    value = -value
+                else:
+                    value = _Descending(value)
+            values.append(value)
+        return tuple(values)
+    return composite_key
@@ -10,6 +10,7 @@ Interface functions:
 
 # Standard libraries
 import datetime
+import threading
 import time
 
 # Requests
@@ -21,50 +22,57 @@ from lendingclub2.config import REQUEST_LIMIT_PER_SEC
 from lendingclub2.error import LCError
 
 __LAST_REQUEST_TIMESTAMP = None
+__REQUEST_LOCK = threading.Lock()
 
 
-# pylint: disable=global-statement
 def get(*args, **kwargs):
     """
     Wrapper around :py:func:`requests.get` function.
 
     :param args: tuple - positional arguments for :py:func:`requests.get`.
     :param kwargs: dict - keyword arguments for :py:func:`requests.get`.
+                   An instance of :py:class:`requests.Session` can be given
+                   as ``session`` to reuse its connections; its headers are
+                   used as they are and need to include the authorization.
     :returns: instance of :py:class:`requests.Response`.
     """
-    global __LAST_REQUEST_TIMESTAMP
-    __add_headers_to_kwargs(kwargs)
+    session = kwargs.pop('session', None)
+    if session is None:
+        session = requests
+        __add_headers_to_kwargs(kwargs)
     __wait_request()
     try:
-        response = requests.get(*args, **kwargs)
-        __LAST_REQUEST_TIMESTAMP = datetime.datetime.now()
+        response = session.get(*args, **kwargs)
+        __mark_request()
         return response
     except requests.ConnectionError as exc:
         fstr = "Cannot connect correctly"
         raise LCError(fstr) from exc
-# pylint: enable=global-statement
 
 
-# pylint: disable=global-statement
 def post(*args, **kwargs):
     """
     Wrapper around :py:func:`requests.post` function.
 
     :param args: tuple - positional arguments for :py:func:`requests.post`.
     :param kwargs: dict - keyword arguments for :py:func:`requests.post`.
+                   An instance of :py:class:`requests.Session` can be given
+                   as ``session`` to reuse its connections; its headers are
+                   used as they are and need to include the authorization.
     :returns: instance of :py:class:`requests.Response`.
     """
-    global __LAST_REQUEST_TIMESTAMP
-    __add_headers_to_kwargs(kwargs)
+    session = kwargs.pop('session', None)
+    if session is None:
+        session = requests
+        __add_headers_to_kwargs(kwargs)
     __wait_request()
     try:
-        response = requests.post(*args, **kwargs)
-        __LAST_REQUEST_TIMESTAMP = datetime.datetime.now()
+        response = session.post(*args, **kwargs)
+        __mark_request()
         return response
     except requests.ConnectionError as exc:
         fstr = "Cannot connect correctly"
         raise LCError(fstr) from exc
-# pylint: enable=global-statement
 
 
 # Internal functions
@@ -82,18 +90,39 @@ def __add_headers_to_kwargs(kwargs):
         kwargs['headers'] = auth.header
 
 
+# pylint: disable=global-statement
+def __mark_request():
+    """
+    Record the time the latest request completed.
+    """
+    global __LAST_REQUEST_TIMESTAMP
+    with __REQUEST_LOCK:
+        now = datetime.datetime.now()
+        if __LAST_REQUEST_TIMESTAMP is None or \
+                now > __LAST_REQUEST_TIMESTAMP:
+            __LAST_REQUEST_TIMESTAMP = now
+# pylint: enable=global-statement
+
+
+# pylint: disable=global-statement
 def __wait_request():
     """
     Ensure that we are not violating the requirements on sending request
-    at the correct rate.
+    at the correct rate. Concurrent callers reserve consecutive slots, so
+    requests from several threads are still spaced out correctly.
     """
-    if __LAST_REQUEST_TIMESTAMP is None:
-        return
-
-    now = datetime.datetime.now()
-    delta = now - __LAST_REQUEST_TIMESTAMP
-    total_seconds = delta.total_seconds()
-    wait_time_between_requests = 1.0 / REQUEST_LIMIT_PER_SEC
-    if total_seconds < wait_time_between_requests:
-        wait_time = wait_time_between_requests - total_seconds
+    global __LAST_REQUEST_TIMESTAMP
+    wait_time_between_requests = datetime.timedelta(
+        seconds=1.0 / REQUEST_LIMIT_PER_SEC)
+    with __REQUEST_LOCK:
+        now = datetime.datetime.now()
+        slot = now
+        if __LAST_REQUEST_TIMESTAMP is not None:
+            slot = max(now, __LAST_REQUEST_TIMESTAMP +
+                       wait_time_between_requests)
+        __LAST_REQUEST_TIMESTAMP = slot
+
+    wait_time = (slot - now).total_seconds()
+    if wait_time > 0:
         time.sleep(wait_time)
+# pylint: enable=global-statement
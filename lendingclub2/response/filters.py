@@ -0,0 +1,124 @@
+# Filename: filters.py
+
+"""
+LendingClub2 Saved Filters Response Module
+
+Interface classes:
+    SavedFilter
+    SavedFilters
+"""
+
+# lendingclub2
+from lendingclub2 import request
+from lendingclub2.config import API_VERSION, DNS, ENDPOINTS
+from lendingclub2.response import Response
+
+
+class SavedFilter:
+    """
+    Information of a loan filter saved in the investor account
+    """
+    def __init__(self, response):
+        """
+        Constructor
+
+        :param response: dict
+        """
+        self._response = response
+
+    def __repr__(self):
+        """
+        Get the string representation of the saved filter
+
+        :returns: string
+        """
+        return "SavedFilter(id={}, name={})".format(self.id, self.name)
+
+    @property
+    def id(self):
+        """
+        Get the ID of the saved filter
+
+        :returns: int
+        """
+        return self._response['id']
+
+    @property
+    def name(self):
+        """
+        Get the name of the saved filter
+
+        :returns: string
+        """
+        return self._response['name']
+
+
+class SavedFilters(Response):
+    """
+    Get the response of filters endpoint
+    """
+    def __init__(self, investor_id):
+        """
+        Constructor
+
+        :param investor_id: int
+        """
+        self._investor_id = investor_id
+        response = request.get(self.url)
+        Response.__init__(self, response)
+
+        filters_json = self.json
+        if isinstance(filters_json, dict):
+            filters_json = filters_json.get('filters', ())
+        self._filters = [SavedFilter(filter_json)
+                         for filter_json in filters_json or ()]
+
+    def __contains__(self, filter_id):
+        """
+        Check if the filter ID is one of the saved filters
+
+        :param filter_id: int
+        :returns: boolean
+        """
+        return any(saved.id == filter_id for saved in self._filters)
+
+    def __iter__(self):
+        """
+        Get the iterable version of saved filters
+
+        :returns: an iterable
+        """
+        return iter(self._filters)
+
+    def __len__(self):
+        """
+        Find the number of saved filters
+
+        :returns: int
+        """
+        return len(self._filters)
+
+    def find(self, name):
+        """
+        Find the saved filter by its name
+
+        :param name: string
+        :returns: instance of
+                  :py:class:`~lendingclub2.response.filters.SavedFilter` or
+                  None if there's no saved filter with that name
+        """
+        for saved in self._filters:
+            if saved.name == name:
+                return saved
+        return None
+
+    @property
+    def url(self):
+        """
+        Find the relevant url
+
+        :returns: string
+        """
+        url = DNS + ENDPOINTS['filters'].format(
+            version=API_VERSION, investor_id=self._investor_id)
+        return url
@@ -2,14 +2,33 @@
 
 """
 LendingClub2 Notes Response Module
+
+Interface classes:
+    Note
+    Notes
+    NotesStore
 """
 
+# Standard libraries
+from array import array
+
 # lendingclub2
+from lendingclub2 import aggregate
 from lendingclub2 import request
 from lendingclub2.config import API_VERSION, DNS, ENDPOINTS, NoteStatus
+from lendingclub2.error import LCError
 from lendingclub2.response import Response
 
 
+# Constants
+NOTE_REQUIRED_FIELDS = ('noteId', )
+OWNED_NOTE_FIELDS = frozenset((
+    'grade', 'interestRate', 'issueDate', 'loanAmount', 'loanId',
+    'loanLength', 'loanStatus', 'loanStatusDate', 'noteAmount', 'noteId',
+    'orderDate', 'orderId', 'paymentsReceived',
+))
+
+
 class Note:
     """
     Information of a note
@@ -47,7 +66,7 @@ class Note:
 
         :returns: boolean
         """
-        return self.status == NoteStatus.CHARGED_OFF
+        return self.status == NoteStatus.CHARGED_OFF.value
 
     @property
     def current(self):
@@ -56,7 +75,7 @@ class Note:
 
         :returns: boolean
         """
-        return self.status == NoteStatus.CURRENT
+        return self.status == NoteStatus.CURRENT.value
 
     @property
     def id(self):
@@ -120,7 +139,7 @@ class Note:
 
         :returns: boolean
         """
-        return self.status == NoteStatus.ISSUED
+        return self.status == NoteStatus.ISSUED.value
 
     @property
     def paid(self):
@@ -129,7 +148,16 @@ class Note:
 
         :returns: boolean
         """
-        return self.status == NoteStatus.FULLY_PAID
+        return self.status == NoteStatus.FULLY_PAID.value
+
+    @property
+    def principal_pending(self):
+        """
+        Get the principal of the note which is still outstanding
+
+        :returns: float
+        """
+        return self._response['principalPending']
 
     @property
     def status(self):
@@ -140,26 +168,96 @@ class Note:
         """
         return self._response['loanStatus']
 
+    def field(self, name, default=None):
+        """
+        Get a raw field of the note, e.g. one without a property
+
+        :param name: string - raw field name (e.g. ``'addrState'``)
+        :param default: value returned if the note doesn't have the field
+                        (default: None)
+        :returns: value of the field
+        """
+        return self._response.get(name, default)
+
 
 class Notes(Response):
     """
-    Get the response of detailed_notes endpoint
+    Get the response of detailed_notes endpoint, or of the lighter notes
+    endpoint
     """
-    def __init__(self, investor_id):
+    def __init__(self, investor_id, fields=None, detailed=None,
+                 needs_detail=None):
         """
         Constructor
 
         :param investor_id: int
-        """
+        :param fields: iterable of string - raw field names (such as
+                       ``'loanStatus'``) to keep in each note, in addition to
+                       ``noteId``. The other fields are dropped right after
+                       decoding, and accessing their properties raises
+                       :py:class:`KeyError` (default: None, keep every field)
+        :param detailed: boolean - request the detailed notes; the notes
+                         endpoint doesn't include the payment details, such
+                         as ``principalPending`` (default: None, only if
+                         some fields aren't in OWNED_NOTE_FIELDS)
+        :param needs_detail: callable accepting a
+                             :py:class:`~lendingclub2.response.notes.Note`
+                             of the notes endpoint and returning a boolean.
+                             When the detailed notes are needed, the notes
+                             endpoint is requested first, and the detailed
+                             notes are only requested and merged if some
+                             notes need them. The other notes only have the
+                             fields of the notes endpoint. Raises
+                             :py:class:`~lendingclub2.error.LCError` if
+                             the detailed notes aren't needed, i.e. with
+                             ``detailed=False`` or fields all in
+                             OWNED_NOTE_FIELDS (default: None, request the
+                             detailed notes directly)
+        """
+        if detailed is None:
+            detailed = fields is None or \
+                not set(fields) <= OWNED_NOTE_FIELDS
+        if needs_detail is not None and not detailed:
+            fstr = "needs_detail requires the detailed notes"
+            hint = "set detailed=True or request fields which aren't " \
+                   "part of the notes endpoint"
+            raise LCError(fstr, hint=hint)
         self._investor_id = investor_id
+        self._endpoint = 'notes'
+        if needs_detail is None and detailed:
+            self._endpoint = 'detailed_notes'
+        self._detailed = self._endpoint == 'detailed_notes'
         response = request.get(self.url)
         Response.__init__(self, response)
         self._notes = list()
+        self._store = None
+
+        projection = None
+        if fields is not None:
+            projection = tuple(sorted(set(NOTE_REQUIRED_FIELDS) |
+                                      set(fields)))
         try:
-            self._notes = [Note(note_json)
-                           for note_json in self.json['myNotes']]
+            notes_json = self.json['myNotes']
         except KeyError:
-            pass
+            return
+
+        if needs_detail is not None:
+            notes_json = self._merge_details(notes_json, needs_detail)
+
+        if projection is None:
+            self._notes = [Note(note_json) for note_json in notes_json]
+        else:
+            self._notes = [Note({field: note_json[field]
+                                 for field in projection
+                                 if field in note_json})
+                           for note_json in notes_json]
+            # Don't keep the raw notes alive through the JSON body, nor
+            # through the content of the HTTP response
+            self._json = {key: value for key, value in self.json.items()
+                          if key != 'myNotes'}
+            # pylint: disable=protected-access
+            self._response._content = b''
+            # pylint: enable=protected-access
 
     def __iter__(self):
         """
@@ -177,6 +275,41 @@ class Notes(Response):
         """
         return len(self._notes)
 
+    def group_by(self, key, **aggregates):
+        """
+        Group the notes and compute the aggregates in a single pass, e.g.
+        ``notes.group_by('status', count=Count(), amount=Sum('amount'))``.
+
+        :param key: string (e.g. ``'grade'``, ``'status'``), callable
+                    accepting a note, or tuple of strings for a composite key
+        :param aggregates: dict - name of the result mapped to an instance of
+                           :py:class:`~lendingclub2.aggregate.Aggregate`.
+        :returns: dict - group key mapped to a dict of aggregate results
+        """
+        return aggregate.group_by(self.store, key, **aggregates)
+
+    @property
+    def detailed(self):
+        """
+        Check if the detailed_notes endpoint was requested, either for all
+        the notes or for the notes needing the details
+
+        :returns: boolean
+        """
+        return self._detailed
+
+    @property
+    def store(self):
+        """
+        Get the columnar representation of the notes, built on first access
+
+        :returns: instance of
+                  :py:class:`~lendingclub2.response.notes.NotesStore`.
+        """
+        if self._store is None:
+            self._store = NotesStore(self._notes)
+        return self._store
+
     @property
     def url(self):
         """
@@ -184,6 +317,247 @@ class Notes(Response):
 
         :returns: string
         """
-        url = DNS + ENDPOINTS['detailed_notes'].format(
+        url = DNS + ENDPOINTS[self._endpoint].format(
             version=API_VERSION, investor_id=self._investor_id)
         return url
+
+    def _merge_details(self, notes_json, needs_detail):
+        """
+        Merge the detailed notes into the notes needing them
+
+        :param notes_json: list of dict - notes of the notes endpoint
+        :param needs_detail: callable accepting a
+                             :py:class:`~lendingclub2.response.notes.Note`.
+        :returns: list of dict
+        """
+        wanted = {note_json['noteId'] for note_json in notes_json
+                  if needs_detail(Note(note_json))}
+        if not wanted:
+            return notes_json
+
+        url = DNS + ENDPOINTS['detailed_notes'].format(
+            version=API_VERSION, investor_id=self._investor_id)
+        details = Response(request.get(url))
+        self._detailed = True
+        if not details.successful:
+            fstr = "cannot retrieve the detailed notes"
+            raise LCError(fstr)
+        found = {detail_json['noteId']: detail_json
+                 for detail_json in details.json.get('myNotes', ())
+                 if detail_json['noteId'] in wanted}
+
+        merged = list()
+        for note_json in notes_json:
+            detail_json = found.get(note_json['noteId'])
+            if detail_json is not None:
+                note_json = dict(note_json, **detail_json)
+            merged.append(note_json)
+        return merged
+
+
+class NotesStore:
+    """
+    Columnar representation of notes for portfolio-wide computations.
+
+    Each field is stored once per note in a column, the status is decoded
+    once into a small integer code, and the positions of the notes are
+    indexed by loan ID, grade and status. Counts by status are read from the
+    index, and sums run over compact arrays instead of going through each
+    :py:class:`~lendingclub2.response.notes.Note`. Missing amounts are
+    stored as 0.0.
+    """
+    COLUMNS = ('amount', 'charged_off', 'current', 'grade', 'id', 'late',
+               'loan_id', 'new', 'paid', 'principal_pending', 'status')
+    # Boolean columns telling if each note has the status
+    STATUS_COLUMNS = {
+        'charged_off': NoteStatus.CHARGED_OFF,
+        'current': NoteStatus.CURRENT,
+        'new': NoteStatus.ISSUED,
+        'paid': NoteStatus.FULLY_PAID,
+    }
+
+    def __init__(self, notes):
+        """
+        Constructor
+
+        :param notes: iterable of
+                      :py:class:`~lendingclub2.response.notes.Note`.
+        """
+        self._notes = list(notes)
+        # pylint: disable=protected-access
+        responses = [note._response for note in self._notes]
+        # pylint: enable=protected-access
+
+        self._columns = {
+            'amount': array('d', [response.get('noteAmount') or 0.0
+                                  for response in responses]),
+            'grade': [response.get('grade') for response in responses],
+            'id': [response.get('noteId') for response in responses],
+            'loan_id': [response.get('loanId') for response in responses],
+            'principal_pending': array(
+                'd', [response.get('principalPending') or 0.0
+                      for response in responses]),
+        }
+
+        # Dictionary encoding of the status: each distinct status is only
+        # compared against NoteStatus once
+        self._status_names = list()
+        codes = dict()
+        self._codes = array('B')
+        for response in responses:
+            status = response.get('loanStatus')
+            code = codes.get(status)
+            if code is None:
+                code = len(self._status_names)
+                if code > 255:
+                    fstr = "too many distinct note statuses"
+                    raise LCError(fstr)
+                codes[status] = code
+                self._status_names.append(status)
+            self._codes.append(code)
+        self._status_codes = codes
+
+        known = {status.value for status in NoteStatus}
+        self._late_codes = frozenset(code for status, code in codes.items()
+                                     if status not in known)
+
+        self._indexes = {
+            'grade': _positions_by(self._columns['grade']),
+            'loan_id': _positions_by(self._columns['loan_id']),
+            'status': _positions_by(self._codes),
+        }
+
+    def __iter__(self):
+        """
+        Get the iterable version of notes
+
+        :returns: an iterable
+        """
+        return iter(self._notes)
+
+    def __len__(self):
+        """
+        Find the number of notes
+
+        :returns: int
+        """
+        return len(self._notes)
+
+    def column(self, name):
+        """
+        Get the values of a note property for every note, in order
+
+        :param name: string - one of COLUMNS
+        :returns: sequence
+        :raises KeyError: if the column doesn't exist
+        """
+        column = self._columns.get(name)
+        if column is not None:
+            return column
+
+        if name == 'status':
+            names = self._status_names
+            return [names[code] for code in self._codes]
+        if name == 'late':
+            late = self._late_codes
+            return [code in late for code in self._codes]
+        status = NotesStore.STATUS_COLUMNS[name]
+        code = self._status_codes.get(status.value)
+        return [value == code for value in self._codes]
+
+    def count_by_status(self):
+        """
+        Count the notes of each status
+
+        :returns: dict - status (string) mapped to the number of notes
+        """
+        return {self._status_names[code]: len(positions)
+                for code, positions in self._indexes['status'].items()}
+
+    def late_count(self):
+        """
+        Count the notes which are late (see
+        :py:attr:`~lendingclub2.response.notes.Note.late`)
+
+        :returns: int
+        """
+        return sum(len(self._indexes['status'][code])
+                   for code in self._late_codes)
+
+    def late_ratio(self):
+        """
+        Get the ratio of notes which are late
+
+        :returns: float (0.0 - 1.0)
+        """
+        if not self._notes:
+            return 0.0
+        return self.late_count() / len(self._notes)
+
+    def notes_of_loan(self, loan_id):
+        """
+        Get the notes of a loan
+
+        :param loan_id: int
+        :returns: list of :py:class:`~lendingclub2.response.notes.Note`.
+        """
+        return [self._notes[position]
+                for position in self._indexes['loan_id'].get(loan_id, ())]
+
+    def outstanding_principal(self):
+        """
+        Get the principal which is still outstanding over all the notes
+
+        :returns: float
+        """
+        return sum(self._columns['principal_pending'])
+
+    def select(self, grade=None, status=None, loan_id=None):
+        """
+        Get the notes matching all the given criteria, using the indexes
+
+        :param grade: string (default: None, any grade)
+        :param status: string or member of
+                       :py:class:`~lendingclub2.config.NoteStatus`
+                       (default: None, any status)
+        :param loan_id: int (default: None, any loan)
+        :returns: instance of
+                  :py:class:`~lendingclub2.response.notes.NotesStore`.
+        """
+        if isinstance(status, NoteStatus):
+            status = status.value
+
+        selected = None
+        criteria = (
+            ('grade', grade, grade),
+            ('status', status, self._status_codes.get(status)),
+            ('loan_id', loan_id, loan_id),
+        )
+        for name, value, key in criteria:
+            if value is None:
+                continue
+            positions = set(self._indexes[name].get(key, ()))
+            selected = positions if selected is None else selected & positions
+
+        if selected is None:
+            return NotesStore(self._notes)
+        return NotesStore(self._notes[position]
+                          for position in sorted(selected))
+
+
+# Internal functions
+def _positions_by(values):
+    """
+    Index the positions of the values
+
+    :param values: sequence of hashable values
+    :returns: dict - value mapped to an array of positions in ascending order
+    """
+    index = dict()
+    for position, value in enumerate(values):
+        positions = index.get(value)
+        if positions is None:
+            positions = array('L')
+            index[value] = positions
+        positions.append(position)
+    return index
@@ -2,10 +2,26 @@
 
 """
 LendingClub2 Response Order Module
+
+Interface classes:
+    ArmedOrder
+    Order
+    OrderConfirmation
+    OrderNote
+
+Interface functions:
+    validate_notes
 """
 
+# Standard libraries
+import json
+
+# Requests
+import requests
+
 # lendingclub2
 from lendingclub2 import request
+from lendingclub2.authorization import Authorization
 from lendingclub2.config import API_VERSION, DNS, ENDPOINTS
 from lendingclub2.error import LCError
 from lendingclub2.response import Response
@@ -63,6 +79,213 @@ class OrderNote:
         return self._portfolio_id
 
 
+class ArmedOrder:
+    """
+    Order prepared ahead of time, so firing it only fills the loan IDs in
+    pre-encoded JSON and posts it on an open connection.
+
+    The amount and the portfolio are validated when the order is armed, the
+    request headers are set on a dedicated session, and the payload is
+    templated as bytes. Every note of the order has the same amount.
+    """
+    def __init__(self, investor_id, amount=25, portfolio_id=None):
+        """
+        Constructor
+
+        :param investor_id: int
+        :param amount: float - amount of each note, must be a positive
+                       multiple of 25 (default: 25)
+        :param portfolio_id: int - portfolio ID which the notes will be
+                             assigned to (default: None)
+        """
+        # Validate once, the same way as a regular note
+        OrderNote(0, amount, portfolio_id=portfolio_id)
+        self._investor_id = investor_id
+        self._amount = amount
+        self._portfolio_id = portfolio_id
+
+        self._session = requests.Session()
+        self._session.headers.update(Authorization().header)
+        self._session.headers['Content-Type'] = 'application/json'
+
+        # Head of the payload, and head and tail of each note
+        note_tail = ', "requestedAmount": {}'.format(json.dumps(amount))
+        if portfolio_id is not None:
+            note_tail += ', "portfolioId": {}'.format(
+                json.dumps(portfolio_id))
+        self._template = (
+            str.encode('{{"aid": {}, "orders": ['.format(
+                json.dumps(investor_id))),
+            b'{"loanId": ',
+            str.encode(note_tail + '}'),
+        )
+
+    @property
+    def url(self):
+        """
+        Get the relevant URL
+
+        :returns: string
+        """
+        url = DNS + ENDPOINTS['submit_order'].format(
+            version=API_VERSION, investor_id=self._investor_id)
+        return url
+
+    def close(self):
+        """
+        Close the connections of the order
+        """
+        self._session.close()
+
+    def fire(self, *loan_ids):
+        """
+        Submit the order for the loans
+
+        :param loan_ids: iterable of int
+        :returns: instance of :py:class:`~lendingclub2.response.order.Order`.
+        """
+        order_notes = tuple(validate_notes(
+            OrderNote(loan_id, self._amount, portfolio_id=self._portfolio_id)
+            for loan_id in loan_ids))
+        response = request.post(self.url, data=self.payload(*loan_ids),
+                                session=self._session)
+        return Order.from_response(self._investor_id, order_notes, response)
+
+    def payload(self, *loan_ids):
+        """
+        Get the payload which would be posted for the loans
+
+        :param loan_ids: iterable of int
+        :returns: bytes
+        """
+        order_head, head, tail = self._template
+        return order_head + b', '.join(
+            [head + b'%d' % loan_id + tail for loan_id in loan_ids]) + b']}'
+
+    def warm(self):
+        """
+        Open the connection to the API ahead of time. The request doesn't
+        go through the rate limiter since it's not an API call.
+        """
+        try:
+            self._session.head(DNS)
+        except requests.ConnectionError as exc:
+            fstr = "Cannot connect correctly"
+            raise LCError(fstr) from exc
+
+
+class OrderConfirmation:
+    """
+    Outcome of the order of a single note
+    """
+    def __init__(self, order_note, response=None, unknown=False):
+        """
+        Constructor
+
+        :param order_note: instance of
+                           :py:class:`~lendingclub2.response.order.OrderNote`.
+        :param response: dict - entry of ``orderConfirmations`` for the loan
+                         of the note (default: None, the loan wasn't
+                         confirmed)
+        :param unknown: boolean - the order may have been filled without
+                        being confirmed, e.g. the connection dropped once it
+                        was sent (default: False)
+        """
+        self._order_note = order_note
+        self._response = response or dict()
+        self._unknown = unknown
+
+    def __repr__(self):
+        """
+        Get the string representation of the confirmation
+
+        :returns: string
+        """
+        return "OrderConfirmation(loan_id={}, requested={:.2f}, " \
+               "invested={:.2f}, unknown={})".format(
+                   self.loan_id, self.requested_amount, self.invested_amount,
+                   self._unknown)
+
+    @property
+    def execution_status(self):
+        """
+        Get the execution statuses of the order, e.g. ``ORDER_FULFILLED``
+
+        :returns: tuple of string
+        """
+        return tuple(self._response.get('executionStatus') or ())
+
+    @property
+    def fulfilled(self):
+        """
+        Check if the note was bought
+
+        :returns: boolean
+        """
+        return 'ORDER_FULFILLED' in self.execution_status and \
+            bool(self.invested_amount)
+
+    @property
+    def invested_amount(self):
+        """
+        Get the amount actually invested in the loan
+
+        :returns: float
+        """
+        return self._response.get('investedAmount') or 0.0
+
+    @property
+    def loan_id(self):
+        """
+        Get the loan ID
+
+        :returns: int
+        """
+        return self._order_note.loan_id
+
+    @property
+    def order_note(self):
+        """
+        Get the note which was ordered
+
+        :returns: instance of
+                  :py:class:`~lendingclub2.response.order.OrderNote`.
+        """
+        return self._order_note
+
+    @property
+    def requested_amount(self):
+        """
+        Get the amount requested for the loan
+
+        :returns: float
+        """
+        return self._order_note.amount
+
+    @property
+    def unfilled_amount(self):
+        """
+        Get the requested amount which wasn't invested. Nothing is known to
+        be unfilled when the outcome is unknown.
+
+        :returns: float
+        """
+        if self._unknown:
+            return 0.0
+        return self.requested_amount - self.invested_amount
+
+    @property
+    def unknown(self):
+        """
+        Check if the outcome of the order is unknown. The requested amount
+        may have been invested, so it shouldn't be invested elsewhere until
+        the notes or the available cash of the account are requested again.
+
+        :returns: boolean
+        """
+        return self._unknown
+
+
 class Order(Response):
     """
     Submit an order
@@ -92,15 +315,45 @@ class Order(Response):
         }
         response = request.post(self.url, json=payload)
         Response.__init__(self, response)
+        self._parse_confirmations()
+
+    @classmethod
+    def from_response(cls, investor_id, order_notes, response):
+        """
+        Get the order out of the response of an order already submitted,
+        e.g. by :py:meth:`~lendingclub2.response.order.ArmedOrder.fire`.
+
+        :param investor_id: int
+        :param order_notes: tuple of
+                            :py:class:`~lendingclub2.response.order.OrderNote`.
+        :param response: instance of :py:class:`requests.Response`.
+        :returns: instance of :py:class:`~lendingclub2.response.order.Order`.
+        """
+        order = cls.__new__(cls)
+        order._investor_id = investor_id
+        order._order_notes = order_notes
+        Response.__init__(order, response)
+        order._parse_confirmations()
+        return order
+
+    @property
+    def confirmations(self):
+        """
+        Get the outcome of the order of each note, in the order of the notes
+
+        :returns: list of
+                  :py:class:`~lendingclub2.response.order.OrderConfirmation`.
+        """
+        return list(self._confirmations)
 
     @property
     def id(self):
         """
         Get the id of the order
 
-        :returns: int
+        :returns: int or None if the order wasn't accepted
         """
-        return self._response.json['orderInstructId']
+        return self.json.get('orderInstructId')
 
     @property
     def url(self):
@@ -116,28 +369,74 @@ class Order(Response):
     @property
     def successful(self):
         """
-        Determine if the order submission was successful
+        Determine if the order submission was successful, i.e. every note
+        was bought, even partially, and no other loan was confirmed
 
         :returns: boolean
         """
-        if not Response.successful:
-            return False
-
-        # Get the confirmation
-        for confirm_json in self.json['orderConfirmations']:
-            loan_id = confirm_json['loanId']
-            note = None
-            for order_note in self._order_notes:
-                if loan_id == order_note.loan_id:
-                    note = order_note
-                    break
-            if note is None:
-                return False
-
-            # Now check if we see ORDER_FULFILLED in executionStatus
-            if 'ORDER_FULFILLED' not in confirm_json['executionStatus']:
-                return False
-            # Now check if the amount is non-zero
-            if not confirm_json['investedAmount']:
-                return False
-        return True
+        return self._successful
+
+    def confirmation(self, loan_id):
+        """
+        Get the outcome of the order of a loan
+
+        :param loan_id: int
+        :returns: instance of
+                  :py:class:`~lendingclub2.response.order.OrderConfirmation`
+                  or None if the loan wasn't ordered
+        """
+        return self._by_loan_id.get(loan_id)
+
+    def _parse_confirmations(self):
+        """
+        Match the confirmations with the notes once, by loan ID
+        """
+        ordered = {order_note.loan_id for order_note in self._order_notes}
+
+        accepted = super().successful
+        confirmations_json = dict()
+        unexpected = False
+        if accepted:
+            for confirm_json in self.json.get('orderConfirmations', ()):
+                loan_id = confirm_json['loanId']
+                if loan_id not in ordered:
+                    unexpected = True
+                    continue
+                confirmations_json[loan_id] = confirm_json
+
+        self._confirmations = [
+            OrderConfirmation(order_note,
+                              confirmations_json.get(order_note.loan_id))
+            for order_note in self._order_notes
+        ]
+        self._by_loan_id = dict()
+        for confirmation in self._confirmations:
+            self._by_loan_id.setdefault(confirmation.loan_id, confirmation)
+        self._successful = accepted and not unexpected and \
+            all(confirmation.fulfilled
+                for confirmation in self._confirmations)
+
+
+# Interface functions
+def validate_notes(order_notes):
+    """
+    Check the notes of an order
+
+    :param order_notes: iterable of
+                        :py:class:`~lendingclub2.response.order.OrderNote`.
+    :returns: list of :py:class:`~lendingclub2.response.order.OrderNote`.
+    :raises LCError: if a loan is ordered more than once
+    """
+    order_notes = list(order_notes)
+    loan_ids = set()
+    for order_note in order_notes:
+        if not isinstance(order_note, OrderNote):
+            fstr = "{!r} is not an instance of OrderNote".format(order_note)
+            raise LCError(fstr)
+        if order_note.loan_id in loan_ids:
+            fstr = "loan {} is ordered more than once".format(
+                order_note.loan_id)
+            hint = "combine the amounts in a single OrderNote"
+            raise LCError(fstr, hint=hint)
+        loan_ids.add(order_note.loan_id)
+    return order_notes
@@ -4,6 +4,7 @@
 LendingClub2 Summary Response Module
 
 Interface classes:
+    AvailableCash
     Summary
 """
 
@@ -13,6 +14,49 @@ from lendingclub2.config import API_VERSION, DNS, ENDPOINTS
 from lendingclub2.response import Response
 
 
+class AvailableCash(Response):
+    """
+    Get the response of available cash endpoint, a cheaper alternative to
+    :py:class:`~lendingclub2.response.summary.Summary` when only the cash
+    is needed
+    """
+    def __init__(self, investor_id):
+        """
+        Constructor
+
+        :param investor_id: int
+        """
+        self._investor_id = investor_id
+        response = request.get(self.url)
+        Response.__init__(self, response)
+
+    @property
+    def available_cash(self):
+        """
+        Get all the available cash amount
+
+        :returns: float
+        """
+        return self.json['availableCash']
+
+    @property
+    def url(self):
+        """
+        Find the relevant url
+
+        :returns: string
+        """
+        url = DNS + ENDPOINTS['available_cash'].format(
+            version=API_VERSION, investor_id=self._investor_id)
+        return url
+
+    def update(self):
+        """
+        Update the available cash
+        """
+        Response.__init__(self, request.get(self.url))
+
+
 class Summary(Response):
     """
     Get the response of summary endpoint
@@ -60,4 +104,4 @@ class Summary(Response):
         """
         Update the summary
         """
-        self._response = request.get(self.url)
+        Response.__init__(self, request.get(self.url))
@@ -0,0 +1,198 @@
+# Filename: score.py
+
+"""
+LendingClub2 Score Module
+
+Interface classes:
+    ExpectedReturnScorer
+    FunctionScorer
+    LinearScorer
+    Scorer
+"""
+
+# Standard libraries
+from abc import abstractmethod
+from abc import ABC
+from operator import attrgetter
+
+# lendingclub2
+from lendingclub2.error import LCError
+
+
+# Interface classes
+class Scorer(ABC):
+    """
+    Abstract base class of a loan scoring model. Scores are computed for
+    whole batches of loans and cached per loan ID and version, so a loan is
+    only scored again once the listing changes its content.
+
+    A scorer is callable with a single loan, which means it can be used
+    directly as a key of :py:meth:`~lendingclub2.loan.Listing.rank`.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._cache = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, loan):
+        """
+        Get the score of a single loan
+
+        :param loan: instance of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: float
+        """
+        cached = self._cache.get(loan.id)
+        if cached is not None and cached[0] == loan.version:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        score = self.score_loans((loan, ))[0]
+        self._cache[loan.id] = (loan.version, score)
+        return score
+
+    def clear(self):
+        """
+        Remove all cached scores
+        """
+        self._cache = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def rank(self, listing, k=None):
+        """
+        Get the loans ordered from the highest to the lowest score
+
+        :param listing: instance of :py:class:`~lendingclub2.loan.Listing`.
+        :param k: int - only select the best k loans (default: None)
+        :returns: instance of :py:class:`~lendingclub2.loan.Listing`.
+        """
+        if k is None:
+            return listing.rank(self, reverse=True)
+        return listing.top_k(k, self)
+
+    @abstractmethod
+    def score_loans(self, loans):
+        """
+        Compute the scores of a batch of loans, without using the cache
+
+        :param loans: sequence of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: list of float in the same order as the loans
+        """
+        return [0.0] * len(loans)
+
+    def scores(self, loans):
+        """
+        Get the scores of all the loans. Only the loans without an
+        up-to-date cached score are computed, in a single batch. Loans which
+        are no longer part of the given loans are dropped from the cache.
+
+        :param loans: iterable of :py:class:`~lendingclub2.loan.Loan`,
+                      e.g. instance of :py:class:`~lendingclub2.loan.Listing`.
+        :returns: dict - loan ID mapped to the score
+        """
+        cache = self._cache
+        new_cache = dict()
+        missing = list()
+        for loan in loans:
+            cached = cache.get(loan.id)
+            if cached is not None and cached[0] == loan.version:
+                new_cache[loan.id] = cached
+            else:
+                missing.append(loan)
+        self.hits += len(new_cache)
+        self.misses += len(missing)
+
+        if missing:
+            for loan, score in zip(missing, self.score_loans(missing)):
+                new_cache[loan.id] = (loan.version, score)
+        self._cache = new_cache
+        return {loan_id: entry[1] for loan_id, entry in new_cache.items()}
+
+
+class FunctionScorer(Scorer):
+    """
+    Scorer wrapping a function computing the score of a single loan
+    """
+    def __init__(self, function):
+        """
+        Constructor
+
+        :param function: callable accepting an instance of
+                         :py:class:`~lendingclub2.loan.Loan` and returning
+                         a float
+        """
+        if not callable(function):
+            fstr = "function needs to be callable"
+            raise LCError(fstr)
+        Scorer.__init__(self)
+        self._function = function
+
+    def score_loans(self, loans):
+        """
+        Compute the scores of a batch of loans, without using the cache
+
+        :param loans: sequence of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: list of float in the same order as the loans
+        """
+        return list(map(self._function, loans))
+
+
+class LinearScorer(Scorer):
+    """
+    Scorer computing a weighted sum of loan attributes. Attributes are read
+    column by column for the whole batch. Missing (None) values count as 0.
+    """
+    def __init__(self, weights, intercept=0.0):
+        """
+        Constructor
+
+        :param weights: dict - attribute name (dotted names such as
+                        ``'borrower.dti'`` are allowed) mapped to its weight
+        :param intercept: float (default: 0.0)
+        """
+        if not weights:
+            fstr = "at least one weight needs to be specified"
+            raise LCError(fstr)
+        Scorer.__init__(self)
+        self._weights = tuple((attrgetter(name), weight)
+                              for name, weight in weights.items())
+        self._intercept = intercept
+
+    def score_loans(self, loans):
+        """
+        Compute the scores of a batch of loans, without using the cache
+
+        :param loans: sequence of :py:class:`~lendingclub2.loan.Loan`.
+        :returns: list of float in the same order as the loans
+        """
+        scores = [self._intercept] * len(loans)
+        for getter, weight in self._weights:
+            column = map(getter, loans)
+            scores = [score + weight * value if value else score
+                      for score, value in zip(scores, column)]
+        return scores
+
+
+class ExpectedReturnScorer(LinearScorer):
+    """
+    Expected annual return of a loan in percent: the interest rate net of
+    the service fee, minus the expected default rate.
+    """
+    def __init__(self, service_fee=1.0):
+        """
+        Constructor
+
+        :param service_fee: float - service fee charged on the payments, in
+                            percent (default: 1.0)
+        """
+        if service_fee < 0.0 or service_fee > 100.0:
+            fstr = "service_fee needs to be between 0 and 100 (inclusive)"
+            raise LCError(fstr)
+        LinearScorer.__init__(self, {
+            'interest_rate': 1.0 - service_fee / 100.0,
+            'expected_default_rate': -1.0,
+        })
@@ -0,0 +1,60 @@
+# Filename: conftest.py
+
+"""
+Shared fixtures of the lendingclub2 tests
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import loan
+
+
+@pytest.fixture
+def loan_json():
+    """
+    Build fake loan listing entries
+
+    :returns: function taking the loan ID and the fields to set on top of
+              the required ones, and returning the listing entry
+    """
+    def build(loan_id, **fields):
+        response = {
+            'id': loan_id,
+            'loanAmount': 1000.0,
+            'fundedAmount': 0.0,
+            'term': 36,
+            'grade': 'A',
+            'subGrade': 'A1',
+        }
+        response.update(fields)
+        return response
+    return build
+
+
+@pytest.fixture
+def make_loan(loan_json):
+    """
+    Build fake loans
+
+    :returns: function taking the same arguments as the loan_json fixture,
+              and returning the loan
+    """
+    def build(loan_id, **fields):
+        return loan.Loan(loan_json(loan_id, **fields))
+    return build
+
+
+@pytest.fixture
+def make_listing():
+    """
+    Build listings out of loans
+
+    :returns: function taking the loans, and returning the listing
+    """
+    def build(*loans):
+        listing = loan.Listing()
+        listing.loans = list(loans)
+        return listing
+    return build
@@ -5,14 +5,19 @@ Test the lendingclub2.accountmodule
 """
 
 # Standard libraries
+import threading
 from unittest import mock
 
+# PyTest
+import pytest
+
 # requests
 import requests
 
 # lendingclub2
 from lendingclub2 import account
-from lendingclub2.response import summary
+from lendingclub2.error import LCError
+from lendingclub2.response import order, summary, transfer
 
 
 _CONFIG = {
@@ -50,8 +55,157 @@ class TestInvestorAccount:
 
         # Mocks are called
         assert config_mock.called
-        assert request_mock.called
 
         # Tests
         assert investor.available_balance == 1.25
         assert investor.total_balance == 1.26
+        assert request_mock.called
+
+    @mock.patch.object(account.utils, 'get_config_content')
+    @mock.patch.object(summary.request, 'get')
+    def test_lazy(self, request_mock, config_mock):
+        config_mock.return_value = _CONFIG
+        request_mock.return_value = _summary_response()
+
+        investor = account.InvestorAccount()
+        assert not request_mock.called
+
+        # The cash and the summary are only requested once
+        assert investor.available_balance == 1.25
+        assert investor.total_balance == 1.26
+        assert investor.available_balance == 1.25
+        assert investor.total_balance == 1.26
+        assert request_mock.call_count == 2
+
+    @mock.patch.object(account.utils, 'get_config_content')
+    @mock.patch.object(summary.request, 'get')
+    def test_prefetch(self, request_mock, config_mock):
+        config_mock.return_value = _CONFIG
+        threads = set()
+
+        def _get(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return _summary_response()
+        request_mock.side_effect = _get
+
+        investor = account.InvestorAccount()
+        with mock.patch.dict(account.InvestorAccount.COMPONENTS,
+                             notes=summary.Summary,
+                             portfolios=summary.Summary):
+            investor.prefetch()
+        assert request_mock.call_count == 4
+        assert threading.get_ident() not in threads
+
+        # Already fetched
+        investor.prefetch('summary')
+        assert investor.available_balance == 1.25
+        assert investor.total_balance == 1.26
+        assert request_mock.call_count == 4
+
+        investor.refresh('summary')
+        assert request_mock.call_count == 5
+
+        with pytest.raises(LCError):
+            investor.prefetch('foo')
+
+    @mock.patch.object(account.time, 'monotonic')
+    @mock.patch.object(account.utils, 'get_config_content')
+    @mock.patch.object(summary.request, 'get')
+    def test_ttl(self, request_mock, config_mock, time_mock):
+        config_mock.return_value = _CONFIG
+        request_mock.return_value = _summary_response()
+        time_mock.return_value = 100.0
+
+        investor = account.InvestorAccount(ttl={'cash': 10})
+        assert investor.available_balance == 1.25
+        time_mock.return_value = 109.0
+        assert investor.available_balance == 1.25
+        assert request_mock.call_count == 1
+
+        time_mock.return_value = 110.0
+        assert investor.available_balance == 1.25
+        assert request_mock.call_count == 2
+
+        with pytest.raises(LCError):
+            account.InvestorAccount(ttl={'foo': 10})
+
+    @mock.patch.object(account.utils, 'get_config_content')
+    @mock.patch.object(summary.request, 'get')
+    def test_cash_ledger(self, request_mock, config_mock):
+        config_mock.return_value = _CONFIG
+        request_mock.return_value = _summary_response(
+            r'{"investorId": 1, "availableCash": 100.0}')
+
+        investor = account.InvestorAccount()
+        assert investor.available_balance == 100.0
+        assert request_mock.call_args[0][0].endswith('/availablecash')
+
+        # Invested amounts are subtracted without a new request
+        order_response = _summary_response(r"""{
+            "orderInstructId": 5,
+            "orderConfirmations": [
+                {"loanId": 1, "requestedAmount": 25, "investedAmount": 25,
+                 "executionStatus": ["ORDER_FULFILLED"]},
+                {"loanId": 2, "requestedAmount": 50, "investedAmount": 50,
+                 "executionStatus": ["ORDER_FULFILLED"]}
+            ]
+        }""")
+        request_mock.return_value = _summary_response(
+            r'{"myNotes": [{"noteId": 9, "loanId": 3}]}')
+        owned = investor.owned_loans
+        assert request_mock.call_args[0][0].endswith('/notes')
+        assert 3 in owned
+
+        with mock.patch.object(order.request, 'post') as post_mock:
+            post_mock.return_value = order_response
+            investor.invest(order.OrderNote(1, 25), order.OrderNote(2, 50))
+        assert investor.available_balance == 25.0
+        assert request_mock.call_count == 2
+        assert investor.owned_loans is owned
+        assert 1 in owned and 2 in owned
+
+        # Partially filled orders only subtract the invested amount
+        order_response = _summary_response(r"""{
+            "orderInstructId": 6,
+            "orderConfirmations": [
+                {"loanId": 4, "requestedAmount": 25, "investedAmount": 0,
+                 "executionStatus": ["NOT_AN_IN_FUNDING_LOAN"]}
+            ]
+        }""")
+        with mock.patch.object(order.request, 'post') as post_mock:
+            post_mock.return_value = order_response
+            confirmations = investor.submit(order.OrderNote(4, 25))
+        assert confirmations[0].unfilled_amount == 25
+        assert investor.available_balance == 25.0
+        assert 4 not in owned
+
+        with mock.patch.object(transfer.request, 'post') as post_mock:
+            post_mock.return_value = _summary_response(r'{}')
+            investor.withdraw(10.0)
+        assert investor.available_balance == 15.0
+        assert len(investor.ledger.entries) == 3
+
+        # Requesting the cash again resets the ledger
+        request_mock.return_value = _summary_response(
+            r'{"investorId": 1, "availableCash": 100.0}')
+        assert investor.refresh_cash() == 100.0
+        assert not investor.ledger.entries
+        assert request_mock.call_count == 3
+
+        # The cash of an order with an unknown outcome is held until the
+        # cash is requested again
+        with mock.patch.object(order.request, 'post') as post_mock:
+            post_mock.side_effect = LCError("Cannot connect correctly")
+            confirmations = investor.submit(order.OrderNote(5, 25))
+        assert confirmations[0].unknown
+        assert confirmations[0].unfilled_amount == 0
+        assert investor.available_balance == 75.0
+        assert 5 not in owned
+        assert investor.refresh_cash() == 100.0
+
+
+def _summary_response(content=_RESPONSES['valid']):
+    response = requests.Response()
+    response.status_code = requests.codes.ok
+    response._content = str.encode(content)
+    return response
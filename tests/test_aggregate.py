@@ -0,0 +1,83 @@
+# Filename: test_aggregate.py
+
+"""
+Test the lendingclub2.aggregate module
+"""
+
+# Standard libraries
+from types import SimpleNamespace
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import aggregate
+from lendingclub2.error import LCError
+
+
+_ITEMS = (
+    SimpleNamespace(grade='A', term=36, rate=6.0,
+                    borrower=SimpleNamespace(address_state='CA')),
+    SimpleNamespace(grade='B', term=36, rate=10.0,
+                    borrower=SimpleNamespace(address_state='NY')),
+    SimpleNamespace(grade='A', term=60, rate=8.0,
+                    borrower=SimpleNamespace(address_state='CA')),
+    SimpleNamespace(grade='B', term=60, rate=None,
+                    borrower=SimpleNamespace(address_state='CA')),
+)
+
+
+class _Columns:
+    """Minimal columnar representation of the items above."""
+    def __init__(self, items):
+        self._items = items
+        self.requested = list()
+
+    def __len__(self):
+        return len(self._items)
+
+    def column(self, name):
+        self.requested.append(name)
+        return [getattr(item, name) for item in self._items]
+
+
+class TestGroupBy:
+    def test_group_by(self):
+        result = aggregate.group_by(
+            _ITEMS, 'grade',
+            count=aggregate.Count(),
+            rated=aggregate.Count('rate'),
+            total=aggregate.Sum('rate'),
+            mean=aggregate.Mean('rate'),
+            low=aggregate.Min('rate'),
+            high=aggregate.Max('rate'),
+        )
+        assert result['A'] == {'count': 2, 'rated': 2, 'total': 14.0,
+                               'mean': 7.0, 'low': 6.0, 'high': 8.0}
+        assert result['B'] == {'count': 2, 'rated': 1, 'total': 10.0,
+                               'mean': 10.0, 'low': 10.0, 'high': 10.0}
+
+    def test_keys(self):
+        result = aggregate.group_by(_ITEMS, 'borrower.address_state',
+                                    count=aggregate.Count())
+        assert result == {'CA': {'count': 3}, 'NY': {'count': 1}}
+
+        result = aggregate.group_by(_ITEMS, ('grade', 'term'),
+                                    count=aggregate.Count())
+        assert result[('A', 60)] == {'count': 1}
+
+        result = aggregate.group_by(_ITEMS, lambda item: item.term > 36,
+                                    count=aggregate.Count())
+        assert result == {False: {'count': 2}, True: {'count': 2}}
+
+        with pytest.raises(LCError):
+            aggregate.group_by(_ITEMS, 'grade', count=len)
+
+    def test_columnar(self):
+        columns = _Columns(_ITEMS)
+        result = aggregate.group_by(columns, 'grade',
+                                    total=aggregate.Sum('rate'),
+                                    mean=aggregate.Mean('rate'))
+        assert columns.requested == ['grade', 'rate']
+        assert result['A'] == {'total': 14.0, 'mean': 7.0}
+        assert result['B'] == {'total': 10.0, 'mean': 10.0}
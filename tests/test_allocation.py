@@ -0,0 +1,63 @@
+# Filename: test_allocation.py
+
+"""
+Test the lendingclub2.allocation module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2.allocation import Allocator
+from lendingclub2.error import LCError
+from lendingclub2.score import FunctionScorer
+
+
+@pytest.fixture
+def listing(make_listing, make_loan):
+    """Listing of fake loans scored by their ID."""
+    return make_listing(*(
+        make_loan(loan_id, fundedAmount=975.0 if loan_id == 8 else 0.0,
+                  grade='AB'[loan_id % 2])
+        for loan_id in range(10)
+    ))
+
+
+def _allocated(order_notes):
+    return [(order_note.loan_id, order_note.amount)
+            for order_note in order_notes]
+
+
+class TestAllocator:
+    def test_cash(self, listing):
+        allocator = Allocator(lambda item: item.id)
+        assert _allocated(allocator.allocate(listing, 110.0)) == \
+            [(9, 25), (8, 25), (7, 25), (6, 25)]
+
+    def test_limits(self, listing):
+        allocator = Allocator(FunctionScorer(lambda item: item.id),
+                              max_per_loan=100, portfolio_id=3)
+        assert allocator.scores(listing.loans[:3]) == [0, 1, 2]
+        order_notes = allocator.allocate(listing, 210.0)
+        # Only 25 left to fund in loan 8
+        assert _allocated(order_notes) == [(9, 100), (8, 25), (7, 75)]
+        assert order_notes[0].portfolio_id == 3
+
+        allocator = Allocator(lambda item: item.id, max_per_loan=50,
+                              max_per_grade={'B': 75}, min_score=3)
+        assert _allocated(allocator.allocate(listing, 1000.0)) == \
+            [(9, 50), (8, 25), (7, 25), (6, 50), (4, 50)]
+
+        allocator = Allocator(lambda item: item.id, max_per_loan=50,
+                              max_per_grade=50)
+        assert _allocated(allocator.allocate(listing, 1000.0)) == \
+            [(9, 50), (8, 25), (6, 25)]
+
+        with pytest.raises(LCError):
+            Allocator(lambda item: item.id, max_per_loan=10)
+
+    def test_unscored(self, listing):
+        allocator = Allocator(lambda item: None if item.id > 1 else item.id)
+        assert _allocated(allocator.allocate(listing, 1000.0)) == \
+            [(1, 25), (0, 25)]
+        assert allocator.allocate([], 1000.0) == []
@@ -0,0 +1,115 @@
+# Filename: test_analytics.py
+
+"""
+Test the lendingclub2.analytics module
+"""
+
+# Standard libraries
+import datetime
+import types
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2.analytics import PortfolioAnalytics
+from lendingclub2.error import LCError
+from lendingclub2.response.notes import Note
+
+
+def _note(note_id, status='Current', grade='B', issued='2016-02-10',
+          invested=100.0, pending=50.0, interest=10.0, portfolio=None):
+    """Build a fake detailed note."""
+    return Note({
+        'noteId': note_id,
+        'loanId': note_id * 10,
+        'loanStatus': status,
+        'grade': grade,
+        'issueDate': issued + 'T18:11:46.000-07:00',
+        'noteAmount': invested,
+        'principalPending': pending,
+        'principalReceived': invested - pending,
+        'interestReceived': interest,
+        'paymentsReceived': invested - pending + interest,
+        'interestRate': 12.0,
+        'loanLength': 36,
+        'portfolioId': portfolio,
+    })
+
+
+AS_OF = datetime.date(2017, 2, 1)
+
+
+class TestPortfolioAnalytics:
+    def test_metrics(self):
+        analytics = PortfolioAnalytics([
+            _note(1),
+            _note(2, grade='C', issued='2016-08-01'),
+            _note(3, status='Charged Off', pending=80.0, interest=5.0),
+            _note(4, status='Late (31-120 days)', grade='C'),
+        ], as_of=AS_OF)
+        assert len(analytics) == 4
+
+        metrics = analytics.metrics()
+        assert metrics['notes'] == 4
+        assert metrics['invested'] == 400.0
+        assert metrics['outstanding'] == 150.0
+        assert metrics['charged_off'] == 100.0
+        assert metrics['loss'] == 80.0
+        assert analytics.expected_loss() == pytest.approx(37.5)
+
+        assert analytics.charge_off_rates() == {
+            ('2016Q1', 'B'): 0.5,
+            ('2016Q1', 'C'): 0.0,
+            ('2016Q3', 'C'): 0.0,
+        }
+        by_grade = analytics.metrics(key='grade')
+        assert set(by_grade) == {'B', 'C'}
+        assert by_grade['C']['notes'] == 2
+
+        # A year old note with 75 outstanding on average
+        single = PortfolioAnalytics([_note(1)], as_of=AS_OF)
+        assert single.net_annualized_return() == pytest.approx(
+            (10.0 - 0.6) / 75.0)
+
+        with pytest.raises(LCError):
+            analytics.metrics(key='purpose')
+
+    def test_portfolios(self):
+        portfolios = [types.SimpleNamespace(id=7, name='Main')]
+        analytics = PortfolioAnalytics(
+            [_note(1, portfolio=7), _note(2), _note(3, portfolio=7)],
+            portfolios=portfolios, as_of=AS_OF)
+        by_portfolio = analytics.metrics(key=('portfolio', 'grade'))
+        assert by_portfolio[('Main', 'B')]['notes'] == 2
+        assert by_portfolio[(None, 'B')]['notes'] == 1
+
+    def test_update(self):
+        notes = [_note(1), _note(2, grade='C')]
+        analytics = PortfolioAnalytics(notes, as_of=AS_OF)
+        expected = analytics.metrics()
+
+        analytics.update([_note(3, grade='A')])
+        analytics.update([_note(2, grade='C', status='Charged Off')],
+                         removed=[3])
+        assert analytics.metrics(key='grade')['C']['charge_off_rate'] == 1.0
+        analytics.update([_note(2, grade='C')])
+        assert analytics.metrics() == pytest.approx(expected)
+        assert set(analytics.metrics(key='grade')) == {'B', 'C'}
+
+    def test_cash_flows(self):
+        analytics = PortfolioAnalytics([_note(1)], as_of=AS_OF)
+        flows = analytics.cash_flows(months=36)
+        # 24 months left to pay back the outstanding principal
+        assert sum(flow['principal'] for flow in flows) == \
+            pytest.approx(50.0)
+        assert flows[23]['principal'] > 0
+        assert flows[24]['principal'] == 0.0
+        assert flows[0]['interest'] == pytest.approx(0.5)
+        assert flows[0]['net'] == pytest.approx(
+            (flows[0]['principal'] + flows[0]['interest']) * 0.99)
+
+        late = PortfolioAnalytics([_note(1, status='Late (31-120 days)')],
+                                  as_of=AS_OF)
+        assert sum(flow['principal'] for flow in late.cash_flows(36)) == \
+            pytest.approx(12.5)
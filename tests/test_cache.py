@@ -0,0 +1,79 @@
+# Filename: test_cache.py
+
+"""
+Test the lendingclub2.cache module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import filter
+from lendingclub2.cache import FilterCache
+from lendingclub2.error import LCError
+
+
+class _CountingFilter(filter.Filter):
+    """Filter recording how many loans it has evaluated."""
+    def __init__(self):
+        self.calls = 0
+
+    def meet_requirement(self, loan):
+        self.calls += 1
+        return loan.grade == 'A'
+
+
+class TestFilterCache:
+    def test_filter(self, make_listing, make_loan):
+        cache = FilterCache()
+        counting = _CountingFilter()
+        listing = make_listing(make_loan(1), make_loan(2, grade='B'),
+                               make_loan(3))
+
+        result = listing.filter(counting, cache=cache)
+        assert [item.id for item in result] == [1, 3]
+        assert (cache.hits, cache.misses, counting.calls) == (0, 3, 3)
+
+        # Next poll: new instances, one of them changed, one new loan
+        listing = make_listing(make_loan(1), make_loan(2, grade='B'),
+                               make_loan(3, fundedAmount=25.0), make_loan(4))
+        result = listing.filter(counting, cache=cache, profile=True)
+        assert [item.id for item in result] == [1, 3, 4]
+        assert (cache.hits, cache.misses, counting.calls) == (2, 5, 5)
+        assert cache.hit_rate == pytest.approx(2 / 7)
+        assert result.profile.statistics[0].filter is counting
+
+        # Equivalent built-in filters share their results
+        listing.filter(filter.FilterByGrade('A'), cache=cache)
+        listing.filter(filter.FilterByGrade(('A', )), cache=cache)
+        assert cache.hits == 6
+        assert cache.evaluate(filter.FilterByGrade('A'), listing.loans[0])
+
+    def test_eviction(self, make_loan):
+        cache = FilterCache(max_size=2)
+        counting = _CountingFilter()
+        loans = [make_loan(1), make_loan(2), make_loan(3)]
+        for item in loans:
+            cache.evaluate(counting, item)
+        assert len(cache) == 2
+
+        cache.evaluate(counting, loans[2])
+        assert counting.calls == 3
+        cache.evaluate(counting, loans[0])
+        assert counting.calls == 4
+
+        # Tokens are forgotten with their last result
+        for _ in range(10):
+            cache.evaluate(_CountingFilter(), loans[0])
+        assert len(cache._tokens) == len(cache._filters) == 2
+        wrapped, = cache.wrap(counting)
+        for item in loans:
+            wrapped.meet_requirement(item)
+        assert len(cache._tokens) == 1
+        assert wrapped.meet_requirement(loans[2])
+        assert cache.evaluate(counting, loans[1])
+
+        cache.clear()
+        assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+        with pytest.raises(LCError):
+            FilterCache(max_size=0)
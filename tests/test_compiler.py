@@ -0,0 +1,118 @@
+# Filename: test_compiler.py
+
+"""
+Test the lendingclub2.compiler module
+"""
+
+# Standard libraries
+from unittest import mock
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import combination
+from lendingclub2 import filter
+from lendingclub2 import indexed
+from lendingclub2.compiler import CompiledFilter, compile_filters
+from lendingclub2.error import LCError
+
+
+class _StateTrait(filter.BorrowerTrait):
+    """Custom trait checking the address state."""
+    def __init__(self, state):
+        self._state = state
+
+    def matches(self, borrower):
+        return borrower.address_state == self._state
+
+
+class _EvenFilter(filter.Filter):
+    """Custom filter accepting even loan IDs."""
+    def meet_requirement(self, loan):
+        return loan.id % 2 == 0
+
+
+class _CostlyFilter(filter.Filter):
+    """Custom filter accepting every loan, costly on a fake clock."""
+    def __init__(self, clock):
+        self.calls = 0
+        self._clock = clock
+
+    def meet_requirement(self, loan):
+        self.calls += 1
+        self._clock[0] += 1.0
+        return True
+
+
+@pytest.fixture
+def listing(make_listing, make_loan):
+    """Listing of fake loans."""
+    return make_listing(*(
+        make_loan(
+            loan_id,
+            fundedAmount=25.0 * (loan_id % 41),
+            term=60 if loan_id % 4 == 0 else 36,
+            grade='ABCD'[loan_id % 4],
+            reviewStatus='APPROVED' if loan_id % 5 else 'NOT_APPROVED',
+            empLength=None if loan_id % 7 == 0 else 12,
+            addrState='CA' if loan_id % 3 else 'NY',
+            dti=None if loan_id % 9 == 0 else float(loan_id),
+        )
+        for loan_id in range(60)
+    ))
+
+
+class TestCompiler:
+    @pytest.mark.parametrize('filters', (
+        (filter.FilterByGrade('AB'), ),
+        (filter.FilterByGrade(), ),
+        (filter.FilterByTerm(value=36), filter.FilterByApproved()),
+        (filter.FilterByFunded(50), ),
+        (indexed.FilterByRange('dti', 10, 30), ),
+        (indexed.FilterByRange('dti', max_val=30),
+         filter.FilterByTerm(value=None, min_val=36, max_val=48)),
+        (filter.FilterByBorrowerTraits((filter.BorrowerEmployedTrait(),
+                                        _StateTrait('CA'))), ),
+        (filter.FilterByGrade('BC') | ~filter.FilterByApproved(),
+         _EvenFilter()),
+        (combination.And(filter.FilterByFunded(20), filter.FilterByGrade('D')),
+         combination.Not(filter.FilterByTerm(value=60))),
+    ))
+    def test_equivalence(self, listing, filters):
+        compiled = compile_filters(*filters)
+        assert isinstance(compiled, CompiledFilter)
+        assert listing.filter(compiled) == listing.filter(*filters)
+
+    def test_adaptive(self, listing):
+        clock = [0.0]
+        costly = _CostlyFilter(clock)
+        grade = filter.FilterByGrade('A')
+        with mock.patch.object(combination.time, 'perf_counter',
+                               lambda: clock[0]):
+            compiled = compile_filters(combination.And(costly, grade,
+                                                       sample_every=4))
+            assert [item.id for item in listing.filter(compiled)] == \
+                list(range(0, 60, 4))
+        # The grade is evaluated first once measured
+        assert costly.calls < 30
+
+        compiled = compile_filters(combination.And(costly, grade,
+                                                   adaptive=False))
+        assert "r['grade'] in" in compiled.source
+        costly.calls = 0
+        listing.filter(compiled)
+        assert costly.calls == 60
+
+    def test_cache(self):
+        compiled = compile_filters(filter.FilterByGrade('A'),
+                                   filter.FilterByTerm(value=36))
+        assert compiled is compile_filters(filter.FilterByGrade('A'),
+                                           filter.FilterByTerm(value=36))
+        assert "r['grade'] in" in compiled.source
+        assert compiled.fields() == frozenset(('grade', 'term'))
+
+        with pytest.raises(LCError):
+            compile_filters()
+        with pytest.raises(LCError):
+            compile_filters('grade')
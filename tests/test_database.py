@@ -0,0 +1,132 @@
+# Filename: test_database.py
+
+"""
+Test the lendingclub2.database module
+"""
+
+# Standard libraries
+import json
+from unittest import mock
+
+# requests
+import requests
+
+# lendingclub2
+from lendingclub2.analytics import PortfolioAnalytics
+from lendingclub2.database import NotesDatabase
+from lendingclub2.response import notes as notes_module
+
+
+def _response(*notes_json):
+    """Build a fake notes response."""
+    response = requests.Response()
+    response.status_code = requests.codes.ok
+    response._content = str.encode(json.dumps({'myNotes': list(notes_json)}))
+    return response
+
+
+def _owned_json(note_id, status='Current', payments=0.0):
+    """Build a fake note of the notes endpoint."""
+    return {
+        'noteId': note_id,
+        'loanId': note_id * 10,
+        'loanStatus': status,
+        'grade': 'B',
+        'noteAmount': 25.0,
+        'paymentsReceived': payments,
+    }
+
+
+def _detailed_json(note_id, status='Current', payments=0.0):
+    """Build a fake note of the detailed notes endpoint."""
+    note_json = _owned_json(note_id, status=status, payments=payments)
+    note_json['principalPending'] = 25.0 - payments
+    return note_json
+
+
+class FakeAPI:
+    """Serve the notes and count the requests of each endpoint."""
+    def __init__(self):
+        self.notes = dict()
+        self.requests = {'notes': 0, 'detailednotes': 0}
+
+    def get(self, url, **kwargs):
+        endpoint = url.rsplit('/', 1)[-1]
+        self.requests[endpoint] += 1
+        if endpoint == 'notes':
+            return _response(*[_owned_json(*note)
+                               for note in self.notes.values()])
+        return _response(*[_detailed_json(*note)
+                           for note in self.notes.values()])
+
+
+class TestNotesDatabase:
+    def test_sync(self, tmp_path):
+        path = str(tmp_path / 'notes.db')
+        api = FakeAPI()
+        api.notes = {1: (1, ), 2: (2, ), 3: (3, )}
+
+        database = NotesDatabase(path)
+        assert database.last_sync is None
+        with mock.patch.object(notes_module.request, 'get', api.get):
+            assert database.sync('fake_investor_id') == (3, 0, 0)
+            assert api.requests == {'notes': 1, 'detailednotes': 1}
+
+            # Nothing changed, the detailed notes aren't requested
+            assert database.sync('fake_investor_id') == (0, 0, 0)
+            assert api.requests == {'notes': 2, 'detailednotes': 1}
+
+            api.notes[2] = (2, 'Fully Paid', 25.0)
+            del api.notes[3]
+            api.notes[4] = (4, )
+            assert database.sync('fake_investor_id') == (1, 1, 1)
+            assert api.requests == {'notes': 3, 'detailednotes': 2}
+
+        # Another reader doesn't need the API
+        reader = NotesDatabase(path)
+        assert len(reader) == 3
+        assert reader.last_sync is not None
+        assert [note.id for note in reader.notes()] == [1, 2, 4]
+        paid = reader.notes(status='Fully Paid')
+        assert [note.id for note in paid] == [2]
+        assert paid[0].paid
+        assert paid[0].principal_pending == 0.0
+        assert [note.id for note in reader.notes(loan_id=40)] == [4]
+        assert reader.store(grade='B').outstanding_principal() == 50.0
+
+    def test_last_changes(self, tmp_path):
+        api = FakeAPI()
+        api.notes = {1: (1, ), 2: (2, )}
+
+        database = NotesDatabase(str(tmp_path / 'notes.db'))
+        with mock.patch.object(notes_module.request, 'get', api.get):
+            database.sync('fake_investor_id')
+            analytics = PortfolioAnalytics(database.notes())
+            assert analytics.metrics()['outstanding'] == 50.0
+
+            api.notes[1] = (1, 'Fully Paid', 25.0)
+            del api.notes[2]
+            database.sync('fake_investor_id')
+        assert database.last_changes == ((1, ), (2, ))
+        assert [note.id for note in database.notes(note_ids=[1, 2])] == [1]
+
+        analytics.update_from(database)
+        assert len(analytics) == 1
+        assert analytics.metrics()['outstanding'] == 0.0
+
+    def test_sync_without_details(self, tmp_path):
+        api = FakeAPI()
+        api.notes = {1: (1, )}
+
+        database = NotesDatabase(str(tmp_path / 'notes.db'))
+        with mock.patch.object(notes_module.request, 'get', api.get):
+            assert database.sync('fake_investor_id',
+                                 detailed=False) == (1, 0, 0)
+            assert api.requests == {'notes': 1, 'detailednotes': 0}
+            assert 'principalPending' not in \
+                database.notes()[0]._response
+
+            # The details are requested once they're needed
+            assert database.sync('fake_investor_id') == (0, 1, 0)
+            assert api.requests == {'notes': 2, 'detailednotes': 1}
+            assert database.notes()[0].principal_pending == 25.0
@@ -0,0 +1,136 @@
+# Filename: test_executor.py
+
+"""
+Test the lendingclub2.executor module
+"""
+
+# Standard libraries
+import json
+import threading
+from unittest import mock
+
+# PyTest
+import pytest
+
+# requests
+import requests
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.executor import OrderExecutor
+from lendingclub2.response import order
+from lendingclub2.response.order import OrderNote
+
+
+class FakeAPI:
+    """Fill the orders, except for the loans in partial and rejected."""
+    def __init__(self, partial=(), rejected=(), unreachable=()):
+        self.partial = set(partial)
+        self.rejected = set(rejected)
+        self.unreachable = set(unreachable)
+        self.batches = list()
+        self.lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        payload = kwargs['json']
+        with self.lock:
+            self.batches.append((payload['aid'], len(payload['orders'])))
+        response = requests.Response()
+        loan_ids = {order_json['loanId'] for order_json in payload['orders']}
+        if loan_ids & self.unreachable:
+            raise LCError("Cannot connect correctly")
+        if loan_ids & self.rejected:
+            response.status_code = 400
+            response._content = b'{"errors": []}'
+            return response
+
+        confirmations = list()
+        for order_json in payload['orders']:
+            invested = order_json['requestedAmount']
+            status = ['ORDER_FULFILLED']
+            if order_json['loanId'] in self.partial:
+                invested = 25.0
+                status = ['ORDER_FULFILLED', 'NOTE_DOES_NOT_MEET_POLICY']
+            confirmations.append({
+                'loanId': order_json['loanId'],
+                'requestedAmount': order_json['requestedAmount'],
+                'investedAmount': invested,
+                'executionStatus': status,
+            })
+        response.status_code = requests.codes.ok
+        response._content = str.encode(json.dumps({
+            'orderInstructId': len(self.batches),
+            'orderConfirmations': confirmations,
+        }))
+        return response
+
+
+class TestOrderExecutor:
+    def test_batches(self):
+        executor = OrderExecutor(batch_size=4)
+        notes = [OrderNote(loan_id, 25) for loan_id in range(9)]
+        assert [len(batch) for batch in executor.batches(notes)] == [3, 3, 3]
+        assert executor.batches([]) == []
+
+        with pytest.raises(LCError):
+            OrderExecutor(batch_size=0)
+
+    def test_submit(self):
+        api = FakeAPI(partial=[2])
+        notes = [OrderNote(loan_id, 50) for loan_id in range(5)]
+        with mock.patch.object(order.request, 'post', api.post):
+            confirmations = OrderExecutor(batch_size=2).submit(1, *notes)
+        assert api.batches == [(1, 2), (1, 2), (1, 1)]
+
+        assert [confirmation.loan_id for confirmation in confirmations] == \
+            list(range(5))
+        partial = confirmations[2]
+        assert partial.fulfilled
+        assert partial.requested_amount == 50
+        assert partial.invested_amount == 25.0
+        assert partial.unfilled_amount == 25.0
+        assert 'NOTE_DOES_NOT_MEET_POLICY' in partial.execution_status
+        assert all(confirmation.unfilled_amount == 0
+                   for confirmation in confirmations if confirmation.loan_id
+                   != 2)
+
+        with pytest.raises(LCError):
+            OrderExecutor().submit(1, OrderNote(1, 25), OrderNote(1, 50))
+
+    def test_rejected_batch(self):
+        api = FakeAPI(rejected=[0])
+        notes = [OrderNote(loan_id, 25) for loan_id in range(4)]
+        with mock.patch.object(order.request, 'post', api.post):
+            confirmations = OrderExecutor(batch_size=2).submit(1, *notes)
+        assert [confirmation.fulfilled for confirmation in confirmations] == \
+            [False, False, True, True]
+        assert confirmations[0].execution_status == ()
+        assert confirmations[0].unfilled_amount == 25
+        assert not confirmations[0].unknown
+
+    def test_unreachable_batch(self):
+        api = FakeAPI(unreachable=[2])
+        notes = [OrderNote(loan_id, 25) for loan_id in range(6)]
+        with mock.patch.object(order.request, 'post', api.post):
+            confirmations = OrderExecutor(batch_size=2).submit(1, *notes)
+        assert [confirmation.fulfilled for confirmation in confirmations] == \
+            [True, True, False, False, True, True]
+        assert confirmations[3].invested_amount == 0.0
+
+        # The batch may have been filled, so its cash isn't reported unfilled
+        assert [confirmation.unknown for confirmation in confirmations] == \
+            [False, False, True, True, False, False]
+        assert confirmations[3].unfilled_amount == 0.0
+
+    def test_submit_many(self):
+        api = FakeAPI()
+        orders = {
+            1: [OrderNote(loan_id, 25) for loan_id in range(3)],
+            2: [OrderNote(loan_id, 25) for loan_id in range(3, 5)],
+        }
+        with mock.patch.object(order.request, 'post', api.post):
+            results = OrderExecutor(batch_size=2).submit_many(orders)
+        assert sorted(api.batches) == [(1, 1), (1, 2), (2, 2)]
+        assert [confirmation.loan_id for confirmation in results[1]] == \
+            [0, 1, 2]
+        assert all(confirmation.fulfilled for confirmation in results[2])
@@ -0,0 +1,129 @@
+# Filename: test_exposure.py
+
+"""
+Test the lendingclub2.exposure module
+"""
+
+# Standard libraries
+import functools
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2.allocation import Allocator
+from lendingclub2.error import LCError
+from lendingclub2.exposure import ExposureLimits
+from lendingclub2.response.notes import Note
+from lendingclub2.response.order import OrderConfirmation, OrderNote
+
+
+@pytest.fixture
+def loan_json(loan_json):
+    """Fake loan listing entries, by default of car loans in California."""
+    return functools.partial(loan_json, grade='B', subGrade='B1',
+                             addrState='CA', purpose='car')
+
+
+def _note(note_id, grade='B', pending=100.0, status='Current', term=36,
+          state=None):
+    """Build a fake note."""
+    note_json = {
+        'noteId': note_id,
+        'loanId': note_id * 10,
+        'grade': grade,
+        'loanStatus': status,
+        'loanLength': term,
+        'noteAmount': 100.0,
+    }
+    if state is not None:
+        note_json['addrState'] = state
+    if pending is not None:
+        note_json['principalPending'] = pending
+    return Note(note_json)
+
+
+class TestExposureLimits:
+    def test_seed(self, make_loan):
+        limits = ExposureLimits(
+            [_note(1), _note(2, grade='E', pending=None),
+             _note(3, grade='E', pending=None, status='Fully Paid'),
+             _note(4, term=60, pending=50.0)],
+            max_amount={'grade': {'E': 250}, 'term': {60: 100}})
+        assert limits.total == 250.0
+        assert limits.exposure('grade') == {'B': 150.0, 'E': 100.0}
+        assert limits.headroom(make_loan(1, grade='E')) == 150.0
+        assert limits.headroom(make_loan(1, grade='E', term=60)) == 50.0
+        assert limits.headroom(make_loan(1, grade='A')) == float('inf')
+        assert limits.allows(make_loan(1, grade='E'), 150)
+        assert not limits.allows(make_loan(1, grade='E'), 175)
+
+        with pytest.raises(LCError):
+            ExposureLimits(max_amount={'color': {'red': 1}})
+        with pytest.raises(LCError):
+            ExposureLimits(max_share={'grade': 1.5})
+        # The notes endpoint doesn't have the address state
+        with pytest.raises(LCError):
+            ExposureLimits([_note(1)], max_share={'state': 0.25})
+
+    def test_share(self, make_loan):
+        limits = ExposureLimits([_note(1, pending=300.0, state='TX')],
+                                max_share={'state': 0.25})
+        assert limits.exposure('state') == {'TX': 300.0}
+        assert limits.headroom(make_loan(1)) == 100.0
+
+        limits.add(make_loan(1), 100.0)
+        assert limits.headroom(make_loan(2)) == 0.0
+        assert limits.headroom(make_loan(2, addrState='NY')) == \
+            pytest.approx(400 / 3)
+
+        limits.base = 1000.0
+        assert limits.headroom(make_loan(2)) == 150.0
+
+    def test_fill(self, make_loan):
+        limits = ExposureLimits(max_amount={'grade': {'B': 100}})
+        limits.add(make_loan(1), 50.0)
+        limits.add(make_loan(1), 25.0)
+        assert limits.headroom(make_loan(2)) == 25.0
+
+        limits.fill([OrderConfirmation(OrderNote(1, 75),
+                                       {'investedAmount': 25.0})])
+        assert limits.headroom(make_loan(2)) == 75.0
+        assert limits.total == 25.0
+
+        # Orders with an unknown outcome stay reserved
+        limits.add(make_loan(3), 50.0)
+        limits.fill([OrderConfirmation(OrderNote(3, 50), unknown=True)])
+        assert limits.headroom(make_loan(2)) == 25.0
+
+    def test_allocator(self, make_listing, make_loan):
+        listing = make_listing(
+            make_loan(1, grade='A', addrState='NY'),
+            make_loan(2, grade='B', addrState='CA'),
+            make_loan(3, grade='C', addrState='CA'),
+            make_loan(4, grade='D', addrState='TX'),
+        )
+        limits = ExposureLimits(max_share={'state': 0.5}, base=200.0)
+        allocator = Allocator(lambda item: -item.id, max_per_loan=100,
+                              constraints=limits)
+        order_notes = allocator.allocate(listing, 200.0)
+        assert [(order_note.loan_id, order_note.amount)
+                for order_note in order_notes] == [(1, 100), (2, 100)]
+        assert limits.exposure('state') == {'NY': 100.0, 'CA': 100.0}
+
+        # Loans outside the limited values aren't capped
+        for constraints in (ExposureLimits(),
+                            ExposureLimits(max_share={'grade': 1.0})):
+            allocator = Allocator(lambda item: -item.id, max_per_loan=50,
+                                  constraints=constraints)
+            order_notes = allocator.allocate(listing, 1000.0)
+            assert [(order_note.loan_id, order_note.amount)
+                    for order_note in order_notes] == \
+                [(1, 50), (2, 50), (3, 50), (4, 50)]
+        assert constraints.total == 200.0
+
+        allocator = Allocator(lambda item: -item.id, max_per_loan=50,
+                              constraints=ExposureLimits(
+                                  max_amount={'grade': {'C': 25}}))
+        assert [order_note.amount for order_note in
+                allocator.allocate(listing, 1000.0)] == [50, 50, 25, 50]
@@ -0,0 +1,134 @@
+# Filename: test_filter.py
+
+"""
+Test the lendingclub2.filter module
+"""
+
+# Standard libraries
+from unittest import mock
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import combination
+from lendingclub2 import filter
+from lendingclub2.error import LCError
+
+
+class _CustomFilter(filter.Filter):
+    """Custom filter without identity."""
+    def meet_requirement(self, loan):
+        return True
+
+
+class _SlowFilter(filter.Filter):
+    """Expensive filter accepting every loan, on a fake clock."""
+    def __init__(self, clock):
+        self._clock = clock
+
+    def meet_requirement(self, loan):
+        self._clock[0] += 1.0
+        return True
+
+
+@pytest.fixture
+def listing(make_listing, make_loan):
+    """Listing of fake loans."""
+    return make_listing(*(
+        make_loan(loan_id, fundedAmount=1000.0 if loan_id % 2 else 0.0,
+                  term=60 if loan_id % 4 == 0 else 36,
+                  grade='ABC'[loan_id % 3], reviewStatus='APPROVED')
+        for loan_id in range(40)
+    ))
+
+
+class TestCombinations:
+    def test_operators(self):
+        grade = filter.FilterByGrade('A')
+        term = filter.FilterByTerm(value=36)
+        funded = filter.FilterByFunded(100)
+
+        combined = grade & term & funded
+        assert isinstance(combined, combination.And)
+        assert combined.filters == (grade, term, funded)
+        assert isinstance(grade | term, combination.Or)
+        assert isinstance(~grade, combination.Not)
+        assert ~~grade is grade
+        assert (grade & term) == (term & grade)
+        assert (grade & term) != (grade | term)
+        assert combined.fields() == frozenset(
+            ('grade', 'term', 'fundedAmount', 'loanAmount'))
+
+        with pytest.raises(LCError):
+            combination.And()
+        with pytest.raises(LCError):
+            combination.Or(grade, 'term')
+
+    def test_semantics(self, listing):
+        grade = filter.FilterByGrade('A')
+        term = filter.FilterByTerm(value=36)
+        funded = filter.FilterByFunded(100)
+
+        expected = listing.filter(grade, term, funded)
+        assert listing.filter(combination.And(grade, term, funded,
+                                              sample_every=3)) == expected
+
+        result = listing.filter((grade | ~term) & funded)
+        assert [item.id for item in result] == [
+            item.id for item in listing
+            if (item.grade == 'A' or item.term != 36) and
+            item.percent_funded >= 100]
+
+    def test_reorder(self, listing):
+        clock = [0.0]
+        slow = _SlowFilter(clock)
+        grade = filter.FilterByGrade('A')
+
+        with mock.patch.object(combination.time, 'perf_counter',
+                               lambda: clock[0]):
+            combined = combination.And(slow, grade, sample_every=2)
+            listing.filter(combined)
+            assert combined.order == (grade, slow)
+            stats = dict((item[0], item[1:]) for item in combined.statistics())
+            assert stats[slow][0] == 20
+            assert stats[slow][1] == 20
+            assert stats[slow][2] == 20.0
+            assert stats[grade][1] == 7
+
+            combined = combination.Or(slow, grade, sample_every=2)
+            listing.filter(combined)
+            assert combined.order == (grade, slow)
+
+            combined = combination.And(slow, grade, sample_every=1)
+            listing.filter(combined)
+            assert combined.order == (grade, slow)
+            stats = dict((item[0], item[1:]) for item in combined.statistics())
+            assert stats[slow][0] == 40
+            assert stats[grade][0] == 40
+
+            combined = combination.And(slow, grade, adaptive=False)
+            listing.filter(combined)
+            assert combined.order == (slow, grade)
+
+
+class TestFilterIdentity:
+    def test_equality(self):
+        assert filter.FilterByGrade('AB') == filter.FilterByGrade(('B', 'A'))
+        assert filter.FilterByGrade('AB') != filter.FilterByGrade('A')
+        assert filter.FilterByTerm(value=36) == filter.FilterByTerm(value=36)
+        assert filter.FilterByTerm(value=36) != filter.FilterByTerm(value=60)
+        assert filter.FilterByFunded(80) == filter.FilterByFunded(80.0)
+        assert filter.FilterByApproved() == filter.FilterByApproved()
+        assert filter.FilterByApproved() != filter.FilterByFunded(0)
+        assert filter.FilterByBorrowerTraits(
+            filter.BorrowerEmployedTrait()) == \
+            filter.FilterByBorrowerTraits([filter.BorrowerEmployedTrait()])
+
+        custom = _CustomFilter()
+        assert custom == custom
+        assert custom != _CustomFilter()
+
+        filters = {filter.FilterByGrade('A'), filter.FilterByGrade('A'),
+                   filter.FilterByApproved()}
+        assert len(filters) == 2
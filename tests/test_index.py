@@ -0,0 +1,184 @@
+# Filename: test_index.py
+
+"""
+Test the lendingclub2.index module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import filter
+from lendingclub2 import indexed
+from lendingclub2 import loan
+from lendingclub2.cache import FilterCache
+from lendingclub2.compiler import compile_filters
+from lendingclub2.error import LCError
+from lendingclub2.index import OwnedLoans, TextIndex, tokenize
+from lendingclub2.response.notes import Note
+
+
+class TestTextIndex:
+    @pytest.fixture(autouse=True)
+    def setup_index(self, make_loan):
+        self.loans = [
+            make_loan(1, desc='Consolidate my credit cards',
+                      empTitle='Registered Nurse'),
+            make_loan(2, desc='Buying a used car',
+                      empTitle='Software Engineer'),
+            make_loan(3, desc=None, empTitle='Nurse'),
+            make_loan(4, desc='Credit card consolidation and car repair'),
+        ]
+        self.index = TextIndex()
+        self.index.update(self.loans)
+
+    def test_query(self):
+        assert tokenize('Car-loan, 2019!') == ['car', 'loan', '2019']
+        assert self.index.lookup('NURSE') == {1, 3}
+        assert self.index.lookup('consolid*') == {1, 4}
+        assert self.index.lookup('card*') == {1, 4}
+        assert self.index.lookup('boat') == set()
+
+        assert self.index.query(all_of=('credit', 'car')) == {4}
+        assert self.index.query(any_of=('nurse', 'engineer')) == {1, 2, 3}
+        assert self.index.query(all_of=('car', ),
+                                none_of=('repair', )) == {2}
+        assert self.index.query(none_of=('car', )) == {1, 3}
+
+    def test_incremental(self, make_loan):
+        generation = self.index.generation
+        self.index.update(self.loans)
+        assert self.index.generation == generation
+
+        self.loans[1] = make_loan(2, desc='Wedding',
+                                  empTitle='Software Engineer')
+        self.loans.append(make_loan(5, desc='Buying a car'))
+        del self.loans[0]
+        self.index.update(self.loans)
+        assert len(self.index) == 4
+        assert 1 not in self.index
+        assert self.index.lookup('car') == {4, 5}
+        assert self.index.lookup('nurse') == {3}
+        assert self.index.lookup('consolid*') == {4}
+
+
+class TestFilterByKeywords:
+    def test_filter(self, make_listing, make_loan):
+        listing = make_listing(
+            make_loan(1, desc='Consolidate my credit cards',
+                      empTitle='Registered Nurse'),
+            make_loan(2, desc='Buying a used car',
+                      empTitle='Software Engineer'),
+            make_loan(3, desc='Car repair'),
+        )
+        spec = filter.FilterByKeywords(all_of=('car', ),
+                                       none_of=('repair', ))
+        expected = [2]
+        assert [item.id for item in listing.filter(spec)] == expected
+
+        index = listing.index_text()
+        assert listing.text_index is index
+        spec = filter.FilterByKeywords(all_of=('car', ), none_of=('repair', ),
+                                       index=index)
+        assert [item.id for item in listing.filter(spec)] == expected
+
+        # Loans outside of the index are scanned
+        listing.loans.append(make_loan(4, desc='New car'))
+        assert [item.id for item in listing.filter(spec)] == [2, 4]
+
+        spec = filter.FilterByKeywords(any_of=('consolid*', 'engineer'))
+        assert [item.id for item in listing.filter(spec)] == [1, 2]
+
+        with pytest.raises(LCError):
+            filter.FilterByKeywords()
+        with pytest.raises(LCError):
+            filter.FilterByKeywords(all_of='car')
+
+
+class TestSortedIndex:
+    def test_range(self, make_listing, make_loan):
+        listing = make_listing(*(
+            make_loan(loan_id, intRate=rate, ficoRangeLow=660 + loan_id * 10)
+            for loan_id, rate in enumerate((12.0, 7.5, None, 20.0, 7.5, 15.0))
+        ))
+
+        index = listing.range_index('interest_rate')
+        assert index is listing.range_index('intRate')
+        assert len(index) == 5
+        assert index.range(7.5, 12.0) == [1, 4, 0]
+        assert index.range(min_val=15.0) == [5, 3]
+        assert index.range(max_val=7.0) == []
+
+        spec = indexed.FilterByRange('interest_rate', 7.5, 15.0)
+        fico = indexed.FilterByRange('fico_range_low', min_val=670)
+        expected = [1, 4, 5]
+        assert [item.id for item in listing.filter(spec, fico)] == expected
+        listing.range_index('fico_range_low')
+        assert [item.id for item in listing.filter(fico, spec)] == expected
+        assert listing.loans[1].borrower.fico_range_low == 670
+
+        # Loans without the field never match, with or without an index
+        response = dict(listing.loans[5]._response)
+        del response['ficoRangeLow']
+        listing.loans = listing.loans[:5] + [loan.Loan(response)]
+        listing.range_index('fico_range_low')
+        assert [item.id for item in listing.filter(spec, fico)] == [1, 4]
+        assert [item.id for item in listing.filter(
+            compile_filters(spec, fico))] == [1, 4]
+        assert not fico.meet_requirement(listing.loans[5])
+
+        # Indexes are rebuilt once the loans are assigned or sorted
+        index = listing.range_index('intRate')
+        listing.loans = listing.loans[::-1]
+        assert not index.is_current(listing.loans, listing.generation)
+        assert [item.id for item in listing.filter(spec)] == [5, 4, 1, 0]
+        listing.range_index('intRate')
+        listing.sort(by_grade=False, by_term=True)
+        assert [item.id for item in listing.filter(spec)] == [0, 1, 4, 5]
+        listing.loans = listing.loans[:2]
+        assert listing.range_index('intRate') is not index
+        assert [item.id for item in listing.filter(spec)] == [0, 1]
+
+    def test_filter_by_range(self):
+        with pytest.raises(LCError):
+            indexed.FilterByRange('dti')
+        with pytest.raises(LCError):
+            indexed.FilterByRange('dti', min_val=10, max_val=5)
+        assert indexed.FilterByRange('dti', 1, 5).fields() == \
+            frozenset(('dti', ))
+        assert indexed.FilterByRange('revolving_balance', 1).field == \
+            'revolBal'
+        assert filter.FilterByTerm(value=None, min_val=36, max_val=60)
+
+
+class TestOwnedLoans:
+    def test_filter(self, make_listing, make_loan):
+        owned = OwnedLoans([Note({'noteId': 1, 'loanId': 2}),
+                            Note({'noteId': 2, 'loanId': 3})])
+        assert len(owned) == 2
+        assert 2 in owned
+
+        listing = make_listing(*(make_loan(loan_id, desc='car')
+                                 for loan_id in range(5)))
+        not_owned = indexed.FilterByNotOwned(owned)
+        assert [item.id for item in listing.filter(not_owned)] == [0, 1, 4]
+
+        # Cached and compiled filters see the new loans
+        cache = FilterCache()
+        compiled = compile_filters(not_owned)
+        assert len(listing.filter(not_owned, cache=cache)) == 3
+        identity = not_owned.identity()
+        owned.add(0, 2)
+        assert not_owned.identity() == identity
+        assert not_owned.generation() == 1
+        assert (~not_owned).generation() == 1
+        assert (not_owned & filter.FilterByGrade('A')).generation() == (1, )
+        assert filter.FilterByGrade('A').generation() is None
+        assert [item.id for item in listing.filter(not_owned, cache=cache)] \
+            == [1, 4]
+        assert [item.id for item in listing.filter(compiled)] == [1, 4]
+        assert compiled is compile_filters(not_owned)
+        assert len(cache) == 5
+
+        owned.remove(0)
+        assert [item.id for item in listing.filter(not_owned)] == [0, 1, 4]
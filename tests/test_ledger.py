@@ -0,0 +1,41 @@
+# Filename: test_ledger.py
+
+"""
+Test the lendingclub2.ledger module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2.error import LCError
+from lendingclub2.ledger import CashLedger
+
+
+class TestCashLedger:
+    def test_balance(self):
+        ledger = CashLedger()
+        assert ledger.balance is None
+        assert ledger.synced_at is None
+
+        ledger.sync(100.0)
+        assert ledger.balance == 100.0
+        assert ledger.synced_at is not None
+
+        ledger.debit(25.0, 'loan 1')
+        ledger.debit(50.0, 'loan 2')
+        ledger.credit(10.0, 'refund')
+        assert ledger.balance == 35.0
+        assert ledger.entries == [('loan 1', -25.0), ('loan 2', -50.0),
+                                  ('refund', 10.0)]
+
+        ledger.sync(40.0)
+        assert ledger.balance == 40.0
+        assert not ledger.entries
+
+    def test_invalid_amount(self):
+        ledger = CashLedger()
+        with pytest.raises(LCError):
+            ledger.debit(0)
+        with pytest.raises(LCError):
+            ledger.credit(-1)
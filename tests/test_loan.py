@@ -6,18 +6,207 @@ Test the lendingclub2.loan module
 
 # Standard libraries
 import collections
+import functools
+import json
 import random
+from unittest import mock
 
 # PyTest
 import pytest
 
+# requests
+import requests
+
 # lendingclub2
 from lendingclub2 import filter
 from lendingclub2 import loan
+from lendingclub2.aggregate import Count, Mean
 from lendingclub2.authorization import Authorization
 from lendingclub2.error import LCError
 
 
+@pytest.fixture
+def loan_json(loan_json):
+    """Fake loan listing entries with every field the tests read."""
+    return functools.partial(
+        loan_json,
+        loanAmount=10000.0,
+        fundedAmount=5000.0,
+        grade='B',
+        subGrade='B2',
+        intRate=10.0,
+        expDefaultRate=4.0,
+        installment=320.0,
+        investorCount=10,
+        purpose='debt_consolidation',
+        reviewStatus='APPROVED',
+        desc=None,
+        addrState='CA',
+        ficoRangeLow=700,
+        ficoRangeHigh=704,
+        delinq2Yrs=0,
+        dti=15.0,
+        empLength=24,
+        empTitle='Engineer',
+        isIncV='VERIFIED',
+        inqLast6Mths=0,
+        mthsSinceLastDelinq=None,
+        mortAcc=1,
+        pubRec=0,
+        revolBal=5000.0,
+    )
+
+
+class TestRanking:
+    @pytest.fixture(autouse=True)
+    def setup_listing(self, make_listing, make_loan):
+        self.listing = make_listing(
+            make_loan(1, intRate=7.0, grade='A', subGrade='A3'),
+            make_loan(2, intRate=15.0, grade='C', subGrade='C1'),
+            make_loan(3, intRate=11.0, grade='B', subGrade='B5'),
+            make_loan(4, intRate=15.0, grade='B', subGrade='B1'),
+        )
+
+    def test_rank(self):
+        original = list(self.listing.loans)
+        ranked = self.listing.rank('interest_rate')
+        assert [item.id for item in ranked] == [1, 3, 2, 4]
+        assert self.listing.loans == original
+
+        ranked = self.listing.rank('-interest_rate', 'grade')
+        assert [item.id for item in ranked] == [4, 2, 3, 1]
+
+        ranked = self.listing.rank('-grade', 'id')
+        assert [item.id for item in ranked] == [2, 3, 4, 1]
+
+        scores = {1: 0.5, 2: 0.1, 3: 0.9, 4: 0.3}
+        ranked = self.listing.rank(scores, reverse=True)
+        assert [item.id for item in ranked] == [3, 1, 4, 2]
+
+        with pytest.raises(LCError):
+            self.listing.rank()
+        with pytest.raises(LCError):
+            self.listing.rank(42)
+
+    def test_top_k(self):
+        best = self.listing.top_k(2, lambda item: item.interest_rate)
+        assert [item.id for item in best] == [2, 4]
+
+        worst = self.listing.top_k(1, 'interest_rate', reverse=False)
+        assert [item.id for item in worst] == [1]
+
+        assert len(self.listing.top_k(10, 'id')) == 4
+        assert len(self.listing.top_k(0, 'id')) == 0
+        with pytest.raises(LCError):
+            self.listing.top_k(-1, 'id')
+
+
+class TestGroupBy:
+    def test_group_by(self, make_listing, make_loan):
+        listing = make_listing(
+            make_loan(1, grade='A', intRate=6.0),
+            make_loan(2, grade='A', intRate=8.0, addrState='NY'),
+            make_loan(3, grade='C', intRate=16.0),
+        )
+        result = listing.group_by('grade', count=Count(),
+                                  rate=Mean('interest_rate'))
+        assert result == {'A': {'count': 2, 'rate': 7.0},
+                          'C': {'count': 1, 'rate': 16.0}}
+
+        result = listing.group_by('borrower.address_state', count=Count())
+        assert result == {'CA': {'count': 2}, 'NY': {'count': 1}}
+
+        # Read column by column, with a fallback for computed attributes
+        assert listing.column('interest_rate') == [6.0, 8.0, 16.0]
+        with pytest.raises(KeyError):
+            listing.column('percent_funded')
+        result = listing.group_by('grade', funded=Mean('percent_funded'))
+        assert result == {'A': {'funded': 50.0}, 'C': {'funded': 50.0}}
+
+
+class _CountingFilter(filter.Filter):
+    """Filter recording how many loans it has evaluated."""
+    def __init__(self, predicate):
+        self.calls = 0
+        self._predicate = predicate
+
+    def meet_requirement(self, loan):
+        self.calls += 1
+        return self._predicate(loan)
+
+
+class TestListingView:
+    @pytest.fixture(autouse=True)
+    def setup_listing(self, make_listing, make_loan):
+        self.listing = make_listing(*(
+            make_loan(loan_id, term=36 if loan_id % 2 else 60,
+                      intRate=float(loan_id))
+            for loan_id in range(1, 101)
+        ))
+
+    def test_lazy(self):
+        counting = _CountingFilter(lambda item: item.term == 36)
+        view = self.listing.view().filter(counting).filter(
+            filter.FilterByApproved())
+        assert counting.calls == 0
+
+        first = view.limit(5)
+        assert [item.id for item in first] == [1, 3, 5, 7, 9]
+        assert counting.calls == 9
+
+        assert len(view) == 50
+        assert isinstance(view.materialize(), loan.Listing)
+        assert view.materialize() == self.listing.filter(
+            filter.FilterByTerm(value=36), filter.FilterByApproved())
+
+    def test_sort(self):
+        view = self.listing.view().filter(filter.FilterByTerm(value=60))
+        best = view.sort('interest_rate', reverse=True).limit(3)
+        assert [item.id for item in best] == [100, 98, 96]
+
+        ordered = view.sort('-interest_rate')
+        assert [item.id for item in ordered.limit(2)] == [100, 98]
+        assert len(ordered) == 50
+
+        assert view.limit(0).materialize().loans == []
+        assert not self.listing.view().filter(
+            filter.FilterByTerm(value=48))
+        with pytest.raises(LCError):
+            view.limit(-1)
+
+
+class TestProjection:
+    @mock.patch.object(loan.request, 'get')
+    def test_search(self, request_mock, loan_json):
+        response = requests.Response()
+        response.status_code = requests.codes.ok
+        response._content = str.encode(json.dumps({'loans': [
+            loan_json(1, grade='A'), loan_json(2, grade='C'),
+        ]}))
+        request_mock.return_value = response
+
+        listing = loan.Listing()
+        listing.search(fields=('intRate', filter.FilterByGrade('A')))
+        assert sorted(listing.loans[0]._response) == sorted(
+            loan.LOAN_REQUIRED_FIELDS + ('grade', 'intRate'))
+        assert listing.loans[1].interest_rate == 10.0
+        with pytest.raises(KeyError):
+            _ = listing.loans[1].purpose
+
+        listing.search(fields=(filter.FilterByBorrowerTraits(
+            filter.BorrowerEmployedTrait()), ))
+        assert listing.loans[0].borrower.employed
+        with pytest.raises(KeyError):
+            _ = listing.loans[0].grade
+
+        # Unknown fields of custom filters keep everything
+        listing.search(fields=(_CountingFilter(lambda item: True), ))
+        assert listing.loans[0].purpose == 'debt_consolidation'
+
+        with pytest.raises(LCError):
+            listing.search(fields=(1, ))
+
+
 class TestListing:
     def test_search(self):
         try:
@@ -4,15 +4,50 @@
 Test the lendingclub2.response.notes module
 """
 
+# Standard libraries
+import json
+from unittest import mock
+
 # PyTest
 import pytest
 
+# requests
+import requests
+
 # lendingclub2
 from lendingclub2.account import InvestorAccount
+from lendingclub2.aggregate import Count, Max, Sum
+from lendingclub2.config import NoteStatus
 from lendingclub2.error import LCError
+from lendingclub2.response import notes as notes_module
 from lendingclub2.response.notes import Notes
 
 
+def _notes_response(*notes_json):
+    """Build a fake detailed notes response."""
+    response = requests.Response()
+    response.status_code = requests.codes.ok
+    response._content = str.encode(json.dumps({'myNotes': list(notes_json)}))
+    return response
+
+
+def _note_json(note_id, loan_id, status='Current', grade='B', amount=25.0):
+    """Build a fake detailed note."""
+    return {
+        'noteId': note_id,
+        'loanId': loan_id,
+        'loanStatus': status,
+        'grade': grade,
+        'noteAmount': amount,
+        'loanAmount': 10000.0,
+        'loanLength': 36,
+        'interestRate': 12.0,
+        'principalPending': amount,
+        'paymentsReceived': 0.0,
+        'purpose': 'credit_card',
+    }
+
+
 class TestNotes:
     def test_properties(self):
         investor_id = None
@@ -24,3 +59,138 @@ class TestNotes:
         notes = Notes(investor_id)
         assert notes.successful
         assert len(notes) >= 0
+
+
+class TestProjection:
+    @mock.patch.object(notes_module.request, 'get')
+    def test_fields(self, request_mock):
+        request_mock.side_effect = lambda url: _notes_response(
+            _note_json(1, 10), _note_json(2, 20, grade='C'))
+
+        notes = Notes('fake_investor_id', fields=('grade', 'loanId'))
+        assert len(notes) == 2
+        assert [note.grade for note in notes] == ['B', 'C']
+        assert [note.loan_id for note in notes] == [10, 20]
+        with pytest.raises(KeyError):
+            _ = list(notes)[0].amount
+        assert 'myNotes' not in notes.json
+        # The raw body isn't retained either
+        assert notes._response.content == b''
+        assert notes.successful
+
+        notes = Notes('fake_investor_id')
+        assert list(notes)[0].amount == 25.0
+
+
+class TestNotesStore:
+    @mock.patch.object(notes_module.request, 'get')
+    def test_store(self, request_mock):
+        request_mock.return_value = _notes_response(
+            _note_json(1, 10),
+            _note_json(2, 10, status='Late (31-120 days)', amount=50.0),
+            _note_json(3, 20, status='Fully Paid', grade='A', amount=0.0),
+            _note_json(4, 30, status='In Grace Period', grade='C'),
+        )
+        notes = Notes('fake_investor_id')
+        store = notes.store
+        assert store is notes.store
+        assert len(store) == 4
+
+        assert store.count_by_status() == {
+            'Current': 1, 'Late (31-120 days)': 1, 'Fully Paid': 1,
+            'In Grace Period': 1,
+        }
+        assert store.late_count() == 2
+        assert store.late_ratio() == 0.5
+        assert store.outstanding_principal() == 100.0
+        assert [note.id for note in store.notes_of_loan(10)] == [1, 2]
+        assert store.notes_of_loan(40) == []
+
+        # Columns agree with the note properties
+        for name in ('current', 'late', 'paid', 'new', 'charged_off',
+                     'grade', 'status', 'amount'):
+            assert list(store.column(name)) == \
+                [getattr(note, name) for note in notes]
+        with pytest.raises(KeyError):
+            store.column('purpose')
+
+        selected = store.select(grade='B', status=NoteStatus.CURRENT)
+        assert [note.id for note in selected] == [1]
+        assert len(store.select(grade='B', loan_id=20)) == 0
+        assert len(store.select(status=NoteStatus.CHARGED_OFF)) == 0
+        assert len(store.select()) == 4
+
+    @mock.patch.object(notes_module.request, 'get')
+    def test_group_by(self, request_mock):
+        request_mock.return_value = _notes_response(
+            _note_json(1, 10),
+            _note_json(2, 10, status='Late (31-120 days)', amount=50.0),
+            _note_json(3, 20, grade='A'),
+        )
+        notes = Notes('fake_investor_id')
+        assert notes.group_by('late', count=Count(),
+                              principal=Sum('principal_pending')) == {
+            False: {'count': 2, 'principal': 50.0},
+            True: {'count': 1, 'principal': 50.0},
+        }
+
+        # Falls back to the notes without a column
+        assert notes.group_by('grade', count=Count(),
+                              length=Max('loan_length')) == {
+            'A': {'count': 1, 'length': 36},
+            'B': {'count': 2, 'length': 36},
+        }
+
+
+class TestEndpointSelection:
+    @mock.patch.object(notes_module.request, 'get')
+    def test_fields(self, request_mock):
+        request_mock.side_effect = lambda url: _notes_response(
+            _note_json(1, 10))
+
+        notes = Notes('fake_investor_id', fields=('loanStatus', 'grade'))
+        assert not notes.detailed
+        assert request_mock.call_args[0][0].endswith('/notes')
+
+        notes = Notes('fake_investor_id', fields=('principalPending', ))
+        assert notes.detailed
+        assert request_mock.call_args[0][0].endswith('/detailednotes')
+
+        notes = Notes('fake_investor_id')
+        assert notes.detailed
+
+    @mock.patch.object(notes_module.request, 'get')
+    def test_needs_detail(self, request_mock):
+        owned = [_note_json(1, 10), _note_json(2, 20, status='In Grace Period')]
+        for note_json in owned:
+            del note_json['principalPending']
+
+        def _get(url, **kwargs):
+            if url.endswith('/notes'):
+                return _notes_response(*owned)
+            return _notes_response(
+                _note_json(1, 10),
+                _note_json(2, 20, status='In Grace Period', amount=20.0))
+        request_mock.side_effect = _get
+
+        notes = Notes('fake_investor_id', needs_detail=lambda note: note.late)
+        assert request_mock.call_count == 2
+        assert notes.detailed
+        first, second = list(notes)
+        assert 'principalPending' not in first._response
+        assert second.principal_pending == 20.0
+
+        # The detailed notes aren't requested if no note needs them
+        request_mock.reset_mock()
+        notes = Notes('fake_investor_id', needs_detail=lambda note: False)
+        assert request_mock.call_count == 1
+        assert len(notes) == 2
+        assert not notes.detailed
+
+        # The notes endpoint alone has every requested field
+        with pytest.raises(LCError):
+            Notes('fake_investor_id', fields=('loanStatus', ),
+                  needs_detail=lambda note: True)
+        with pytest.raises(LCError):
+            Notes('fake_investor_id', detailed=False,
+                  needs_detail=lambda note: True)
@@ -6,11 +6,16 @@ Test the lendingclub2.response.order module
 
 # Standard libraries
 import collections
+import json
 import random
+from unittest import mock
 
 # PyTest
 import pytest
 
+# requests
+import requests
+
 # lendingclub2
 from lendingclub2 import loan
 from lendingclub2.account import InvestorAccount
@@ -21,6 +26,7 @@ from lendingclub2.filter import (
     FilterByBorrowerTraits,
     FilterByApproved, FilterByFunded, FilterByGrade, FilterByTerm,
 )
+from lendingclub2.response import order as order_module
 from lendingclub2.response.order import Order, OrderNote
 
 
@@ -64,3 +70,129 @@ class TestOrder:
         if notes:
             order = Order(account.id(), *notes)
             assert order.successful
+
+
+def _order_response(status_code=200, **body):
+    """Build a fake order response."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = str.encode(json.dumps(body))
+    return response
+
+
+def _confirmation(loan_id, requested, invested, *statuses):
+    """Build a fake order confirmation."""
+    return {
+        'loanId': loan_id,
+        'requestedAmount': requested,
+        'investedAmount': invested,
+        'executionStatus': list(statuses or ('ORDER_FULFILLED', )),
+    }
+
+
+class TestOrderConfirmations:
+    @mock.patch.object(order_module.request, 'post')
+    def test_successful(self, post_mock):
+        notes = [OrderNote(loan_id, 25) for loan_id in range(300)]
+        post_mock.return_value = _order_response(
+            orderInstructId=7,
+            orderConfirmations=[_confirmation(loan_id, 25, 25)
+                                for loan_id in reversed(range(300))])
+        order = Order('fake_investor_id', *notes)
+        assert order.successful
+        assert order.id == 7
+        assert order.confirmation(150).invested_amount == 25
+        assert order.confirmation(300) is None
+        assert [confirmation.loan_id
+                for confirmation in order.confirmations] == list(range(300))
+
+    @mock.patch.object(order_module.request, 'post')
+    def test_unsuccessful(self, post_mock):
+        notes = [OrderNote(1, 50), OrderNote(2, 25)]
+
+        # Partially filled notes are still bought
+        post_mock.return_value = _order_response(
+            orderInstructId=8,
+            orderConfirmations=[_confirmation(1, 50, 25),
+                                _confirmation(2, 25, 25)])
+        order = Order('fake_investor_id', *notes)
+        assert order.successful
+        assert order.confirmation(1).unfilled_amount == 25
+
+        # Not invested
+        post_mock.return_value = _order_response(
+            orderInstructId=9,
+            orderConfirmations=[
+                _confirmation(1, 50, 0, 'NOT_AN_IN_FUNDING_LOAN'),
+                _confirmation(2, 25, 25)])
+        assert not Order('fake_investor_id', *notes).successful
+
+        # Missing confirmation
+        post_mock.return_value = _order_response(
+            orderInstructId=10, orderConfirmations=[_confirmation(2, 25, 25)])
+        assert not Order('fake_investor_id', *notes).successful
+
+        # Loan which wasn't ordered
+        post_mock.return_value = _order_response(
+            orderInstructId=11,
+            orderConfirmations=[_confirmation(1, 50, 50),
+                                _confirmation(2, 25, 25),
+                                _confirmation(3, 25, 25)])
+        assert not Order('fake_investor_id', *notes).successful
+
+        # Rejected
+        post_mock.return_value = _order_response(400, errors=[])
+        order = Order('fake_investor_id', *notes)
+        assert not order.successful
+        assert order.id is None
+        assert not any(confirmation.fulfilled
+                       for confirmation in order.confirmations)
+
+
+class TestArmedOrder:
+    @mock.patch.object(order_module.Authorization, '_CODE', 'fake_api_key')
+    def test_fire(self):
+        armed = order_module.ArmedOrder(5, amount=50, portfolio_id=7)
+        payload = json.loads(armed.payload(1, 2).decode())
+        assert payload == {
+            'aid': 5,
+            'orders': [
+                {'loanId': 1, 'requestedAmount': 50, 'portfolioId': 7},
+                {'loanId': 2, 'requestedAmount': 50, 'portfolioId': 7},
+            ],
+        }
+
+        response = _order_response(
+            orderInstructId=12,
+            orderConfirmations=[_confirmation(1, 50, 50),
+                                _confirmation(2, 50, 50)])
+        with mock.patch.object(order_module.request, 'post') as post_mock:
+            post_mock.return_value = response
+            order = armed.fire(1, 2)
+        args, kwargs = post_mock.call_args
+        assert args[0].endswith('/orders')
+        assert kwargs['data'] == armed.payload(1, 2)
+        session = kwargs['session']
+        assert session.headers['Authorization'] == 'fake_api_key'
+        assert session.headers['Content-Type'] == 'application/json'
+        assert order.successful
+        assert order.id == 12
+        assert order.confirmation(2).order_note.portfolio_id == 7
+        assert armed.url == post_mock.call_args[0][0]
+
+        # A loan ordered twice is rejected before posting anything
+        with mock.patch.object(order_module.request, 'post') as post_mock:
+            with pytest.raises(LCError):
+                armed.fire(1, 1)
+        assert not post_mock.called
+        armed.close()
+
+        with pytest.raises(LCError):
+            order_module.ArmedOrder(5, amount=30)
+
+    def test_session(self):
+        session = mock.Mock()
+        order_module.request.post('https://example.com', data=b'{}',
+                                  session=session)
+        session.post.assert_called_once_with('https://example.com',
+                                             data=b'{}')
@@ -0,0 +1,90 @@
+# Filename: test_parallel.py
+
+"""
+Test the lendingclub2.parallel module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import filter
+from lendingclub2.error import LCError
+from lendingclub2.parallel import ParallelFilterExecutor
+
+
+class _DescriptionFilter(filter.Filter):
+    """Filter loans mentioning a word in their description."""
+    def __init__(self, word):
+        self._word = word
+
+    def fields(self):
+        return frozenset(('desc', ))
+
+    def meet_requirement(self, loan):
+        try:
+            return self._word in (loan.description or '')
+        except KeyError:
+            return False
+
+
+class _ProjectedFilter(filter.Filter):
+    """Filter only matching loans shipped without their text fields."""
+    def fields(self):
+        return frozenset(('grade', ))
+
+    def meet_requirement(self, loan):
+        return 'desc' not in loan._response and \
+            'empTitle' not in loan._response
+
+
+class _UndeclaredFilter(filter.Filter):
+    """Filter which doesn't declare the fields it reads."""
+    def meet_requirement(self, loan):
+        return True
+
+
+@pytest.fixture
+def listing(make_listing, make_loan):
+    """Listing of fake loans, some of them without their description."""
+    loans = list()
+    for loan_id in range(101):
+        if loan_id % 5 == 0:
+            text = dict(empTitle='Nurse')
+        else:
+            text = dict(desc='car' if loan_id % 3 else 'house')
+        loans.append(make_loan(loan_id, grade='AB'[loan_id % 2], **text))
+    return make_listing(*loans)
+
+
+class TestParallelFilterExecutor:
+    @pytest.mark.parametrize('use_processes', (True, False))
+    def test_filter(self, listing, use_processes):
+        filters = (filter.FilterByGrade('A'), _DescriptionFilter('car'))
+        expected = listing.filter(*filters)
+
+        with ParallelFilterExecutor(workers=3,
+                                    use_processes=use_processes) as executor:
+            result = executor.filter(listing, *filters)
+            assert [item.id for item in result] == \
+                [item.id for item in expected]
+            assert len(executor.filter(listing)) == 101
+
+    def test_projection(self, listing):
+        with ParallelFilterExecutor(workers=2) as executor:
+            result = executor.filter(listing, _ProjectedFilter())
+            assert len(result) == 101
+            assert result.loans[0] is listing.loans[0]
+            with pytest.raises(LCError):
+                executor.filter(listing, _UndeclaredFilter())
+
+        with ParallelFilterExecutor(workers=2,
+                                    use_processes=False) as executor:
+            assert len(executor.filter(listing, _ProjectedFilter())) == 0
+            assert len(executor.filter(listing, _UndeclaredFilter())) == 101
+
+    def test_invalid(self):
+        with pytest.raises(LCError):
+            ParallelFilterExecutor(workers=0)
+        with pytest.raises(LCError):
+            ParallelFilterExecutor(chunks_per_worker=0)
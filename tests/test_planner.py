@@ -0,0 +1,100 @@
+# Filename: test_planner.py
+
+"""
+Test the lendingclub2.planner and lendingclub2.response.filters modules
+"""
+
+# Standard libraries
+import json
+from unittest import mock
+
+# PyTest
+import pytest
+
+# requests
+import requests
+
+# lendingclub2
+from lendingclub2 import filter
+from lendingclub2 import loan
+from lendingclub2.error import LCError
+from lendingclub2.planner import FilterPlanner
+from lendingclub2.response import filters
+
+
+def _response(content):
+    """Build a fake successful response."""
+    response = requests.Response()
+    response.status_code = requests.codes.ok
+    response._content = str.encode(json.dumps(content))
+    return response
+
+
+def _loan_json(loan_id, grade, funded):
+    """Build a fake loan listing entry."""
+    return {'id': loan_id, 'loanAmount': 1000.0, 'fundedAmount': funded,
+            'term': 36, 'grade': grade, 'subGrade': grade + '1',
+            'reviewStatus': 'APPROVED'}
+
+
+class TestSavedFilters:
+    @mock.patch.object(filters.request, 'get')
+    def test_properties(self, request_mock):
+        request_mock.return_value = _response([
+            {'id': 10, 'name': 'grade A'},
+            {'id': 11, 'name': 'grade A 36 months'},
+        ])
+        saved = filters.SavedFilters('fake_investor_id')
+        assert len(saved) == 2
+        assert 11 in saved
+        assert 12 not in saved
+        assert saved.find('grade A').id == 10
+        assert saved.find('foo') is None
+        assert 'fake_investor_id' in request_mock.call_args[0][0]
+
+
+class TestFilterPlanner:
+    def setup_method(self):
+        with mock.patch.object(filters.request, 'get') as request_mock:
+            request_mock.return_value = _response({'filters': [
+                {'id': 10, 'name': 'grade A'},
+                {'id': 11, 'name': 'grade A 36 months'},
+            ]})
+            saved = filters.SavedFilters('fake_investor_id')
+        self.planner = FilterPlanner(saved)
+        self.planner.register('grade A', filter.FilterByGrade('A'))
+        self.planner.register(11, filter.FilterByGrade('A'),
+                              filter.FilterByTerm(value=36))
+
+    def test_plan(self):
+        funded = filter.FilterByFunded(80)
+        filter_id, remaining = self.planner.plan(
+            filter.FilterByTerm(value=36), funded, filter.FilterByGrade('A'))
+        assert filter_id == 11
+        assert remaining == (funded, )
+
+        filter_id, remaining = self.planner.plan(filter.FilterByGrade('A'),
+                                                 funded)
+        assert filter_id == 10
+        assert remaining == (funded, )
+
+        filter_id, remaining = self.planner.plan(filter.FilterByGrade('B'))
+        assert filter_id is None
+        assert remaining == (filter.FilterByGrade('B'), )
+
+        with pytest.raises(LCError):
+            self.planner.register('foo', funded)
+        with pytest.raises(LCError):
+            self.planner.register(12, funded)
+        with pytest.raises(LCError):
+            self.planner.register(10)
+
+    @mock.patch.object(loan.request, 'get')
+    def test_search(self, request_mock):
+        request_mock.return_value = _response({'loans': [
+            _loan_json(1, 'A', 900.0), _loan_json(2, 'A', 0.0),
+        ]})
+        listing = self.planner.search(filter.FilterByGrade('A'),
+                                      filter.FilterByFunded(80))
+        assert 'filterId=10' in request_mock.call_args[0][0]
+        assert [item.id for item in listing] == [1]
@@ -0,0 +1,65 @@
+# Filename: test_profile.py
+
+"""
+Test the lendingclub2.profile module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import filter
+from lendingclub2 import indexed
+from lendingclub2.profile import FilterProfile
+
+
+@pytest.fixture
+def listing(make_listing, make_loan):
+    """Listing of fake loans."""
+    return make_listing(*(
+        make_loan(loan_id, term=60 if loan_id % 4 == 0 else 36,
+                  grade='AB'[loan_id % 2], intRate=float(loan_id))
+        for loan_id in range(20)
+    ))
+
+
+class TestFilterProfile:
+    def test_profile(self, listing):
+        grade = filter.FilterByGrade('A')
+        term = filter.FilterByTerm(value=36)
+
+        result = listing.filter(grade, term)
+        assert result.profile is None
+
+        result = listing.filter(grade, term, profile=True)
+        assert result == listing.filter(grade, term)
+        profile = result.profile
+        assert isinstance(profile, FilterProfile)
+        assert (profile.loans, profile.matched) == (20, 5)
+
+        grade_stats, term_stats = profile.statistics
+        assert grade_stats.filter is grade
+        assert (grade_stats.evaluated, grade_stats.rejected) == (20, 10)
+        assert not grade_stats.short_circuited
+        assert (term_stats.evaluated, term_stats.rejected) == (10, 5)
+        assert term_stats.skipped == 10
+        assert term_stats.short_circuited
+        assert term_stats.per_call >= 0.0
+
+        table = str(profile)
+        assert 'FilterByGrade' in table
+        assert '5 of 20 loans matched' in table
+        assert profile.as_dict()['filters'][1]['short_circuited']
+
+    def test_indexed(self, listing):
+        listing.range_index('interest_rate')
+        rate = indexed.FilterByRange('interest_rate', max_val=9.0)
+        result = listing.filter(rate, filter.FilterByGrade('B'),
+                                profile=True)
+        assert [item.id for item in result] == [1, 3, 5, 7, 9]
+
+        rate_stats, grade_stats = result.profile.statistics
+        assert rate_stats.indexed
+        assert (rate_stats.evaluated, rate_stats.rejected) == (20, 10)
+        assert (grade_stats.evaluated, grade_stats.rejected) == (10, 5)
+        assert '(indexed)' in result.profile.table()
@@ -0,0 +1,68 @@
+# Filename: test_score.py
+
+"""
+Test the lendingclub2.score module
+"""
+
+# PyTest
+import pytest
+
+# lendingclub2
+from lendingclub2 import score
+from lendingclub2.error import LCError
+
+
+class TestScorer:
+    def test_expected_return(self, make_listing, make_loan):
+        scorer = score.ExpectedReturnScorer(service_fee=0.0)
+        listing = make_listing(
+            make_loan(1, intRate=10.0, expDefaultRate=3.0),
+            make_loan(2, intRate=20.0, expDefaultRate=15.0),
+            make_loan(3, intRate=8.0, expDefaultRate=None),
+        )
+        assert scorer.scores(listing) == {1: 7.0, 2: 5.0, 3: 8.0}
+        assert scorer.misses == 3
+
+        ranked = scorer.rank(listing)
+        assert [item.id for item in ranked] == [3, 1, 2]
+        assert [item.id for item in scorer.rank(listing, k=1)] == [3]
+        assert scorer.misses == 3
+        assert scorer.hits == 6
+
+        with pytest.raises(LCError):
+            score.ExpectedReturnScorer(service_fee=-1.0)
+
+    def test_cache(self, make_listing, make_loan):
+        calls = list()
+
+        def function(item):
+            calls.append(item.id)
+            return item.interest_rate
+
+        scorer = score.FunctionScorer(function)
+        listing = make_listing(
+            make_loan(1, intRate=10.0, expDefaultRate=3.0),
+            make_loan(2, intRate=20.0, expDefaultRate=15.0),
+        )
+        assert scorer.scores(listing) == {1: 10.0, 2: 20.0}
+        assert scorer(listing.loans[0]) == 10.0
+        assert calls == [1, 2]
+
+        # Same loan ID, but new content
+        listing = make_listing(
+            make_loan(1, intRate=12.0, expDefaultRate=3.0),
+            make_loan(2, intRate=20.0, expDefaultRate=15.0),
+        )
+        assert scorer.scores(listing) == {1: 12.0, 2: 20.0}
+        assert calls == [1, 2, 1]
+
+        top = listing.top_k(1, scorer)
+        assert [item.id for item in top] == [2]
+        assert calls == [1, 2, 1]
+
+        scorer.clear()
+        assert scorer(listing.loans[1]) == 20.0
+        assert calls == [1, 2, 1, 2]
+
+        with pytest.raises(LCError):
+            score.FunctionScorer(None)